@@ -0,0 +1,186 @@
+import os
+import random
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+DOCUMENT_SIZES = {
+    "1KB": 1024,
+    "10KB": 10 * 1024,
+    "100KB": 100 * 1024,
+    "1MB": 1024 * 1024,
+    "5MB": 5 * 1024 * 1024,
+}
+
+WORDS = (
+    "the of and to in is was for that on with as by at from it his an were "
+    "are which this be has had not but they their or one its new after who "
+    "first two have been also other more when into over time year years "
+    "city world between during government system people while market data "
+    "company research analysis language model report team season match "
+    "player league economy policy energy climate network software service "
+    "process result study development history group region country state "
+    "water industry price growth support project design program science "
+    "technology article reader editor station river mountain village "
+    "festival museum library council election minister budget agreement "
+    "increase decline record average quarter million billion percent local "
+    "national international public private small large major early late "
+    "recent final strong important different possible available similar"
+).split()
+
+NAMES = (
+    "John Smith",
+    "Maria Garcia",
+    "London",
+    "New York",
+    "Athens",
+    "United Nations",
+    "European Commission",
+    "Google",
+    "Microsoft",
+    "Amazon River",
+    "Peter Brown",
+    "Elena Petrova",
+    "Tokyo",
+    "World Health Organization",
+    "Ferrari",
+    "Lewis Hamilton",
+)
+
+HTML_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<meta property="og:title" content="{title}">
+<meta property="og:type" content="article">
+<meta property="og:image" content="/images/{seed}.jpg">
+<meta name="twitter:card" content="summary_large_image">
+<meta name="twitter:title" content="{title}">
+<meta name="twitter:image" content="/images/{seed}.jpg">
+<style>body {{ font-family: sans-serif; }}</style>
+<script>window.analytics = {{"page": "{seed}"}};</script>
+</head>
+<body>
+<header>
+<nav><ul>{menu}</ul></nav>
+</header>
+<main>
+<article>
+<h1>{title}</h1>
+{paragraphs}
+</article>
+<aside><ul>{related}</ul></aside>
+</main>
+<footer><p>Copyright {seed} Example News. All rights reserved.</p></footer>
+</body>
+</html>
+"""
+
+
+def _sentence(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(8, 25))
+    if rng.random() < 0.6:
+        words.insert(rng.randrange(len(words)), rng.choice(NAMES))
+    if len(words) > 12 and rng.random() < 0.5:
+        position = rng.randrange(4, len(words) - 4)
+        words[position] = words[position] + ","
+
+    sentence = " ".join(words)
+    ending = rng.choices([".", "?", "!"], weights=[90, 5, 5])[0]
+
+    return sentence[0].upper() + sentence[1:] + ending
+
+
+def _paragraphs(rng: random.Random, size: int) -> Iterator[str]:
+    generated = 0
+    while generated < size:
+        paragraph = " ".join(_sentence(rng) for _ in range(rng.randint(3, 7)))
+        generated += len(paragraph) + 2
+
+        yield paragraph
+
+
+def generate_text(size: int, seed: int = 0) -> str:
+    """Generate a plain text document
+
+    The document depends only on the size and the seed, so the benchmarks of
+    different commits run on exactly the same input.
+
+    :param size: the approximate size of the document in characters
+    :param seed: the random seed
+    :return: the document
+    """
+    # bandit B311: the generator is used for reproducible test data, not for
+    # anything security related
+    rng = random.Random(seed)  # nosec B311
+
+    return "\n\n".join(_paragraphs(rng, size))
+
+
+def generate_html(size: int, seed: int = 0) -> str:
+    """Generate a news article like html page
+
+    :param size: the approximate size of the page in characters
+    :param seed: the random seed
+    :return: the html page
+    """
+    rng = random.Random(seed)  # nosec B311
+    title = _sentence(rng).rstrip(".?!")
+    menu = "".join(
+        f'<li><a href="/{word}">{word}</a></li>'
+        for word in rng.sample(WORDS, 8)
+    )
+    related = "".join(
+        f'<li><a href="/article/{index}">{_sentence(rng)}</a></li>'
+        for index in range(5)
+    )
+    page_size = len(HTML_PAGE) + len(title) * 4 + len(menu) + len(related)
+    paragraphs = "\n".join(
+        f"<p>{paragraph}</p>"
+        for paragraph in _paragraphs(rng, max(size - page_size, 0))
+    )
+
+    return HTML_PAGE.format(
+        title=title,
+        seed=seed,
+        menu=menu,
+        related=related,
+        paragraphs=paragraphs,
+    )
+
+
+def synthetic_corpus(
+    document_type: str, sizes: Dict[str, int], seed: int = 0
+) -> Iterator[Tuple[str, str]]:
+    """Generate a document of every size
+
+    :param document_type: `text` or `html`
+    :param sizes: the document names and their sizes
+    :param seed: the random seed
+    :return: an iterator over the document names and the documents
+    """
+    generate = generate_html if document_type == "html" else generate_text
+    for name, size in sizes.items():
+        yield name, generate(size, seed)
+
+
+def directory_corpus(
+    directory: str, document_type: str
+) -> Iterator[Tuple[str, str]]:
+    """Load the documents of a real corpus
+
+    Files that end with `.html` or `.htm` are used as html documents and all
+    the other files as text documents.
+
+    :param directory: the directory that contains the documents
+    :param document_type: `text` or `html`
+    :return: an iterator over the file names and the documents
+    """
+    for filename in sorted(os.listdir(directory)):
+        is_html = filename.endswith((".html", ".htm"))
+        if is_html != (document_type == "html"):
+            continue
+
+        path = Path(directory) / filename
+        if path.is_file():
+            yield filename, path.read_text(encoding="utf-8", errors="replace")
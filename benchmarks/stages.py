@@ -0,0 +1,453 @@
+import json
+import platform
+import statistics
+import sys
+import time
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.corpus import (
+    DOCUMENT_SIZES,
+    directory_corpus,
+    synthetic_corpus,
+)
+from text_analysis_helpers.presets import PRESETS
+
+
+@dataclass
+class Benchmark:
+    name: str
+    document_type: str
+    setup: Callable[[], Callable[[str], object]]
+
+
+def _rake():
+    from text_analysis_helpers.keywords.rake import Rake
+
+    return Rake().extract_keywords
+
+
+def _sumy():
+    from text_analysis_helpers.summaries.sumy import SumySummarizer
+
+    return SumySummarizer().summarize
+
+
+def _numpy_summarizer(algorithm: str):
+    from text_analysis_helpers.summaries.numpy import NumpySummarizer
+
+    return NumpySummarizer(algorithm=algorithm).summarize
+
+
+def _named_entities():
+    from text_analysis_helpers.named_entities.nltk import (
+        NltkNamedEntityExtractor,
+    )
+
+    return NltkNamedEntityExtractor().extract_named_entities
+
+
+def _readability():
+    from text_analysis_helpers.text import calculate_readability_scores
+
+    return calculate_readability_scores
+
+
+def _language_detection():
+    import langdetect
+    from langdetect.lang_detect_exception import LangDetectException
+
+    def detect(text: str) -> Optional[str]:
+        try:
+            return langdetect.detect(text)
+        except LangDetectException:
+            return None
+
+    return detect
+
+
+def _simple_tokenizers():
+    from text_analysis_helpers.tokenizers import (
+        simple_sentence_tokenize,
+        simple_word_tokenize,
+    )
+
+    def tokenize(text: str) -> List[List[str]]:
+        return [
+            simple_word_tokenize(sentence)
+            for sentence in simple_sentence_tokenize(text)
+        ]
+
+    return tokenize
+
+
+def _text_statistics():
+    from text_analysis_helpers.text import calculate_text_statistics
+
+    tokenize = _simple_tokenizers()
+
+    def calculate(text: str):
+        return calculate_text_statistics(
+            len(words) for words in tokenize(text)
+        )
+
+    return calculate
+
+
+def _text_analyser():
+    from text_analysis_helpers.text import TextAnalyser
+
+    return TextAnalyser().analyse
+
+
+def _html_analyser():
+    from text_analysis_helpers.html import HtmlAnalyser
+    from text_analysis_helpers.models import WebPage
+
+    analyser = HtmlAnalyser()
+
+    def analyse(html: str):
+        return analyser.analyse(
+            WebPage(url="https://www.example.com/article", html=html)
+        )
+
+    return analyse
+
+
+def _preset_text_analyser(preset: str):
+    from text_analysis_helpers.presets import create_text_analyser
+
+    return create_text_analyser(preset).analyse
+
+
+def _preset_html_analyser(preset: str):
+    from text_analysis_helpers.models import WebPage
+    from text_analysis_helpers.presets import create_html_analyser
+
+    analyser = create_html_analyser(preset)
+
+    def analyse(html: str):
+        return analyser.analyse(
+            WebPage(url="https://www.example.com/article", html=html)
+        )
+
+    return analyse
+
+
+BENCHMARKS = {
+    benchmark.name: benchmark
+    for benchmark in [
+        Benchmark("rake", "text", _rake),
+        Benchmark("sumy", "text", _sumy),
+        Benchmark(
+            "numpy_text_rank",
+            "text",
+            partial(_numpy_summarizer, "text_rank"),
+        ),
+        Benchmark(
+            "numpy_centroid", "text", partial(_numpy_summarizer, "centroid")
+        ),
+        Benchmark("named_entities", "text", _named_entities),
+        Benchmark("readability", "text", _readability),
+        Benchmark("language_detection", "text", _language_detection),
+        Benchmark("simple_tokenizers", "text", _simple_tokenizers),
+        Benchmark("text_statistics", "text", _text_statistics),
+        Benchmark("text_analyser", "text", _text_analyser),
+        Benchmark("html_analyser", "html", _html_analyser),
+    ]
+    + [
+        Benchmark(
+            f"text_analyser_{preset}",
+            "text",
+            partial(_preset_text_analyser, preset),
+        )
+        for preset in PRESETS
+    ]
+    + [
+        Benchmark(
+            f"html_analyser_{preset}",
+            "html",
+            partial(_preset_html_analyser, preset),
+        )
+        for preset in PRESETS
+    ]
+}
+
+
+def time_function(
+    func: Callable[[str], object],
+    document: str,
+    repeats: int = 5,
+    max_time: float = 30.0,
+) -> List[float]:
+    """Measure the duration of a function call
+
+    The function is called once before the measurements to warm up any
+    caches. The measurements stop early when their total duration exceeds
+    `max_time`, so the largest documents don't take too long.
+
+    :param func: the function to measure
+    :param document: the document to pass to the function
+    :param repeats: the maximum number of measurements
+    :param max_time: the time budget in seconds for the measurements
+    :return: the durations in seconds
+    """
+    func(document)
+
+    durations = []
+    while len(durations) < repeats and sum(durations) < max_time:
+        started_at = time.perf_counter()
+        func(document)
+        durations.append(time.perf_counter() - started_at)
+
+    return durations
+
+
+def run_benchmarks(
+    benchmark_names: List[str],
+    sizes: Dict[str, int],
+    corpus_directory: Optional[str] = None,
+    repeats: int = 5,
+    max_time: float = 30.0,
+    seed: int = 0,
+) -> dict:
+    """Run the stage benchmarks
+
+    :param benchmark_names: the benchmarks to run
+    :param sizes: the sizes of the synthetic documents
+    :param corpus_directory: use the documents in this directory instead of
+        the synthetic corpus
+    :param repeats: the maximum number of measurements of every benchmark
+    :param max_time: the time budget in seconds of every benchmark
+    :param seed: the synthetic corpus seed
+    :return: the benchmark results
+    """
+    results = {}
+    for benchmark_name in benchmark_names:
+        benchmark = BENCHMARKS[benchmark_name]
+        func = benchmark.setup()
+
+        if corpus_directory is not None:
+            documents = directory_corpus(
+                corpus_directory, benchmark.document_type
+            )
+        else:
+            documents = synthetic_corpus(benchmark.document_type, sizes, seed)
+
+        for document_name, document in documents:
+            durations = time_function(func, document, repeats, max_time)
+            median = statistics.median(durations)
+            result = {
+                "benchmark": benchmark_name,
+                "document": document_name,
+                "size": len(document.encode("utf-8")),
+                "repeats": len(durations),
+                "min": min(durations),
+                "median": median,
+                "mean": statistics.mean(durations),
+                "throughput": len(document.encode("utf-8")) / median,
+            }
+            results[f"{benchmark_name}/{document_name}"] = result
+            print(
+                f"{benchmark_name}/{document_name}: "
+                f"median {median * 1000:.2f}ms "
+                f"({result['repeats']} repeats)",
+                file=sys.stderr,
+            )
+
+    return {
+        "metadata": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "corpus": corpus_directory or f"synthetic(seed={seed})",
+        },
+        "results": results,
+    }
+
+
+def compare_results(
+    baseline: dict, current: dict, threshold: float = 0.1
+) -> List[dict]:
+    """Compare benchmark results with a baseline
+
+    A benchmark is a regression when its median duration is more than
+    `threshold` times slower than the baseline median and an improvement
+    when it is more than `threshold` times faster.
+
+    :param baseline: the baseline results
+    :param current: the current results
+    :param threshold: the relative change that is tolerated
+    :return: the comparison of every benchmark
+    """
+    baseline_results = baseline["results"]
+    current_results = current["results"]
+
+    comparisons = []
+    for name in sorted(set(baseline_results) | set(current_results)):
+        baseline_result = baseline_results.get(name)
+        current_result = current_results.get(name)
+        if baseline_result is None or current_result is None:
+            comparisons.append(
+                {
+                    "benchmark": name,
+                    "baseline": baseline_result and baseline_result["median"],
+                    "current": current_result and current_result["median"],
+                    "ratio": None,
+                    "status": "new" if baseline_result is None else "missing",
+                }
+            )
+            continue
+
+        ratio = current_result["median"] / baseline_result["median"]
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+
+        comparisons.append(
+            {
+                "benchmark": name,
+                "baseline": baseline_result["median"],
+                "current": current_result["median"],
+                "ratio": ratio,
+                "status": status,
+            }
+        )
+
+    return comparisons
+
+
+def _format_duration(duration: Optional[float]) -> str:
+    return f"{duration * 1000:.2f}ms" if duration is not None else "-"
+
+
+def record(args):
+    sizes = {
+        name: size
+        for name, size in DOCUMENT_SIZES.items()
+        if name in args.sizes
+    }
+    results = run_benchmarks(
+        args.benchmarks,
+        sizes,
+        corpus_directory=args.corpus,
+        repeats=args.repeats,
+        max_time=args.max_time,
+        seed=args.seed,
+    )
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    comparisons = compare_results(baseline, current, args.threshold)
+
+    print(
+        f"{'benchmark':<40}{'baseline':>12}{'current':>12}{'ratio':>8}  "
+        "status"
+    )
+    for comparison in comparisons:
+        ratio = comparison["ratio"]
+        print(
+            f"{comparison['benchmark']:<40}"
+            f"{_format_duration(comparison['baseline']):>12}"
+            f"{_format_duration(comparison['current']):>12}"
+            f"{f'{ratio:.2f}' if ratio is not None else '-':>8}  "
+            f"{comparison['status']}"
+        )
+
+    regressions = [
+        comparison
+        for comparison in comparisons
+        if comparison["status"] == "regression"
+    ]
+    if regressions:
+        print(f"{len(regressions)} benchmarks regressed", file=sys.stderr)
+        sys.exit(1)
+
+
+def get_arguments():
+    parser = ArgumentParser(description="analysis stage benchmarks")
+    subparsers = parser.add_subparsers(required=True)
+
+    record_parser = subparsers.add_parser(
+        "record", help="run the benchmarks and save the results"
+    )
+    record_parser.add_argument(
+        "--output",
+        default="benchmark_results.json",
+        help="the file in which to save the results",
+    )
+    record_parser.add_argument(
+        "--benchmarks",
+        nargs="+",
+        choices=list(BENCHMARKS),
+        default=list(BENCHMARKS),
+        help="the benchmarks to run",
+    )
+    record_parser.add_argument(
+        "--sizes",
+        nargs="+",
+        choices=list(DOCUMENT_SIZES),
+        default=list(DOCUMENT_SIZES),
+        help="the sizes of the synthetic documents",
+    )
+    record_parser.add_argument(
+        "--corpus",
+        default=None,
+        help="a directory with text and html files to use instead of the "
+        "synthetic corpus",
+    )
+    record_parser.add_argument(
+        "--repeats",
+        type=int,
+        default=5,
+        help="the maximum number of measurements of every benchmark",
+    )
+    record_parser.add_argument(
+        "--max-time",
+        type=float,
+        default=30.0,
+        help="the time budget in seconds of every benchmark",
+    )
+    record_parser.add_argument(
+        "--seed", type=int, default=0, help="the synthetic corpus seed"
+    )
+    record_parser.set_defaults(func=record)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="compare benchmark results with a baseline"
+    )
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="the relative slowdown that is reported as a regression",
+    )
+    compare_parser.add_argument("baseline", help="the baseline results")
+    compare_parser.add_argument("current", help="the current results")
+    compare_parser.set_defaults(func=compare)
+
+    return parser.parse_args()
+
+
+def main():
+    args = get_arguments()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,440 @@
+import json
+import multiprocessing
+import random
+import resource
+import sys
+import threading
+import time
+from argparse import ArgumentParser
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.corpus import directory_corpus, generate_html
+
+DEFAULT_PAGE_SIZES = (10 * 1024, 50 * 1024, 200 * 1024)
+DEFAULT_CHARSETS = ("utf-8", "iso-8859-1", "windows-1252")
+
+# words with characters outside ascii, so the pages encoded with different
+# charsets are actually different
+ACCENTED_REPLACEMENTS = {
+    "Athens": "Zürich",
+    "Elena Petrova": "José Müller",
+    "festival": "fête",
+    "village": "château",
+}
+
+
+class FixturePage(object):
+    __slots__ = ("content", "charset", "latency")
+
+    def __init__(self, content: bytes, charset: str, latency: float):
+        self.content = content
+        self.charset = charset
+        self.latency = latency
+
+
+def create_fixture_pages(
+    page_count: int = 100,
+    sizes: Sequence[int] = DEFAULT_PAGE_SIZES,
+    charsets: Sequence[str] = DEFAULT_CHARSETS,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    corpus_directory: Optional[str] = None,
+    seed: int = 0,
+) -> List[FixturePage]:
+    """Create the pages that the fixture server serves
+
+    :param page_count: the number of pages. It is ignored when a corpus
+        directory is given.
+    :param sizes: the page sizes. Every page gets the next size in turn.
+    :param charsets: the charsets with which the pages are encoded. Every
+        page gets the next charset in turn.
+    :param latency: the number of seconds the server waits before it
+        responds
+    :param jitter: the maximum number of seconds that is randomly added to
+        the latency
+    :param corpus_directory: serve the html files of this directory instead
+        of synthetic pages
+    :param seed: the random seed
+    :return: the fixture pages
+    """
+    rng = random.Random(seed)  # nosec B311
+
+    if corpus_directory is not None:
+        documents = [
+            document
+            for _, document in directory_corpus(corpus_directory, "html")
+        ]
+    else:
+        documents = []
+        for index in range(page_count):
+            document = generate_html(sizes[index % len(sizes)], seed + index)
+            for word, replacement in ACCENTED_REPLACEMENTS.items():
+                document = document.replace(word, replacement)
+            documents.append(document)
+
+    pages = []
+    for index, document in enumerate(documents):
+        charset = charsets[index % len(charsets)]
+        document = document.replace(
+            '<meta charset="utf-8">', f'<meta charset="{charset}">'
+        )
+        pages.append(
+            FixturePage(
+                content=document.encode(charset, errors="xmlcharrefreplace"),
+                charset=charset,
+                latency=latency + rng.uniform(0, jitter),
+            )
+        )
+
+    return pages
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        try:
+            index = int(self.path.split("/")[-1].split(".")[0])
+            page = self.server.pages[index]
+        except (ValueError, IndexError):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        if page.latency > 0:
+            time.sleep(page.latency)
+
+        content_type = "text/html"
+        if self.server.charset_header:
+            content_type += f"; charset={page.charset}"
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(page.content)))
+        self.end_headers()
+        self.wfile.write(page.content)
+
+
+class FixtureServer(object):
+    """A local http server that serves the fixture pages"""
+
+    def __init__(self, pages: List[FixturePage], charset_header: bool = True):
+        """Create a new FixtureServer object
+
+        :param pages: the pages to serve
+        :param charset_header: include the charset in the Content-Type
+            header. When it is False the client has to detect the charset.
+        """
+        self._server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), FixtureRequestHandler
+        )
+        self._server.daemon_threads = True
+        self._server.pages = pages
+        self._server.charset_header = charset_header
+        self._thread = None
+
+    @property
+    def urls(self) -> List[str]:
+        """The urls of the pages"""
+        host, port = self._server.server_address
+
+        return [
+            f"http://{host}:{port}/page/{index}.html"
+            for index in range(len(self._server.pages))
+        ]
+
+    def start(self):
+        """Start serving the pages in a background thread"""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the server"""
+        self._server.shutdown()
+        self._thread.join()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+_worker = threading.local()
+
+
+def _download(url: str) -> float:
+    from text_analysis_helpers.downloaders import download_web_page
+
+    started_at = time.perf_counter()
+    download_web_page(url)
+
+    return time.perf_counter() - started_at
+
+
+def _analyse(url: str) -> float:
+    from text_analysis_helpers.html import HtmlAnalyser
+
+    analyser = getattr(_worker, "analyser", None)
+    if analyser is None:
+        analyser = HtmlAnalyser()
+        _worker.analyser = analyser
+
+    started_at = time.perf_counter()
+    analyser.analyse_url(url)
+
+    return time.perf_counter() - started_at
+
+
+def _call(func, url: str) -> Tuple[Optional[float], Optional[str]]:
+    """Call the function and catch its errors
+
+    :return: the duration of the call, or None when it failed, and the name
+        of the exception type that was raised
+    """
+    try:
+        return func(url), None
+    except Exception as e:
+        return None, type(e).__name__
+
+
+def _download_url(url: str) -> Tuple[Optional[float], Optional[str]]:
+    return _call(_download, url)
+
+
+def _analyse_url(url: str) -> Tuple[Optional[float], Optional[str]]:
+    return _call(_analyse, url)
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """Calculate a percentile with linear interpolation
+
+    :param values: the values
+    :param percent: the percentile between 0 and 100
+    :return: the percentile
+    """
+    values = sorted(values)
+    position = (len(values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def peak_rss() -> int:
+    """The peak resident set size of this process and its children in bytes
+
+    The value can only increase during the lifetime of the process and only
+    the children that have exited are counted, so every concurrency level
+    is measured in a new process by `run_isolated_throughput_benchmark`.
+    """
+    # ru_maxrss is in kilobytes on linux and in bytes on macos
+    scale = 1 if sys.platform == "darwin" else 1024
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_usage = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+    return max(usage, children_usage) * scale
+
+
+def run_throughput_benchmark(
+    urls: List[str],
+    mode: str = "analyse",
+    concurrency: int = 1,
+    executor: str = "thread",
+) -> Dict:
+    """Download or analyse the urls concurrently and measure the throughput
+
+    :param urls: the urls to process
+    :param mode: `download` to only download the pages or `analyse` to
+        download and analyse them with `HtmlAnalyser.analyse_url`
+    :param concurrency: the number of workers
+    :param executor: run the workers in threads (`thread`) or in processes
+        (`process`)
+    :return: the benchmark result
+    """
+    func = _analyse_url if mode == "analyse" else _download_url
+    executor_class = (
+        ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    )
+
+    with executor_class(max_workers=concurrency) as pool:
+        # start the workers before measuring
+        list(pool.map(func, urls[:concurrency]))
+
+        started_at = time.perf_counter()
+        calls = list(pool.map(func, urls))
+        elapsed_time = time.perf_counter() - started_at
+
+    latencies = [duration for duration, _ in calls if duration is not None]
+    result = {
+        "mode": mode,
+        "executor": executor,
+        "concurrency": concurrency,
+        "pages": len(urls),
+        "failed": len(urls) - len(latencies),
+        "errors": dict(
+            Counter(error for _, error in calls if error is not None)
+        ),
+        "elapsed_time": elapsed_time,
+        "throughput": len(latencies) / elapsed_time,
+        "peak_rss": peak_rss(),
+    }
+    for percent in (50, 95, 99):
+        result[f"p{percent}"] = (
+            percentile(latencies, percent) if latencies else None
+        )
+
+    return result
+
+
+def run_isolated_throughput_benchmark(
+    urls: List[str],
+    mode: str = "analyse",
+    concurrency: int = 1,
+    executor: str = "thread",
+) -> Dict:
+    """Run `run_throughput_benchmark` in a new process
+
+    The peak RSS of the result covers only this benchmark run, since it is
+    measured in a process that hasn't run any other concurrency level.
+
+    :param urls: the urls to process
+    :param mode: `download` or `analyse`
+    :param concurrency: the number of workers
+    :param executor: `thread` or `process`
+    :return: the benchmark result
+    """
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        return pool.submit(
+            run_throughput_benchmark, urls, mode, concurrency, executor
+        ).result()
+
+
+def _format_latency(latency: Optional[float]) -> str:
+    return f"{latency * 1000:.1f}ms" if latency is not None else "-"
+
+
+def get_arguments():
+    parser = ArgumentParser(
+        description="measure the html download and analysis throughput "
+        "against a local http server"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["download", "analyse"],
+        default="analyse",
+        help="only download the pages or download and analyse them",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="the numbers of workers to measure",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=["thread", "process"],
+        default="thread",
+        help="run the workers in threads or in processes",
+    )
+    parser.add_argument(
+        "--pages", type=int, default=100, help="the number of pages"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_PAGE_SIZES),
+        help="the page sizes in bytes",
+    )
+    parser.add_argument(
+        "--charsets",
+        nargs="+",
+        default=list(DEFAULT_CHARSETS),
+        help="the charsets with which the pages are encoded",
+    )
+    parser.add_argument(
+        "--no-charset-header",
+        action="store_true",
+        help="don't include the charset in the Content-Type header",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="the server response latency in seconds",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="the maximum random latency in seconds to add to every page",
+    )
+    parser.add_argument(
+        "--corpus",
+        default=None,
+        help="serve the html files of this directory instead of synthetic "
+        "pages",
+    )
+    parser.add_argument(
+        "--output", default=None, help="save the results in this json file"
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    args = get_arguments()
+
+    pages = create_fixture_pages(
+        page_count=args.pages,
+        sizes=args.sizes,
+        charsets=args.charsets,
+        latency=args.latency,
+        jitter=args.jitter,
+        corpus_directory=args.corpus,
+    )
+
+    results = []
+    with FixtureServer(
+        pages, charset_header=not args.no_charset_header
+    ) as server:
+        print(
+            f"{'workers':>8}{'pages/s':>10}{'p50':>10}{'p95':>10}"
+            f"{'p99':>10}{'failed':>8}{'peak RSS':>12}"
+        )
+        for concurrency in args.concurrency:
+            result = run_isolated_throughput_benchmark(
+                server.urls, args.mode, concurrency, args.executor
+            )
+            results.append(result)
+            print(
+                f"{concurrency:>8}{result['throughput']:>10.1f}"
+                f"{_format_latency(result['p50']):>10}"
+                f"{_format_latency(result['p95']):>10}"
+                f"{_format_latency(result['p99']):>10}"
+                f"{result['failed']:>8}"
+                f"{result['peak_rss'] / 1024 / 1024:>10.1f}MB"
+            )
+            for error, count in result["errors"].items():
+                print(f"{'':>8}{count} pages failed with {error}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
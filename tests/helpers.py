@@ -0,0 +1,27 @@
+from text_analysis_helpers.models import TextAnalysisResult
+from text_analysis_helpers.text import calculate_text_statistics
+
+
+def create_analysis_result(
+    text: str = "hello world", **fields
+) -> TextAnalysisResult:
+    """Create a text analysis result with placeholder data
+
+    The statistics are those of a text with a single sentence.
+
+    :param text: the analysed text
+    :param fields: the result fields that replace the placeholder data
+    :return: the analysis result
+    """
+    data = {
+        "text": text,
+        "keywords": {"keyword_1": 1.0},
+        "readability_scores": {"flesch_reading_ease": 1.5},
+        "statistics": calculate_text_statistics([len(text.split())]),
+        "summary": text,
+        "named_entities": {"PERSON": {"john"}},
+        "language": "en",
+    }
+    data.update(fields)
+
+    return TextAnalysisResult(**data)
@@ -1,10 +1,24 @@
+import pickle
 from unittest import TestCase, main
 
 from nltk import sent_tokenize, word_tokenize
 from nltk.corpus import stopwords
 
 from tests.keywords.corpora import paper_abstract
-from text_analysis_helpers.keywords.rake import Rake
+from text_analysis_helpers.keywords.rake import (
+    Rake,
+    RakeAccumulator,
+    compile_delimiter_table,
+    split_candidate_keywords,
+)
+from text_analysis_helpers.tokenizers import (
+    simple_sentence_tokenize,
+    simple_word_tokenize,
+)
+
+
+def split_sentences(document):
+    return document.split(". ")
 
 
 class RakeTests(TestCase):
@@ -66,5 +80,187 @@ class RakeTests(TestCase):
         self.assertDictEqual(keywords, {})
 
 
+class RakeAccumulatorTests(TestCase):
+    def setUp(self):
+        self.rake = Rake(
+            word_tokenizer=simple_word_tokenize,
+            sentence_tokenizer=simple_sentence_tokenize,
+            stop_words=["of", "the", "and", "for", "a", "are", "is", "in"],
+        )
+
+    def test_scores(self):
+        keywords = self.rake.extract_keywords(paper_abstract)
+        counts = self.rake.count_keywords(paper_abstract)
+
+        self.assertEqual(
+            {keyword.lower(): score for keyword, score in keywords.items()},
+            {
+                keyword.lower(): score
+                for keyword, score in counts.result().items()
+            },
+        )
+
+    def test_merge(self):
+        paragraphs = [
+            "Linear Diophantine equations are solved. The solutions are "
+            "minimal.",
+            "A system of linear diophantine equations. The minimal solutions "
+            "of the system.",
+        ]
+
+        counts = RakeAccumulator()
+        for paragraph in paragraphs:
+            counts.merge(self.rake.count_keywords(paragraph))
+
+        self.assertEqual(
+            counts.result(),
+            self.rake.count_keywords(" ".join(paragraphs)).result(),
+        )
+        self.assertIn("Linear Diophantine equations", counts.result())
+
+    def test_update_in_batches(self):
+        rake = Rake(
+            word_tokenizer=str.split,
+            sentence_tokenizer=split_sentences,
+            stop_words=["of", "the", "and", "for", "a", "are", "is", "in"],
+            delimiters=[",", "."],
+        )
+        sentences = [
+            "linear diophantine equations are solved",
+            "the solutions are minimal",
+            "a system of linear diophantine equations",
+            "the minimal solutions of the system",
+            "minimal generating sets , minimal supporting sets",
+        ]
+
+        first_accumulator = rake.accumulator().update(sentences[:2])
+        second_accumulator = rake.accumulator()
+        for sentence in sentences[2:]:
+            second_accumulator.update([sentence])
+        second_accumulator = pickle.loads(pickle.dumps(second_accumulator))
+        first_accumulator.merge(second_accumulator)
+
+        keywords = rake.extract_keywords(". ".join(sentences))
+        self.assertEqual(first_accumulator.result(), keywords)
+        self.assertEqual(
+            first_accumulator.result(top_k=2),
+            {
+                "linear diophantine equations": keywords[
+                    "linear diophantine equations"
+                ],
+                "minimal generating sets": keywords["minimal generating sets"],
+            },
+        )
+
+    def test_update_without_rake(self):
+        with self.assertRaises(ValueError):
+            RakeAccumulator().update(["linear diophantine equations"])
+
+
+class RakeKeywordSelectionTests(TestCase):
+    def create_rake(self, **kwargs):
+        return Rake(
+            word_tokenizer=simple_word_tokenize,
+            sentence_tokenizer=simple_sentence_tokenize,
+            stop_words=["of", "the", "and", "for", "a", "are", "is", "in"],
+            **kwargs,
+        )
+
+    def setUp(self):
+        self.keywords = self.create_rake().extract_keywords(paper_abstract)
+
+    def test_top_k(self):
+        keywords = self.create_rake(top_k=3).extract_keywords(paper_abstract)
+
+        expected_keywords = sorted(
+            self.keywords.items(), key=lambda item: item[1], reverse=True
+        )[:3]
+        self.assertEqual(list(keywords.items()), expected_keywords)
+        self.assertEqual(
+            self.create_rake(top_k=3).count_keywords(paper_abstract).result(),
+            keywords,
+        )
+
+    def test_min_score(self):
+        keywords = self.create_rake(min_score=4.0).extract_keywords(
+            paper_abstract
+        )
+
+        self.assertEqual(
+            keywords,
+            {
+                keyword: score
+                for keyword, score in self.keywords.items()
+                if score >= 4.0
+            },
+        )
+        self.assertTrue(keywords)
+
+    def test_max_words(self):
+        keywords = self.create_rake(max_words=2).extract_keywords(
+            paper_abstract
+        )
+
+        self.assertTrue(keywords)
+        self.assertTrue(all(len(keyword.split()) <= 2 for keyword in keywords))
+        self.assertLess(len(keywords), len(self.keywords))
+
+
+class RakeDelimiterTableTests(TestCase):
+    def create_rake(self):
+        return Rake(
+            word_tokenizer=simple_word_tokenize,
+            sentence_tokenizer=simple_sentence_tokenize,
+            stop_words=["of", "the", "isn't"],
+            delimiters=[",", "."],
+        )
+
+    def test_delimiter_table(self):
+        rake = self.create_rake()
+
+        for word in ["of", "The", "Isn't", ",", "."]:
+            self.assertTrue(rake._is_delimiter(word), word)
+        for word in ["system", "?"]:
+            self.assertFalse(rake._is_delimiter(word), word)
+
+    def test_delimiter_table_is_shared(self):
+        self.assertIs(
+            self.create_rake()._delimiter_table,
+            self.create_rake()._delimiter_table,
+        )
+
+    def test_delimiter_table_cache_is_bounded(self):
+        maxsize = compile_delimiter_table.cache_info().maxsize
+        for _ in range(maxsize + 1):
+            compile_delimiter_table(
+                ("of",), (",",), lambda text: simple_word_tokenize(text)
+            )
+
+        self.assertEqual(
+            compile_delimiter_table.cache_info().currsize, maxsize
+        )
+
+    def test_split_candidate_keywords(self):
+        delimiter_table = self.create_rake()._delimiter_table
+
+        self.assertEqual(
+            list(
+                split_candidate_keywords(
+                    [
+                        ["The", "history", "of", "linear", "systems", "."],
+                        ["", "Compatibility", "isn't", "minimal"],
+                    ],
+                    delimiter_table,
+                )
+            ),
+            [
+                ["history"],
+                ["linear", "systems"],
+                ["Compatibility"],
+                ["minimal"],
+            ],
+        )
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,155 @@
+import os
+import pickle
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from text_analysis_helpers.keywords.tfidf import (
+    IdfIndex,
+    IdfIndexBuilder,
+    NgramExtractor,
+    TfidfKeywordExtractor,
+    calculate_idf,
+)
+from text_analysis_helpers.tokenizers import (
+    simple_sentence_tokenize,
+    simple_word_tokenize,
+)
+
+CORPUS = [
+    "Read our cookie policy. Linear diophantine equations are solved.",
+    "Read our cookie policy. Minimal generating sets are constructed.",
+    "Read our cookie policy. The linear constraints are strict.",
+]
+
+
+def create_ngram_extractor():
+    return NgramExtractor(
+        word_tokenizer=simple_word_tokenize,
+        sentence_tokenizer=simple_sentence_tokenize,
+        stop_words=["our", "are", "the"],
+        max_ngram_size=2,
+    )
+
+
+class NgramExtractorTests(TestCase):
+    def test_count_ngrams(self):
+        ngram_counts = create_ngram_extractor().count_ngrams(
+            "Linear diophantine equations. The linear equations."
+        )
+
+        self.assertEqual(
+            ngram_counts,
+            {
+                "linear": ("Linear", 2),
+                "linear diophantine": ("Linear diophantine", 1),
+                "diophantine": ("diophantine", 1),
+                "diophantine equations": ("diophantine equations", 1),
+                "equations": ("equations", 2),
+                "linear equations": ("linear equations", 1),
+            },
+        )
+
+
+class IdfIndexTests(TestCase):
+    def setUp(self):
+        builder = IdfIndexBuilder(
+            create_ngram_extractor(), min_document_frequency=1
+        )
+        for document in CORPUS:
+            builder.add_document(document)
+        self.index = builder.build()
+
+        self.temporary_directory = TemporaryDirectory()
+        self.filename = os.path.join(self.temporary_directory.name, "idf.bin")
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_idf(self):
+        self.assertAlmostEqual(
+            self.index.idf("cookie policy"), calculate_idf(3, 3), places=6
+        )
+        self.assertAlmostEqual(
+            self.index.idf("linear"), calculate_idf(3, 2), places=6
+        )
+        self.assertAlmostEqual(
+            self.index.idf("unknown term"), calculate_idf(3, 0), places=6
+        )
+
+    def test_save_and_load(self):
+        self.index.save(self.filename)
+
+        index = IdfIndex.load(self.filename)
+
+        self.assertEqual(len(index), len(self.index))
+        self.assertEqual(index.document_count, 3)
+        self.assertEqual(
+            index.lookup(["linear", "cookie policy", "unknown term"]),
+            self.index.lookup(["linear", "cookie policy", "unknown term"]),
+        )
+
+        unpickled_index = pickle.loads(pickle.dumps(index))
+        self.assertEqual(unpickled_index.filename, self.filename)
+        self.assertEqual(
+            unpickled_index.idf("linear"), self.index.idf("linear")
+        )
+
+    def test_min_document_frequency(self):
+        builder = IdfIndexBuilder(
+            create_ngram_extractor(), min_document_frequency=2
+        )
+        for document in CORPUS:
+            builder.add_document(document)
+
+        index = builder.build()
+
+        self.assertAlmostEqual(
+            index.idf("linear"), calculate_idf(3, 2), places=6
+        )
+        self.assertAlmostEqual(index.idf("strict"), index.default_idf)
+
+    def test_empty_index(self):
+        IdfIndexBuilder(create_ngram_extractor()).build().save(self.filename)
+
+        index = IdfIndex.load(self.filename)
+
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.lookup(["linear"]), [index.default_idf])
+
+    def test_load_invalid_file(self):
+        with open(self.filename, "wb") as f:
+            f.write(b"\0" * 24)
+
+        with self.assertRaises(ValueError):
+            IdfIndex.load(self.filename)
+
+
+class TfidfKeywordExtractorTests(TestCase):
+    def setUp(self):
+        builder = IdfIndexBuilder(
+            create_ngram_extractor(), min_document_frequency=1
+        )
+        for document in CORPUS:
+            builder.add_document(document)
+        self.index = builder.build()
+
+    def test_extract_keywords(self):
+        extractor = TfidfKeywordExtractor(
+            self.index, create_ngram_extractor(), top_k=2
+        )
+
+        keywords = extractor.extract_keywords(CORPUS[0])
+
+        self.assertEqual(list(keywords), ["Linear diophantine", "diophantine"])
+
+    def test_boilerplate_has_low_score(self):
+        extractor = TfidfKeywordExtractor(self.index, create_ngram_extractor())
+
+        keywords = extractor.extract_keywords(CORPUS[0])
+
+        self.assertLess(keywords["cookie policy"], keywords["Linear"])
+        self.assertLess(keywords["Linear"], keywords["diophantine equations"])
+
+
+if __name__ == "__main__":
+    main()
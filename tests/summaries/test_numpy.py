@@ -0,0 +1,120 @@
+import random
+import tracemalloc
+from unittest import TestCase
+from unittest.mock import patch
+
+from text_analysis_helpers.summaries.numpy import NumpySummarizer
+from text_analysis_helpers.text import TextAnalyser
+from text_analysis_helpers.tokenizers import (
+    simple_sentence_tokenize,
+    simple_word_tokenize,
+)
+
+STOP_WORDS = ["the", "a", "of", "and", "on", "in", "is", "it", "to", "from"]
+
+DOCUMENT = (
+    "The cat sat on the mat. The cat chased the mouse around the house. A "
+    "bird sang outside. The mouse hid from the cat in the house. It rained "
+    "in the evening."
+)
+
+
+def create_summarizer(**kwargs):
+    return NumpySummarizer(
+        word_tokenizer=simple_word_tokenize,
+        sentence_tokenizer=simple_sentence_tokenize,
+        stop_words=STOP_WORDS,
+        **kwargs,
+    )
+
+
+class NumpySummarizerTests(TestCase):
+    def test_summarize_with_text_rank(self):
+        summarizer = create_summarizer(sentence_count=2)
+
+        summary = summarizer.summarize(DOCUMENT)
+
+        self.assertEqual(
+            summary,
+            "The cat chased the mouse around the house. The mouse hid from "
+            "the cat in the house.",
+        )
+
+    def test_text_rank_similarities_in_blocks(self):
+        summary = create_summarizer(sentence_count=2).summarize(DOCUMENT)
+
+        for max_block_size in [1, 5, 20]:
+            summarizer = create_summarizer(
+                sentence_count=2, max_block_size=max_block_size
+            )
+
+            self.assertEqual(summarizer.summarize(DOCUMENT), summary)
+
+    def test_text_rank_memory(self):
+        generator = random.Random(0)
+        vocabulary = [f"word{index}" for index in range(2000)]
+        sentence_words = [
+            generator.sample(vocabulary, 10) + ["."] for _ in range(20000)
+        ]
+        sentences = [" ".join(words) for words in sentence_words]
+        summarizer = create_summarizer(sentence_count=3)
+
+        tracemalloc.start()
+        try:
+            summary = summarizer.summarize_sentences(sentences, sentence_words)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(summary.count("."), 3)
+        # the dense similarity matrix alone would need 3.2GB
+        self.assertLess(peak, 200 * 1024 * 1024)
+
+    def test_summarize_with_centroid(self):
+        summarizer = create_summarizer(sentence_count=1, algorithm="centroid")
+
+        summary = summarizer.summarize(DOCUMENT)
+
+        self.assertEqual(summary, "The cat chased the mouse around the house.")
+
+    def test_summarize_short_document(self):
+        summarizer = create_summarizer(sentence_count=2)
+
+        self.assertEqual(summarizer.summarize(""), "")
+        self.assertEqual(
+            summarizer.summarize("A bird sang outside."),
+            "A bird sang outside.",
+        )
+
+    def test_summarize_sentences_without_terms(self):
+        summarizer = create_summarizer(sentence_count=1)
+
+        summary = summarizer.summarize_sentences(
+            ["It was the.", "It is.", "A the."],
+            [["It", "was", "the", "."], ["It", "is", "."], ["A", "the", "."]],
+        )
+
+        self.assertEqual(summary, "It was the.")
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            create_summarizer(algorithm="unknown")
+
+    def test_text_analyser_reuses_the_tokens(self):
+        summarizer = create_summarizer(sentence_count=2)
+        analyser = TextAnalyser(
+            summarizer=summarizer,
+            word_tokenizer=simple_word_tokenize,
+            sentence_tokenizer=simple_sentence_tokenize,
+            readability_scores=("automated_readability_index",),
+            disabled_stages=["keywords", "named_entities"],
+        )
+
+        with patch.object(
+            summarizer, "summarize", side_effect=AssertionError()
+        ):
+            analysis_result = analyser.analyse(DOCUMENT)
+
+        self.assertEqual(
+            analysis_result.summary, summarizer.summarize(DOCUMENT)
+        )
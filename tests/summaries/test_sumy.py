@@ -1,6 +1,10 @@
 from unittest import TestCase
 
 from text_analysis_helpers.summaries.sumy import SumySummarizer
+from text_analysis_helpers.tokenizers import (
+    simple_sentence_tokenize,
+    simple_word_tokenize,
+)
 
 
 class SumySummarizerTests(TestCase):
@@ -34,3 +38,34 @@ class SumySummarizerTests(TestCase):
         summary = summarizer.summarize("")
 
         self.assertEqual(summary, "")
+
+    def test_summarize_with_luhn(self):
+        summarizer = SumySummarizer(sentence_count=1, algorithm="luhn")
+        document = (
+            "The cat sat on the mat. The cat chased the mouse around the "
+            "house. A bird sang outside."
+        )
+
+        summary = summarizer.summarize(document)
+
+        self.assertIn(summary, document)
+
+    def test_summarize_with_tokenizers(self):
+        summarizer = SumySummarizer(
+            sentence_count=1,
+            algorithm="luhn",
+            word_tokenizer=simple_word_tokenize,
+            sentence_tokenizer=simple_sentence_tokenize,
+        )
+        document = (
+            "The cat sat on the mat. The cat chased the mouse around the "
+            "house. A bird sang outside."
+        )
+
+        summary = summarizer.summarize(document)
+
+        self.assertEqual(summary, "The cat sat on the mat.")
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            SumySummarizer(algorithm="unknown")
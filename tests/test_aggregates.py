@@ -0,0 +1,200 @@
+import random
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+import numpy as np
+
+from tests.helpers import create_analysis_result
+from text_analysis_helpers.aggregates import (
+    CorpusAggregate,
+    HeavyHitters,
+    QuantileSketch,
+    aggregate_files,
+)
+from text_analysis_helpers.serializers import BinaryWriter, JsonLinesWriter
+from text_analysis_helpers.text import calculate_text_statistics
+
+
+class QuantileSketchTests(TestCase):
+    def setUp(self):
+        generator = random.Random(0)
+        self.values = [generator.lognormvariate(3, 1) for _ in range(5000)]
+        self.values += [-value for value in self.values[:500]] + [0.0] * 10
+
+    def test_quantile(self):
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in self.values:
+            sketch.add(value)
+
+        for q in [0.0, 0.01, 0.25, 0.5, 0.75, 0.99, 1.0]:
+            expected = np.quantile(self.values, q, method="lower")
+            self.assertAlmostEqual(
+                sketch.quantile(q), expected, delta=abs(expected) * 0.011
+            )
+        self.assertEqual(sketch.quantile(0.0), min(self.values))
+        self.assertEqual(sketch.quantile(1.0), max(self.values))
+
+    def test_merge(self):
+        sketch = QuantileSketch()
+        for value in self.values:
+            sketch.add(value)
+
+        merged_sketch = QuantileSketch()
+        for start in range(0, len(self.values), 1000):
+            end = start + 1000
+            shard_sketch = QuantileSketch()
+            for value in self.values[start:end]:
+                shard_sketch.add(value)
+            merged_sketch.merge(shard_sketch)
+
+        self.assertEqual(merged_sketch.count, sketch.count)
+        for q in [0.1, 0.5, 0.9]:
+            self.assertEqual(merged_sketch.quantile(q), sketch.quantile(q))
+
+        with self.assertRaises(ValueError):
+            sketch.merge(QuantileSketch(relative_accuracy=0.05))
+
+    def test_max_buckets(self):
+        sketch = QuantileSketch(max_buckets=200)
+        for value in self.values:
+            sketch.add(value)
+
+        self.assertLessEqual(len(sketch._positive_buckets), 200)
+        self.assertAlmostEqual(
+            sketch.quantile(0.99),
+            np.quantile(self.values, 0.99, method="lower"),
+            delta=np.quantile(self.values, 0.99) * 0.011,
+        )
+
+    def test_empty_sketch(self):
+        self.assertIsNone(QuantileSketch().quantile(0.5))
+        self.assertEqual(QuantileSketch().report(), {"count": 0})
+
+
+class HeavyHittersTests(TestCase):
+    def test_top(self):
+        generator = random.Random(0)
+        items = [
+            f"item {int(generator.paretovariate(1))}" for _ in range(5000)
+        ]
+        expected_counts = {}
+        for item in items:
+            expected_counts[item] = expected_counts.get(item, 0) + 1
+
+        heavy_hitters = HeavyHitters(capacity=10)
+        for item in items:
+            heavy_hitters.add(item)
+
+        top = heavy_hitters.top(3)
+        expected_top = sorted(
+            expected_counts.items(), key=lambda item: item[1], reverse=True
+        )[:3]
+        self.assertEqual(
+            [item for item, _ in top], [i for i, _ in expected_top]
+        )
+        for item, count in top:
+            self.assertLessEqual(count, expected_counts[item])
+            self.assertLessEqual(
+                expected_counts[item], count + heavy_hitters.error
+            )
+        self.assertLessEqual(len(heavy_hitters._counts), 20)
+
+    def test_merge(self):
+        first = HeavyHitters(capacity=2)
+        second = HeavyHitters(capacity=2)
+        for item in "aaabbc":
+            first.add(item)
+        for item in "aabbbd":
+            second.add(item)
+
+        first.merge(second)
+
+        self.assertEqual(first.top(2), [("a", 5), ("b", 5)])
+
+
+class CorpusAggregateTests(TestCase):
+    def setUp(self):
+        self.results = [
+            create_analysis_result(
+                f"document {index}",
+                keywords={"Common Keyword": 2.0, f"keyword {index % 3}": 1.0},
+                readability_scores={
+                    "flesch_reading_ease": float(index),
+                    "text_standard": "8th and 9th grade",
+                },
+                statistics=calculate_text_statistics([index + 1, 5]),
+                summary="",
+                named_entities={"PERSON": {"john", f"person {index % 2}"}},
+                language="en" if index % 4 else "el",
+            )
+            for index in range(12)
+        ]
+
+    def test_report(self):
+        aggregate = CorpusAggregate()
+        for result in self.results[:8]:
+            aggregate.add(result.as_dict())
+
+        report = aggregate.report(top=2)
+
+        self.assertEqual(report["document_count"], 8)
+        self.assertEqual(report["languages"], {"en": 6, "el": 2})
+        self.assertEqual(
+            report["keywords"][0],
+            {"keyword": "common keyword", "documents": 8},
+        )
+        self.assertEqual(
+            report["named_entities"][0],
+            {"type": "PERSON", "entity": "john", "documents": 8},
+        )
+        self.assertEqual(
+            set(report["readability_scores"]), {"flesch_reading_ease"}
+        )
+        flesch_reading_ease = report["readability_scores"][
+            "flesch_reading_ease"
+        ]
+        self.assertEqual(flesch_reading_ease["count"], 8)
+        self.assertEqual(flesch_reading_ease["min"], 0.0)
+        self.assertEqual(flesch_reading_ease["max"], 7.0)
+        self.assertEqual(report["statistics"]["word_count"]["mean"], 9.5)
+
+    def test_aggregate_files(self):
+        with TemporaryDirectory() as temp_dir:
+            filenames = []
+            for shard in range(3):
+                filename = path.join(temp_dir, f"results_{shard}.jsonl.gz")
+                start, end = shard * 4, shard * 4 + 4
+                with JsonLinesWriter(filename) as writer:
+                    for result in self.results[start:end]:
+                        writer.write(result)
+                filenames.append(filename)
+
+            binary_filename = path.join(temp_dir, "results.bin")
+            with BinaryWriter(binary_filename) as writer:
+                for result in self.results:
+                    writer.write(result)
+
+            aggregate = CorpusAggregate()
+            for result in self.results:
+                aggregate.add(result.as_dict())
+            expected_report = aggregate.report()
+
+            self.assertEqual(
+                aggregate_files(filenames, max_workers=0).report(),
+                expected_report,
+            )
+            self.assertEqual(
+                aggregate_files(filenames, max_workers=2).report(),
+                expected_report,
+            )
+            self.assertEqual(
+                aggregate_files(
+                    [binary_filename], result_format="binary", max_workers=0
+                ).report(),
+                expected_report,
+            )
+
+
+if __name__ == "__main__":
+    main()
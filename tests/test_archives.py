@@ -0,0 +1,217 @@
+import gzip
+import os
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from text_analysis_helpers.archives import (
+    decode_html,
+    read_html_directory,
+    read_warc,
+    read_web_pages,
+)
+
+
+def create_warc_record(headers: dict, block: bytes) -> bytes:
+    header_lines = [b"WARC/1.0"]
+    for name, value in headers.items():
+        header_lines.append(f"{name}: {value}".encode("latin-1"))
+    header_lines.append(f"Content-Length: {len(block)}".encode("latin-1"))
+
+    return b"\r\n".join(header_lines) + b"\r\n\r\n" + block + b"\r\n\r\n"
+
+
+def create_response_record(
+    url: str, body: bytes, status: str = "200 OK", http_headers=None
+) -> bytes:
+    http_headers = http_headers or {"Content-Type": "text/html"}
+    http_header_block = b"".join(
+        f"{name}: {value}\r\n".encode("latin-1")
+        for name, value in http_headers.items()
+    )
+    block = (
+        f"HTTP/1.1 {status}\r\n".encode("latin-1")
+        + http_header_block
+        + b"\r\n"
+        + body
+    )
+
+    return create_warc_record(
+        {
+            "WARC-Type": "response",
+            "WARC-Target-URI": url,
+            "Content-Type": "application/http; msgtype=response",
+        },
+        block,
+    )
+
+
+class ReadWarcTests(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+
+        self.records = b"".join(
+            [
+                create_warc_record(
+                    {"WARC-Type": "warcinfo", "Content-Type": "text/plain"},
+                    b"software: test",
+                ),
+                create_response_record(
+                    "http://www.example.com/page_1.html",
+                    b"<html><title>page 1</title></html>",
+                ),
+                create_warc_record(
+                    {
+                        "WARC-Type": "request",
+                        "WARC-Target-URI": "http://www.example.com/",
+                        "Content-Type": "application/http; msgtype=request",
+                    },
+                    b"GET / HTTP/1.1\r\n\r\n",
+                ),
+                create_response_record(
+                    "http://www.example.com/missing.html",
+                    b"<html>not found</html>",
+                    status="404 Not Found",
+                ),
+                create_response_record(
+                    "http://www.example.com/image.png",
+                    b"not html",
+                    http_headers={"Content-Type": "image/png"},
+                ),
+                create_response_record(
+                    "http://www.example.com/page_2.html",
+                    "<html><title>σελίδα 2</title></html>".encode(
+                        "iso-8859-7"
+                    ),
+                    http_headers={
+                        "Content-Type": "text/html; charset=iso-8859-7"
+                    },
+                ),
+                create_warc_record(
+                    {
+                        "WARC-Type": "resource",
+                        "WARC-Target-URI": "file:///page_3.html",
+                        "Content-Type": "text/html",
+                    },
+                    b"<html><title>page 3</title></html>",
+                ),
+            ]
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def assert_web_pages(self, web_pages):
+        self.assertEqual(len(web_pages), 3)
+        self.assertEqual(
+            web_pages[0].url, "http://www.example.com/page_1.html"
+        )
+        self.assertEqual(
+            web_pages[0].html, "<html><title>page 1</title></html>"
+        )
+        self.assertEqual(
+            web_pages[1].url, "http://www.example.com/page_2.html"
+        )
+        self.assertEqual(
+            web_pages[1].html, "<html><title>σελίδα 2</title></html>"
+        )
+        self.assertEqual(web_pages[2].url, "file:///page_3.html")
+        self.assertEqual(
+            web_pages[2].html, "<html><title>page 3</title></html>"
+        )
+
+    def test_read_warc(self):
+        filename = path.join(self.temp_dir.name, "archive.warc")
+        with open(filename, "wb") as f:
+            f.write(self.records)
+
+        self.assert_web_pages(list(read_warc(filename)))
+
+    def test_read_compressed_warc(self):
+        filename = path.join(self.temp_dir.name, "archive.warc.gz")
+        with gzip.open(filename, "wb") as f:
+            f.write(self.records)
+
+        self.assert_web_pages(list(read_web_pages(filename)))
+
+    def test_skip_large_records(self):
+        filename = path.join(self.temp_dir.name, "archive.warc")
+        with open(filename, "wb") as f:
+            f.write(
+                create_response_record(
+                    "http://www.example.com/large.html",
+                    b"<html>" + b"a" * 1000 + b"</html>",
+                )
+            )
+            f.write(
+                create_response_record(
+                    "http://www.example.com/small.html", b"<html>a</html>"
+                )
+            )
+
+        web_pages = list(read_warc(filename, max_record_size=100))
+
+        self.assertEqual(len(web_pages), 1)
+        self.assertEqual(web_pages[0].url, "http://www.example.com/small.html")
+
+    def test_read_chunked_response(self):
+        filename = path.join(self.temp_dir.name, "archive.warc")
+        with open(filename, "wb") as f:
+            f.write(
+                create_response_record(
+                    "http://www.example.com/page.html",
+                    b"6\r\n<html>\r\n7\r\n</html>\r\n0\r\n\r\n",
+                    http_headers={
+                        "Content-Type": "text/html",
+                        "Transfer-Encoding": "chunked",
+                    },
+                )
+            )
+
+        web_pages = list(read_warc(filename))
+
+        self.assertEqual(len(web_pages), 1)
+        self.assertEqual(web_pages[0].html, "<html></html>")
+
+
+class ReadHtmlDirectoryTests(TestCase):
+    def test_read_html_directory(self):
+        with TemporaryDirectory() as temp_dir:
+            os.mkdir(path.join(temp_dir, "pages"))
+            with open(path.join(temp_dir, "pages", "page_2.htm"), "w") as f:
+                f.write("<html>page 2</html>")
+            with open(path.join(temp_dir, "page_1.html"), "w") as f:
+                f.write("<html>page 1</html>")
+            with open(path.join(temp_dir, "notes.txt"), "w") as f:
+                f.write("not html")
+
+            web_pages = list(read_html_directory(temp_dir))
+
+            self.assertEqual(len(web_pages), 2)
+            self.assertTrue(web_pages[0].url.startswith("file:///"))
+            self.assertTrue(web_pages[0].url.endswith("/page_1.html"))
+            self.assertEqual(web_pages[0].html, "<html>page 1</html>")
+            self.assertTrue(web_pages[1].url.endswith("/pages/page_2.htm"))
+            self.assertEqual(web_pages[1].html, "<html>page 2</html>")
+
+
+class DecodeHtmlTests(TestCase):
+    def test_decode_html_with_meta_charset(self):
+        content = '<html><meta charset="iso-8859-7">σελίδα</html>'.encode(
+            "iso-8859-7"
+        )
+
+        self.assertEqual(
+            decode_html(content),
+            '<html><meta charset="iso-8859-7">σελίδα</html>',
+        )
+
+    def test_decode_html_with_unknown_charset(self):
+        self.assertEqual(
+            decode_html(b"<html>page</html>", "unknown-charset"),
+            "<html>page</html>",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import random
+from os import path
+from unittest import TestCase, main
+
+from articles.mss.extractors import MSSArticleExtractor
+
+from text_analysis_helpers.article_templates import (
+    LinearMSSArticleExtractor,
+    TemplateArticleExtractor,
+    find_maximum_subsequence,
+)
+
+page_template = """<html>
+<head><title>page {page}</title></head>
+<body>
+    <div id="menu"><ul><li>home</li><li>news</li><li>about</li></ul></div>
+    <div id="content">
+        <h1>Article {page}</h1>
+        <p>{paragraph}</p>
+        <p>{paragraph}</p>
+    </div>
+    <div id="footer"><p>copyright</p></div>
+</body>
+</html>"""
+
+changed_page_template = """<html>
+<head><title>page {page}</title></head>
+<body>
+    <div id="content"><p>moved</p></div>
+    <div id="menu"><ul><li>home</li><li>news</li><li>about</li></ul></div>
+    <section><h1>Article {page}</h1><p>{paragraph}</p></section>
+</body>
+</html>"""
+
+
+def create_page(page: int, template: str = page_template) -> str:
+    paragraph = " ".join(
+        f"word{page}_{i} sentence text" for i in range(10 + page)
+    )
+
+    return template.format(page=page, paragraph=paragraph)
+
+
+class TemplateArticleExtractorTests(TestCase):
+    def test_learn_domain_template(self):
+        extractor = TemplateArticleExtractor(learning_pages=3)
+        mss_extractor = MSSArticleExtractor()
+
+        for page in range(3):
+            document = create_page(page)
+            article = extractor.extract_article(
+                document, url=f"http://www.example.com/{page}.html"
+            )
+            self.assertEqual(article, mss_extractor.extract_article(document))
+
+        self.assertTrue(
+            extractor.template_path("www.example.com").endswith("body/div[2]")
+        )
+        self.assertIsNone(extractor.template_path("www.example.org"))
+
+        document = create_page(3)
+        article = extractor.extract_article(
+            document, url="http://www.example.com/3.html"
+        )
+        self.assertTrue(article.startswith("Article 3\n\nword3_0"))
+        self.assertNotIn("copyright", article)
+        self.assertNotIn("home", article)
+
+        statistics = extractor.statistics()
+        self.assertEqual(statistics.full_extractions, 3)
+        self.assertEqual(statistics.fast_path_hits, 1)
+        self.assertEqual(statistics.fast_path_misses, 0)
+        self.assertEqual(statistics.learned_domains, 1)
+        self.assertEqual(statistics.hit_rate, 0.25)
+
+    def test_fall_back_to_full_extraction(self):
+        extractor = TemplateArticleExtractor(learning_pages=2, max_failures=2)
+        mss_extractor = MSSArticleExtractor()
+
+        for page in range(2):
+            extractor.extract_article(
+                create_page(page), url=f"http://www.example.com/{page}.html"
+            )
+
+        for page in range(2, 4):
+            document = create_page(page, changed_page_template)
+            article = extractor.extract_article(
+                document, url=f"http://www.example.com/{page}.html"
+            )
+            self.assertEqual(article, mss_extractor.extract_article(document))
+
+        statistics = extractor.statistics()
+        self.assertEqual(statistics.fast_path_misses, 2)
+        self.assertIsNone(extractor.template_path("www.example.com"))
+
+    def test_extract_article_without_url(self):
+        extractor = TemplateArticleExtractor()
+
+        tests_dir = path.dirname(path.abspath(__file__))
+        page_file = path.join(tests_dir, "data", "page1.html")
+        with open(page_file) as f:
+            content = f.read()
+
+        self.assertEqual(
+            extractor.extract_article(content),
+            MSSArticleExtractor().extract_article(content),
+        )
+        self.assertEqual(extractor.statistics().full_extractions, 1)
+
+    def test_evict_least_recently_used_domains(self):
+        extractor = TemplateArticleExtractor(learning_pages=1, max_domains=2)
+
+        for domain in ["a.example.com", "b.example.com", "c.example.com"]:
+            extractor.extract_article(
+                create_page(1), url=f"http://{domain}/1.html"
+            )
+
+        self.assertIsNone(extractor.template_path("a.example.com"))
+        self.assertIsNotNone(extractor.template_path("b.example.com"))
+        self.assertIsNotNone(extractor.template_path("c.example.com"))
+
+
+class LinearMSSArticleExtractorTests(TestCase):
+    def test_find_maximum_subsequence(self):
+        generator = random.Random(0)
+        mss_extractor = MSSArticleExtractor()
+        for size in [0, 1, 2, 10, 100]:
+            scores = [generator.uniform(-1, 1) for _ in range(size)]
+
+            self.assertEqual(
+                find_maximum_subsequence(scores),
+                mss_extractor._find_maximum_subsequence(scores),
+            )
+
+    def test_extract_article(self):
+        tests_dir = path.dirname(path.abspath(__file__))
+        with open(path.join(tests_dir, "data", "page1.html")) as f:
+            content = f.read()
+
+        for document in [content, create_page(1)]:
+            self.assertEqual(
+                LinearMSSArticleExtractor().extract_article(document),
+                MSSArticleExtractor().extract_article(document),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+from unittest import TestCase, main
+
+from text_analysis_helpers.batch import analyse_web_pages
+from text_analysis_helpers.exceptions import NoContentError
+from text_analysis_helpers.models import WebPage
+
+
+class FakeHtmlAnalyser(object):
+    def analyse(self, web_page):
+        if len(web_page.html) == 0:
+            raise NoContentError()
+
+        return web_page.url, len(web_page.html)
+
+
+class AnalyseWebPagesTests(TestCase):
+    def test_analyse_web_pages(self):
+        web_pages = (
+            WebPage(
+                url=f"http://www.example.com/page_{i}.html",
+                html="a" * (i % 5),
+            )
+            for i in range(20)
+        )
+
+        results = list(
+            analyse_web_pages(
+                web_pages,
+                analyser_factory=FakeHtmlAnalyser,
+                max_workers=2,
+                max_pending=3,
+            )
+        )
+
+        self.assertEqual(
+            results,
+            [
+                (f"http://www.example.com/page_{i}.html", i % 5)
+                for i in range(20)
+                if i % 5 != 0
+            ],
+        )
+
+    def test_analyse_web_pages_in_process(self):
+        web_pages = [
+            WebPage(url="http://www.example.com/page_1.html", html="aaa"),
+            WebPage(url="http://www.example.com/page_2.html", html=""),
+        ]
+
+        results = list(
+            analyse_web_pages(
+                web_pages, analyser_factory=FakeHtmlAnalyser, max_workers=0
+            )
+        )
+
+        self.assertEqual(results, [("http://www.example.com/page_1.html", 3)])
+
+
+if __name__ == "__main__":
+    main()
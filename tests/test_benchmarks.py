@@ -0,0 +1,152 @@
+import json
+from os import listdir, path
+from unittest import TestCase, main
+
+from benchmarks.corpus import generate_html, generate_text
+from benchmarks.stages import BENCHMARKS, compare_results
+from benchmarks.throughput import (
+    FixtureServer,
+    create_fixture_pages,
+    percentile,
+    run_isolated_throughput_benchmark,
+    run_throughput_benchmark,
+)
+
+
+class CorpusTests(TestCase):
+    def test_generate_text(self):
+        text = generate_text(10 * 1024, seed=1)
+
+        self.assertEqual(text, generate_text(10 * 1024, seed=1))
+        self.assertNotEqual(text, generate_text(10 * 1024, seed=2))
+        self.assertGreaterEqual(len(text), 10 * 1024)
+        self.assertLess(len(text), 11 * 1024)
+
+    def test_generate_html(self):
+        html = generate_html(10 * 1024, seed=1)
+
+        self.assertEqual(html, generate_html(10 * 1024, seed=1))
+        self.assertIn('<meta property="og:title"', html)
+        self.assertGreaterEqual(len(html), 10 * 1024)
+        self.assertLess(len(html), 11 * 1024)
+
+
+class CompareResultsTests(TestCase):
+    def test_compare_results(self):
+        baseline = {
+            "results": {
+                "rake/1KB": {"median": 1.0},
+                "rake/10KB": {"median": 1.0},
+                "rake/100KB": {"median": 1.0},
+                "sumy/1KB": {"median": 1.0},
+            }
+        }
+        current = {
+            "results": {
+                "rake/1KB": {"median": 1.05},
+                "rake/10KB": {"median": 1.5},
+                "rake/100KB": {"median": 0.5},
+                "readability/1KB": {"median": 1.0},
+            }
+        }
+
+        comparisons = {
+            comparison["benchmark"]: comparison["status"]
+            for comparison in compare_results(baseline, current, 0.1)
+        }
+
+        self.assertEqual(
+            comparisons,
+            {
+                "rake/1KB": "ok",
+                "rake/10KB": "regression",
+                "rake/100KB": "improvement",
+                "readability/1KB": "new",
+                "sumy/1KB": "missing",
+            },
+        )
+
+    def test_baselines(self):
+        baselines_directory = path.join(
+            path.dirname(path.dirname(path.abspath(__file__))),
+            "benchmarks",
+            "baselines",
+        )
+        filenames = [
+            filename
+            for filename in listdir(baselines_directory)
+            if filename.endswith(".json")
+        ]
+        self.assertGreater(len(filenames), 0)
+
+        for filename in filenames:
+            with open(path.join(baselines_directory, filename)) as f:
+                baseline = json.load(f)
+
+            for result in baseline["results"].values():
+                self.assertIn(result["benchmark"], BENCHMARKS)
+            self.assertTrue(
+                all(
+                    comparison["status"] == "ok"
+                    for comparison in compare_results(baseline, baseline)
+                )
+            )
+
+
+class ThroughputTests(TestCase):
+    def test_fixture_pages(self):
+        pages = create_fixture_pages(
+            page_count=4,
+            sizes=(1024,),
+            charsets=("utf-8", "iso-8859-1"),
+            latency=0.01,
+            jitter=0.01,
+        )
+
+        self.assertEqual(
+            [page.charset for page in pages][:2], ["utf-8", "iso-8859-1"]
+        )
+        self.assertIn(b'<meta charset="iso-8859-1">', pages[1].content)
+        for page in pages:
+            self.assertGreaterEqual(page.latency, 0.01)
+            self.assertLessEqual(page.latency, 0.02)
+
+    def test_percentile(self):
+        values = [4.0, 1.0, 3.0, 2.0, 5.0]
+
+        self.assertEqual(percentile(values, 50), 3.0)
+        self.assertEqual(percentile(values, 100), 5.0)
+        self.assertAlmostEqual(percentile(values, 95), 4.8)
+
+    def test_download_throughput(self):
+        pages = create_fixture_pages(page_count=6, sizes=(1024,))
+
+        with FixtureServer(pages) as server:
+            result = run_throughput_benchmark(
+                server.urls, mode="download", concurrency=2
+            )
+
+        self.assertEqual(result["pages"], 6)
+        self.assertEqual(result["failed"], 0)
+        self.assertGreater(result["throughput"], 0)
+        self.assertLessEqual(result["p50"], result["p99"])
+        self.assertGreater(result["peak_rss"], 0)
+        self.assertEqual(result["errors"], {})
+
+    def test_errors_are_counted(self):
+        pages = create_fixture_pages(page_count=2, sizes=(1024,))
+
+        with FixtureServer(pages) as server:
+            urls = server.urls + [server.urls[0].replace("/0.html", "/x.html")]
+            result = run_isolated_throughput_benchmark(
+                urls, mode="download", concurrency=2
+            )
+
+        self.assertEqual(result["pages"], 3)
+        self.assertEqual(result["failed"], 1)
+        self.assertEqual(result["errors"], {"WebPageDownloadError": 1})
+        self.assertGreater(result["peak_rss"], 0)
+
+
+if __name__ == "__main__":
+    main()
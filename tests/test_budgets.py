@@ -0,0 +1,61 @@
+import time
+from unittest import TestCase, main
+
+from text_analysis_helpers.budgets import (
+    StageCostEstimator,
+    create_deadline,
+    remaining_time,
+)
+
+
+class StageCostEstimatorTests(TestCase):
+    def test_estimate(self):
+        estimator = StageCostEstimator({"keywords": 1e-6, "summary": 1e-5})
+
+        self.assertAlmostEqual(estimator.estimate("keywords", 1000), 0.001)
+        self.assertEqual(estimator.estimate("unknown", 1000), 0.0)
+
+    def test_update(self):
+        estimator = StageCostEstimator({"summary": 1.0}, smoothing=0.5)
+
+        estimator.update("summary", 10, 30.0)
+        self.assertEqual(estimator.cost("summary"), 2.0)
+
+        estimator.update("keywords", 10, 1.0)
+        self.assertEqual(estimator.cost("keywords"), 0.1)
+
+        estimator.update("keywords", 0, 1.0)
+        self.assertEqual(estimator.cost("keywords"), 0.1)
+
+    def test_order(self):
+        estimator = StageCostEstimator(
+            {"summary": 3.0, "keywords": 1.0, "readability": 2.0}
+        )
+
+        self.assertEqual(
+            estimator.order(["summary", "keywords", "readability"]),
+            ["keywords", "readability", "summary"],
+        )
+
+    def test_invalid_smoothing(self):
+        with self.assertRaises(ValueError):
+            StageCostEstimator(smoothing=0)
+
+
+class DeadlineTests(TestCase):
+    def test_create_deadline(self):
+        now = time.monotonic()
+
+        self.assertIsNone(create_deadline())
+        self.assertEqual(create_deadline(deadline=now), now)
+        self.assertLessEqual(create_deadline(budget=10), time.monotonic() + 10)
+        self.assertEqual(create_deadline(deadline=now, budget=10), now)
+        self.assertLess(create_deadline(deadline=now + 60, budget=1), now + 2)
+
+    def test_remaining_time(self):
+        self.assertIsNone(remaining_time(None))
+        self.assertLess(remaining_time(time.monotonic() - 1), 0)
+
+
+if __name__ == "__main__":
+    main()
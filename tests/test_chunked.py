@@ -0,0 +1,262 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from text_analysis_helpers.chunked import (
+    ChunkResult,
+    ChunkResultAccumulator,
+    analyse_chunked,
+    analyse_file_chunked,
+    iter_file_chunks,
+    merge_chunk_results,
+    split_text,
+)
+from text_analysis_helpers.exceptions import NoContentError
+from text_analysis_helpers.keywords.rake import Rake
+from text_analysis_helpers.models import payload_digest
+from text_analysis_helpers.summaries.summarizers import Summarizer
+from text_analysis_helpers.text import TextAnalyser, TextStatisticsAccumulator
+from text_analysis_helpers.tokenizers import (
+    simple_sentence_tokenize,
+    simple_word_tokenize,
+)
+
+STOP_WORDS = ["the", "a", "of", "and", "in", "on", "was", "is", "it", "to"]
+
+PARAGRAPHS = [
+    "The quick brown fox jumped over the lazy dog. The dog was not amused.",
+    "A linear system of equations is solved in the first section. The "
+    "solution of the linear system is unique.",
+    "The brown fox returned on the next day. It brought a friend.",
+    "Minimal generating sets are constructed in the last section.",
+]
+
+
+class FirstSentenceSummarizer(Summarizer):
+    def summarize(self, document: str) -> str:
+        return simple_sentence_tokenize(document)[0]
+
+
+def create_analyser():
+    return TextAnalyser(
+        keyword_extractor=Rake(
+            word_tokenizer=simple_word_tokenize,
+            sentence_tokenizer=simple_sentence_tokenize,
+            stop_words=STOP_WORDS,
+        ),
+        summarizer=FirstSentenceSummarizer(),
+        word_tokenizer=simple_word_tokenize,
+        sentence_tokenizer=simple_sentence_tokenize,
+        readability_scores=("automated_readability_index",),
+        disabled_stages=["named_entities"],
+    )
+
+
+class SplitTextTests(TestCase):
+    def test_split_at_paragraphs(self):
+        text = "\n\n".join(PARAGRAPHS)
+
+        chunks = split_text(text, max_chunk_size=150)
+
+        self.assertEqual("".join(chunks), text)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), 150)
+            self.assertTrue(chunk.rstrip().endswith("."))
+
+    def test_split_long_paragraph(self):
+        text = " ".join(["This is a sentence."] * 100)
+
+        chunks = split_text(text, max_chunk_size=100)
+
+        self.assertEqual("".join(chunks), text)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), 100)
+            self.assertTrue(chunk.startswith("This"))
+
+    def test_split_long_sentence(self):
+        text = "a" * 250
+
+        self.assertEqual(
+            split_text(text, max_chunk_size=100),
+            ["a" * 100, "a" * 100, "a" * 50],
+        )
+
+
+class AnalyseChunkedTests(TestCase):
+    def setUp(self):
+        self.text = "\n\n".join(PARAGRAPHS * 3)
+        self.analyser = create_analyser()
+
+    def assert_same_analysis(self, analysis_result):
+        expected_result = self.analyser.analyse(self.text)
+
+        self.assertEqual(analysis_result.text, self.text)
+        self.assertEqual(
+            analysis_result.statistics, expected_result.statistics
+        )
+        self.assertEqual(
+            analysis_result.keywords.keys(), expected_result.keywords.keys()
+        )
+        for keyword, score in expected_result.keywords.items():
+            self.assertAlmostEqual(analysis_result.keywords[keyword], score)
+        self.assertEqual(analysis_result.named_entities, {})
+        self.assertEqual(
+            analysis_result.summary,
+            "The quick brown fox jumped over the lazy dog.",
+        )
+
+    def test_analyse_in_process(self):
+        analysis_result = analyse_chunked(
+            self.text,
+            analyser_factory=create_analyser,
+            max_chunk_size=200,
+            max_workers=0,
+        )
+
+        self.assert_same_analysis(analysis_result)
+
+    def test_analyse_in_worker_processes(self):
+        analysis_result = analyse_chunked(
+            self.text,
+            analyser_factory=create_analyser,
+            max_chunk_size=200,
+            max_workers=2,
+        )
+
+        self.assert_same_analysis(analysis_result)
+
+    def test_analyse_empty_text(self):
+        with self.assertRaises(NoContentError):
+            analyse_chunked("", analyser_factory=create_analyser)
+
+    def test_merge_readability_scores(self):
+        analysis_result = merge_chunk_results(
+            None,
+            [
+                _chunk_result({"automated_readability_index": 10.0}, [5]),
+                _chunk_result({"automated_readability_index": 4.0}, [10, 5]),
+            ],
+            summary="",
+        )
+
+        self.assertEqual(
+            analysis_result.readability_scores,
+            {"automated_readability_index": 5.5},
+        )
+        self.assertEqual(analysis_result.statistics.sentence_count, 3)
+        self.assertEqual(analysis_result.statistics.word_count, 20)
+
+    def test_chunk_summaries_are_reduced(self):
+        summarized = []
+
+        def summarize(chunk_summaries):
+            summarized.append(chunk_summaries)
+            return FirstSentenceSummarizer().summarize(chunk_summaries)
+
+        accumulator = ChunkResultAccumulator(
+            max_summaries_size=100, summarize=summarize
+        )
+        for paragraph in PARAGRAPHS * 50:
+            chunk_result = _chunk_result({}, [5])
+            chunk_result.summary = paragraph
+            accumulator.add(chunk_result)
+
+            self.assertLessEqual(
+                len(accumulator.chunk_summaries),
+                100 + max(len(paragraph) for paragraph in PARAGRAPHS),
+            )
+
+        self.assertTrue(summarized)
+        self.assertTrue(
+            accumulator.chunk_summaries.startswith(
+                "The quick brown fox jumped over the lazy dog."
+            )
+        )
+
+
+class AnalyseFileChunkedTests(TestCase):
+    def setUp(self):
+        self.text = "\n\n".join(PARAGRAPHS * 3)
+        self.temporary_directory = TemporaryDirectory()
+        self.filename = os.path.join(self.temporary_directory.name, "a.txt")
+        with open(self.filename, "w", encoding="utf-8") as f:
+            f.write(self.text)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_iter_file_chunks(self):
+        chunks = list(iter_file_chunks(self.filename, max_chunk_size=100))
+
+        self.assertEqual("".join(chunks), self.text)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), 100)
+            self.assertTrue(chunk.rstrip().endswith("."))
+
+    def test_analyse_file(self):
+        expected_result = analyse_chunked(
+            self.text,
+            analyser_factory=create_analyser,
+            max_chunk_size=200,
+            max_workers=0,
+        )
+
+        for max_workers in [0, 2]:
+            analysis_result = analyse_file_chunked(
+                self.filename,
+                analyser_factory=create_analyser,
+                max_chunk_size=200,
+                max_workers=max_workers,
+                max_pending=1,
+            )
+
+            self.assertIsNone(analysis_result.text)
+            self.assertEqual(
+                analysis_result.text_digest, payload_digest(self.text)
+            )
+            self.assertEqual(
+                analysis_result.keywords, expected_result.keywords
+            )
+            self.assertEqual(
+                analysis_result.statistics, expected_result.statistics
+            )
+            self.assertEqual(analysis_result.summary, expected_result.summary)
+
+    def test_analyser_analyse_file(self):
+        analysis_result = create_analyser().analyse_file(
+            self.filename, max_chunk_size=200
+        )
+
+        self.assertIsNone(analysis_result.text)
+        self.assertEqual(
+            analysis_result.summary,
+            "The quick brown fox jumped over the lazy dog.",
+        )
+
+    def test_analyse_empty_file(self):
+        with open(self.filename, "w") as f:
+            f.write("")
+
+        with self.assertRaises(NoContentError):
+            analyse_file_chunked(
+                self.filename, analyser_factory=create_analyser, max_workers=0
+            )
+
+
+def _chunk_result(readability_scores, sentence_word_counts):
+    return ChunkResult(
+        size=100,
+        statistics=TextStatisticsAccumulator().update(sentence_word_counts),
+        keyword_counts=None,
+        keywords={},
+        readability_scores=readability_scores,
+        summary="",
+        named_entities={},
+        language="en",
+    )
+
+
+if __name__ == "__main__":
+    main()
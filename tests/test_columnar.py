@@ -0,0 +1,124 @@
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from tests.helpers import create_analysis_result
+from text_analysis_helpers.columnar import ColumnarWriter, export_results
+from text_analysis_helpers.models import (
+    HtmlAnalysisResult,
+    SocialNetworkData,
+    TextAnalysisResult,
+)
+from text_analysis_helpers.text import calculate_text_statistics
+
+
+def create_html_analysis_result(
+    index: int, text_data: TextAnalysisResult
+) -> HtmlAnalysisResult:
+    return HtmlAnalysisResult(
+        url=f"http://www.example.com/page_{index}.html",
+        html="<html>some html goes here</html>",
+        title="this is the title",
+        social_network_data=SocialNetworkData(
+            twitter={"title": "twitter title"},
+            opengraph=[
+                {
+                    "properties": [
+                        ("og:image", "http://www.example.com/image.png")
+                    ]
+                }
+            ],
+        ),
+        text_data=text_data,
+    )
+
+
+class ColumnarWriterTests(TestCase):
+    def setUp(self):
+        self.text_results = [
+            create_analysis_result(
+                f"hello world {index}",
+                keywords={"hello world": 4.0, f"keyword {index}": 1.0},
+                readability_scores={
+                    "flesch_reading_ease": 63.46,
+                    "difficult_words": 27,
+                    "text_standard": "8th and 9th grade",
+                },
+                statistics=calculate_text_statistics([51, 49 + index]),
+                summary="hello",
+                named_entities={"PERSON": {"john", "mary"}},
+            )
+            for index in range(25)
+        ]
+
+    def test_export_text_analysis_results(self):
+        with TemporaryDirectory() as temp_dir:
+            filename = path.join(temp_dir, "results.parquet")
+            export_results(
+                self.text_results,
+                filename,
+                row_group_size=10,
+            )
+
+            parquet_file = pq.ParquetFile(filename)
+            table = parquet_file.read()
+
+            self.assertEqual(parquet_file.num_row_groups, 3)
+
+        self.assertEqual(table.num_rows, 25)
+        self.assertNotIn("text", table.column_names)
+        self.assertNotIn("url", table.column_names)
+
+        row = table.slice(3, 1).to_pylist()[0]
+        self.assertEqual(row["statistics_word_count"], 103)
+        self.assertEqual(row["statistics_sentence_word_count_variance"], 0.25)
+        self.assertEqual(row["readability_flesch_reading_ease"], 63.46)
+        self.assertEqual(row["readability_difficult_words"], 27.0)
+        self.assertEqual(row["readability_text_standard"], "8th and 9th grade")
+        self.assertIsNone(row["readability_smog_index"])
+        self.assertEqual(
+            dict(row["keywords"]), {"hello world": 4.0, "keyword 3": 1.0}
+        )
+        self.assertEqual(
+            dict(row["named_entities"]), {"PERSON": ["john", "mary"]}
+        )
+        self.assertEqual(row["language"], "en")
+
+    def test_export_html_analysis_results(self):
+        with TemporaryDirectory() as temp_dir:
+            filename = path.join(temp_dir, "results.arrow")
+            with ColumnarWriter(
+                filename, include_text=True, include_html=True
+            ) as writer:
+                writer.write_all(
+                    create_html_analysis_result(index, text_data)
+                    for index, text_data in enumerate(self.text_results[:3])
+                )
+
+            with pa.memory_map(filename) as source:
+                table = pa.ipc.open_file(source).read_all()
+
+        self.assertEqual(table.num_rows, 3)
+        row = table.to_pylist()[2]
+        self.assertEqual(row["url"], "http://www.example.com/page_2.html")
+        self.assertEqual(row["html"], "<html>some html goes here</html>")
+        self.assertEqual(row["text"], "hello world 2")
+        self.assertEqual(row["images"], ["http://www.example.com/image.png"])
+        self.assertEqual(dict(row["twitter"]), {"title": "twitter title"})
+        self.assertIn("og:image", row["opengraph"])
+
+    def test_export_without_results(self):
+        with TemporaryDirectory() as temp_dir:
+            filename = path.join(temp_dir, "results.parquet")
+            export_results([], filename)
+
+            table = pq.read_table(filename)
+
+        self.assertEqual(table.num_rows, 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import random
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from tests.helpers import create_analysis_result
+from text_analysis_helpers.duplicates import (
+    DuplicateIndex,
+    hamming_distance,
+    simhash,
+)
+from text_analysis_helpers.metrics import MetricsRegistry
+from text_analysis_helpers.models import payload_digest
+
+ARTICLE = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit. Morbi ac odio "
+    "tempus elit imperdiet commodo eu eget libero. Nullam eu ornare neque, "
+    "tempus auctor libero. Sed et fermentum magna. Duis id mi vitae mi "
+    "vehicula dignissim. Curabitur justo ante, posuere in lobortis ut, "
+    "tristique ut metus. Pellentesque placerat est sed est facilisis, vitae "
+    "rutrum metus commodo. Quisque sed arcu in nisi auctor pharetra at ut "
+    "arcu. Pellentesque scelerisque tincidunt dui sed tincidunt. Duis ut "
+    "lobortis eros, nec egestas mi. Integer eget laoreet risus, sit amet "
+    "luctus sapien. Ut laoreet nisi ligula, in mollis quam malesuada quis. "
+    "Maecenas tellus leo, euismod ac interdum et, commodo nec lectus."
+)
+
+
+def create_random_article(seed: int) -> str:
+    generator = random.Random(seed)
+    words = ARTICLE.split()
+
+    return " ".join(generator.choice(words) for _ in range(len(words)))
+
+
+class SimhashTests(TestCase):
+    def test_near_duplicates_have_close_fingerprints(self):
+        tokens = ARTICLE.lower().split()
+        edited_tokens = list(tokens)
+        edited_tokens[10] = "edited"
+
+        fingerprint = simhash(tokens)
+
+        self.assertEqual(simhash(list(tokens)), fingerprint)
+        self.assertLessEqual(
+            hamming_distance(fingerprint, simhash(edited_tokens)), 4
+        )
+        self.assertGreater(
+            hamming_distance(
+                fingerprint,
+                simhash(create_random_article(0).lower().split()),
+            ),
+            10,
+        )
+
+    def test_short_text(self):
+        self.assertEqual(simhash(["lorem"]), simhash(["lorem"]))
+        self.assertLess(simhash(["lorem"]), 2**64)
+
+
+class DuplicateIndexTests(TestCase):
+    def test_lookup(self):
+        metrics_registry = MetricsRegistry()
+        index = DuplicateIndex(metrics_registry=metrics_registry)
+        fingerprint = index.fingerprint(ARTICLE)
+        index.add(
+            fingerprint,
+            create_analysis_result(
+                ARTICLE,
+                keywords={"lorem ipsum": 4.0},
+                named_entities={"PERSON": {"lorem"}},
+            ),
+            url="http://www.example.com/page_1.html",
+        )
+
+        near_duplicate = ARTICLE.replace("Lorem ipsum", "Page 2. Lorem ipsum")
+        match = index.lookup(index.fingerprint(near_duplicate))
+
+        self.assertIsNotNone(match)
+        self.assertEqual(match.url, "http://www.example.com/page_1.html")
+        self.assertLessEqual(match.distance, index.max_distance)
+        self.assertIsNone(match.data["text"])
+
+        result = match.create_result(near_duplicate)
+        self.assertEqual(result.text, near_duplicate)
+        self.assertIsNone(match.create_result(near_duplicate, False).text)
+        self.assertEqual(
+            match.create_result(near_duplicate, False).text_digest,
+            payload_digest(near_duplicate),
+        )
+        self.assertEqual(result.keywords, {"lorem ipsum": 4.0})
+        self.assertEqual(result.named_entities, {"PERSON": {"lorem"}})
+        self.assertEqual(result.statistics.word_count, len(ARTICLE.split()))
+
+        # the results don't share any objects with the index
+        result.keywords["changed"] = 1.0
+        self.assertNotIn("changed", match.create_result(ARTICLE).keywords)
+
+        self.assertIsNone(
+            index.lookup(index.fingerprint(create_random_article(0)))
+        )
+
+        statistics = index.statistics()
+        self.assertEqual(statistics.hits, 1)
+        self.assertEqual(statistics.misses, 1)
+        self.assertEqual(statistics.entries, 1)
+        self.assertEqual(statistics.hit_rate, 0.5)
+        self.assertIn(
+            'text_analysis_cache_requests_total{cache="duplicate",'
+            'result="hit"} 1',
+            metrics_registry.render(),
+        )
+
+    def test_short_texts_are_not_fingerprinted(self):
+        index = DuplicateIndex(min_tokens=20)
+
+        self.assertIsNone(index.fingerprint("Lorem ipsum dolor sit amet."))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        index = DuplicateIndex(max_entries=2)
+        articles = [create_random_article(seed) for seed in range(3)]
+        fingerprints = [index.fingerprint(article) for article in articles]
+
+        index.add(fingerprints[0], create_analysis_result(articles[0]))
+        index.add(fingerprints[1], create_analysis_result(articles[1]))
+        self.assertIsNotNone(index.lookup(fingerprints[0]))
+        index.add(fingerprints[2], create_analysis_result(articles[2]))
+
+        self.assertEqual(len(index), 2)
+        self.assertIsNotNone(index.lookup(fingerprints[0]))
+        self.assertIsNone(index.lookup(fingerprints[1]))
+        self.assertIsNotNone(index.lookup(fingerprints[2]))
+        for band in index._bands:
+            for band_fingerprints in band.values():
+                self.assertNotIn(fingerprints[1], band_fingerprints)
+
+    def test_save_and_load(self):
+        index = DuplicateIndex(max_distance=5, shingle_size=3)
+        articles = [create_random_article(seed) for seed in range(3)]
+        for seed, article in enumerate(articles):
+            index.add(
+                index.fingerprint(article),
+                create_analysis_result(article),
+                url=f"http://www.example.com/page_{seed}.html",
+            )
+
+        with TemporaryDirectory() as temp_dir:
+            filename = path.join(temp_dir, "duplicates.jsonl.gz")
+            index.save(filename)
+
+            loaded_index = DuplicateIndex.load(filename)
+            truncated_index = DuplicateIndex.load(filename, max_entries=2)
+
+        self.assertEqual(loaded_index.max_distance, 5)
+        self.assertEqual(loaded_index.shingle_size, 3)
+        self.assertEqual(len(loaded_index), 3)
+        match = loaded_index.lookup(loaded_index.fingerprint(articles[1]))
+        self.assertEqual(match.url, "http://www.example.com/page_1.html")
+        self.assertEqual(match.distance, 0)
+        self.assertEqual(
+            match.create_result(articles[1]).as_dict()["statistics"],
+            create_analysis_result(articles[1]).as_dict()["statistics"],
+        )
+
+        # the least recently used entries are discarded first
+        self.assertEqual(len(truncated_index), 2)
+        self.assertIsNone(
+            truncated_index.lookup(truncated_index.fingerprint(articles[0]))
+        )
+
+    def test_load_invalid_file(self):
+        with TemporaryDirectory() as temp_dir:
+            filename = path.join(temp_dir, "duplicates.jsonl")
+            with open(filename, "w") as f:
+                f.write('{"format": "unknown"}\n')
+
+            with self.assertRaises(ValueError):
+                DuplicateIndex.load(filename)
+
+    def test_invalid_max_distance(self):
+        with self.assertRaises(ValueError):
+            DuplicateIndex(max_distance=64)
+
+
+if __name__ == "__main__":
+    main()
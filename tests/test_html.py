@@ -1,14 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from os import path
 from unittest import TestCase, main
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import arrow
 from dateutil.tz import tzutc
 
+from text_analysis_helpers.article_templates import TemplateArticleExtractor
+from text_analysis_helpers.duplicates import DuplicateIndex
 from text_analysis_helpers.exceptions import NoContentError
 from text_analysis_helpers.html import HtmlAnalyser
-from text_analysis_helpers.models import WebPage
+from text_analysis_helpers.models import (
+    TextAnalysisResult,
+    TextStatistics,
+    WebPage,
+    payload_digest,
+)
+
+
+def create_text_analyser_mock():
+    text_analyser = Mock()
+    text_analyser.analyse.side_effect = lambda text: TextAnalysisResult(
+        text=text,
+        keywords={},
+        readability_scores={},
+        statistics=TextStatistics(
+            sentence_count=1,
+            word_count=1,
+            mean_sentence_word_count=1.0,
+            median_sentence_word_count=1.0,
+            min_sentence_word_count=1,
+            max_sentence_word_count=1,
+            average_sentence_word_count=1.0,
+            sentence_word_count_std=0.0,
+            sentence_word_count_variance=0.0,
+        ),
+        summary="",
+        named_entities={},
+        language="en",
+    )
+
+    return text_analyser
+
+
+def create_html_analyser_with_text_analyser_mock():
+    return HtmlAnalyser(text_analyser=create_text_analyser_mock())
 
 
 class HtmlAnalyserTests(TestCase):
@@ -504,6 +541,246 @@ class HtmlAnalyserTests(TestCase):
         with self.assertRaises(NoContentError):
             analyser.analyse(web_page)
 
+    def test_extract_article_with_url(self):
+        web_page = WebPage(url="http://www.example.com", html="<html></html>")
+
+        template_extractor = Mock(spec=TemplateArticleExtractor)
+        analyser = HtmlAnalyser(
+            text_analyser=create_text_analyser_mock(),
+            article_extractor=template_extractor,
+        )
+        analyser._extract_article(web_page)
+        template_extractor.extract_article.assert_called_once_with(
+            "<html></html>", url="http://www.example.com"
+        )
+
+        article_extractor = Mock()
+        analyser = HtmlAnalyser(
+            text_analyser=create_text_analyser_mock(),
+            article_extractor=article_extractor,
+        )
+        analyser._extract_article(web_page)
+        article_extractor.extract_article.assert_called_once_with(
+            "<html></html>"
+        )
+
+    @patch("text_analysis_helpers.html.download_web_page")
+    def test_analyse_stream(self, download_web_page_mock):
+        tests_dir = path.dirname(path.abspath(__file__))
+        page_file = path.join(tests_dir, "data", "page1.html")
+        with open(page_file) as f:
+            content = f.read()
+
+        download_web_page_mock.side_effect = lambda url, **kwargs: WebPage(
+            url=url, html=content
+        )
+
+        analyser = HtmlAnalyser(text_analyser=create_text_analyser_mock())
+        pipeline = analyser.analyse_stream(
+            [
+                "http://www.example.com/page_1.html",
+                WebPage(
+                    url="http://www.example.com/page_2.html", html=content
+                ),
+                WebPage(url="http://www.example.com/empty.html", html=""),
+            ],
+            download_workers=2,
+            analysis_workers=2,
+            queue_size=2,
+        )
+        with self.assertLogs("text_analysis_helpers.pipeline", "ERROR"):
+            results = list(pipeline)
+
+        self.assertCountEqual(
+            [result.url for result in results],
+            [
+                "http://www.example.com/page_1.html",
+                "http://www.example.com/page_2.html",
+            ],
+        )
+        for result in results:
+            self.assertEqual(result.title, "test page 1")
+            self.assertTrue(
+                result.text.startswith("Lorem ipsum dolor sit amet")
+            )
+            self.assertEqual(
+                result.images,
+                [
+                    "https://example.com/image_2.png",
+                    "https://example.com/image_1.png",
+                ],
+            )
+
+        download_web_page_mock.assert_called_once_with(
+            url="http://www.example.com/page_1.html",
+            timeout=5,
+            metrics_registry=None,
+            headers=None,
+            verify=True,
+        )
+
+        statistics = {stage.name: stage for stage in pipeline.statistics()}
+        self.assertEqual(statistics["download"].processed, 3)
+        self.assertEqual(statistics["article_extraction"].processed, 2)
+        self.assertEqual(statistics["article_extraction"].failed, 1)
+        self.assertEqual(statistics["result_construction"].processed, 2)
+
+    @patch("text_analysis_helpers.html.ProcessPoolExecutor")
+    def test_analyse_stream_creates_the_pool_when_iterated(
+        self, process_pool_executor_mock
+    ):
+        # the thread pool runs the workers in this process
+        executors = []
+
+        def create_executor(**kwargs):
+            executors.append(ThreadPoolExecutor(**kwargs))
+            return executors[-1]
+
+        process_pool_executor_mock.side_effect = create_executor
+
+        tests_dir = path.dirname(path.abspath(__file__))
+        page_file = path.join(tests_dir, "data", "page1.html")
+        with open(page_file) as f:
+            content = f.read()
+
+        analyser = HtmlAnalyser(text_analyser=create_text_analyser_mock())
+        pipeline = analyser.analyse_stream(
+            [WebPage(url="http://www.example.com", html=content)],
+            analysis_workers=1,
+            analyser_factory=create_html_analyser_with_text_analyser_mock,
+        )
+        process_pool_executor_mock.assert_not_called()
+
+        results = list(pipeline)
+
+        self.assertEqual(len(results), 1)
+        process_pool_executor_mock.assert_called_once()
+        self.assertTrue(executors[0]._shutdown)
+
+    def test_analyse_stream_in_worker_processes(self):
+        tests_dir = path.dirname(path.abspath(__file__))
+        page_file = path.join(tests_dir, "data", "page1.html")
+        with open(page_file) as f:
+            content = f.read()
+
+        text_analyser = create_text_analyser_mock()
+        analyser = HtmlAnalyser(text_analyser=text_analyser)
+        pipeline = analyser.analyse_stream(
+            [
+                WebPage(
+                    url=f"http://www.example.com/page_{i}.html", html=content
+                )
+                for i in range(4)
+            ]
+            + [WebPage(url="http://www.example.com/empty.html", html="")],
+            analysis_workers=2,
+            analyser_factory=create_html_analyser_with_text_analyser_mock,
+        )
+        with self.assertLogs("text_analysis_helpers.pipeline", "ERROR"):
+            results = list(pipeline)
+
+        self.assertCountEqual(
+            [result.url for result in results],
+            [f"http://www.example.com/page_{i}.html" for i in range(4)],
+        )
+        for result in results:
+            self.assertEqual(result.title, "test page 1")
+            self.assertTrue(
+                result.text.startswith("Lorem ipsum dolor sit amet")
+            )
+
+        # the text is analysed by the analysers of the worker processes
+        text_analyser.analyse.assert_not_called()
+
+        statistics = {stage.name: stage for stage in pipeline.statistics()}
+        self.assertEqual(statistics["article_extraction"].failed, 1)
+        self.assertEqual(statistics["text_analysis"].processed, 4)
+
+    def test_analyse_without_keeping_payloads(self):
+        tests_dir = path.dirname(path.abspath(__file__))
+        page_file = path.join(tests_dir, "data", "page1.html")
+        with open(page_file) as f:
+            content = f.read()
+
+        web_page = WebPage(url="http://www.example.com", html=content)
+
+        analyser = HtmlAnalyser(
+            text_analyser=create_text_analyser_mock(),
+            keep_html=False,
+            keep_text=False,
+        )
+        result = analyser.analyse(web_page)
+
+        self.assertIsNone(result.html)
+        self.assertIsNone(result.text)
+        self.assertEqual(result.html_digest, payload_digest(content))
+        self.assertEqual(len(result.text_digest), 64)
+        self.assertEqual(result.title, "test page 1")
+
+    def test_analyse_near_duplicates(self):
+        tests_dir = path.dirname(path.abspath(__file__))
+        page_file = path.join(tests_dir, "data", "page1.html")
+        with open(page_file) as f:
+            content = f.read()
+
+        text_analyser = create_text_analyser_mock()
+        analyser = HtmlAnalyser(
+            text_analyser=text_analyser, duplicate_index=DuplicateIndex()
+        )
+        result = analyser.analyse(
+            WebPage(url="http://www.example.com/page_1.html", html=content)
+        )
+        near_duplicate_content = content.replace(
+            "Vivamus id maximus erat.", "Vivamus id maximus est."
+        )
+        duplicate_result = analyser.analyse(
+            WebPage(
+                url="http://www.example.com/page_1.html?utm_source=feed",
+                html=near_duplicate_content,
+            )
+        )
+
+        text_analyser.analyse.assert_called_once()
+        self.assertIsNone(result.duplicate_of)
+        self.assertEqual(
+            duplicate_result.duplicate_of, "http://www.example.com/page_1.html"
+        )
+        self.assertIn("Vivamus id maximus est.", duplicate_result.text)
+        self.assertEqual(duplicate_result.title, "test page 1")
+        self.assertEqual(duplicate_result.statistics, result.statistics)
+        self.assertEqual(
+            duplicate_result.as_dict()["duplicate_of"],
+            "http://www.example.com/page_1.html",
+        )
+        self.assertEqual(analyser.duplicate_index.statistics().hits, 1)
+
+    def test_near_duplicates_respect_keep_text(self):
+        tests_dir = path.dirname(path.abspath(__file__))
+        page_file = path.join(tests_dir, "data", "page1.html")
+        with open(page_file) as f:
+            content = f.read()
+
+        text_analyser = create_text_analyser_mock()
+        text_analyser.keep_text = False
+        analyser = HtmlAnalyser(
+            text_analyser=text_analyser, duplicate_index=DuplicateIndex()
+        )
+        analyser.analyse(
+            WebPage(url="http://www.example.com/page_1.html", html=content)
+        )
+        duplicate_result = analyser.analyse(
+            WebPage(
+                url="http://www.example.com/page_1.html?utm_source=feed",
+                html=content,
+            )
+        )
+
+        self.assertEqual(
+            duplicate_result.duplicate_of, "http://www.example.com/page_1.html"
+        )
+        self.assertIsNone(duplicate_result.text)
+        self.assertIsNotNone(duplicate_result.text_digest)
+
 
 if __name__ == "__main__":
     main()
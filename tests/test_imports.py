@@ -0,0 +1,77 @@
+import subprocess
+import sys
+from unittest import TestCase, main
+
+HEAVY_MODULES = (
+    "articles",
+    "arrow",
+    "bs4",
+    "extruct",
+    "langdetect",
+    "lxml",
+    "nltk",
+    "numpy",
+    "pyarrow",
+    "requests",
+    "sumy",
+    "textstat",
+)
+
+# the cumulative import time budget in microseconds. Importing these modules
+# took more than 300ms when the heavy dependencies were imported eagerly.
+IMPORT_TIME_BUDGET = {
+    "text_analysis_helpers.cli": 50000,
+    "text_analysis_helpers.keywords.rake": 100000,
+    "text_analysis_helpers.text": 150000,
+    "text_analysis_helpers.html": 150000,
+}
+
+
+def measure_import(module: str) -> dict[str, int]:
+    """Import a module in a new interpreter using `python -X importtime`
+
+    :param module: the module to import
+    :return: the cumulative import time in microseconds of every module that
+        was imported
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    import_times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            import_times[name.strip()] = int(cumulative)
+
+    return import_times
+
+
+class ImportTimeTests(TestCase):
+    def test_heavy_dependencies_are_imported_lazily(self):
+        for module in IMPORT_TIME_BUDGET:
+            import_times = measure_import(module)
+
+            imported_heavy_modules = {
+                name.split(".")[0]
+                for name in import_times
+                if name.split(".")[0] in HEAVY_MODULES
+            }
+            self.assertEqual(imported_heavy_modules, set(), module)
+
+    def test_import_time_budget(self):
+        for module, budget in IMPORT_TIME_BUDGET.items():
+            # use the fastest of a few runs to reduce the noise
+            import_time = min(measure_import(module)[module] for _ in range(3))
+
+            self.assertLess(import_time, budget, module)
+
+
+if __name__ == "__main__":
+    main()
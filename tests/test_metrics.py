@@ -0,0 +1,181 @@
+from os import path
+from unittest import TestCase, main
+from unittest.mock import Mock, patch
+
+from text_analysis_helpers.article_templates import TemplateArticleExtractor
+from text_analysis_helpers.downloaders import download_web_page
+from text_analysis_helpers.exceptions import (
+    NoContentError,
+    WebPageDownloadError,
+)
+from text_analysis_helpers.html import HtmlAnalyser
+from text_analysis_helpers.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    time_stage,
+)
+from text_analysis_helpers.models import WebPage
+
+
+class MetricTests(TestCase):
+    def test_counter(self):
+        counter = Counter("requests_total", "The requests", ("path",))
+        counter.inc(("/a",))
+        counter.inc(("/a",), amount=2)
+        counter.inc(("/b",))
+
+        self.assertEqual(counter.value(("/a",)), 3)
+        self.assertEqual(
+            counter.render(),
+            [
+                "# HELP requests_total The requests",
+                "# TYPE requests_total counter",
+                'requests_total{path="/a"} 3',
+                'requests_total{path="/b"} 1',
+            ],
+        )
+
+        with self.assertRaises(ValueError):
+            counter.inc(("/a",), amount=-1)
+        with self.assertRaises(ValueError):
+            counter.inc(("/a", "extra"))
+
+    def test_gauge(self):
+        gauge = Gauge("in_flight", "The requests in flight")
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+
+        self.assertEqual(gauge.value(), 1)
+
+        gauge.set(5)
+        self.assertEqual(gauge.render()[-1], "in_flight 5")
+
+    def test_histogram(self):
+        histogram = Histogram(
+            "duration_seconds", "The duration", buckets=(0.1, 1.0)
+        )
+        histogram.observe(0.05)
+        histogram.observe(0.1)
+        histogram.observe(0.5)
+        histogram.observe(3.0)
+
+        self.assertEqual(histogram.count(), 4)
+        self.assertEqual(
+            histogram.render()[2:],
+            [
+                'duration_seconds_bucket{le="0.1"} 2',
+                'duration_seconds_bucket{le="1.0"} 3',
+                'duration_seconds_bucket{le="+Inf"} 4',
+                "duration_seconds_sum 3.65",
+                "duration_seconds_count 4",
+            ],
+        )
+
+    def test_label_values_are_escaped(self):
+        counter = Counter("errors_total", "The errors", ("message",))
+        counter.inc(('a "quoted"\nvalue',))
+
+        self.assertEqual(
+            counter.render()[-1],
+            'errors_total{message="a \\"quoted\\"\\nvalue"} 1',
+        )
+
+
+class MetricsRegistryTests(TestCase):
+    def test_register_metrics(self):
+        registry = MetricsRegistry()
+
+        counter = registry.counter("pages_total", "The pages")
+        self.assertIs(registry.counter("pages_total", "The pages"), counter)
+
+        with self.assertRaises(ValueError):
+            registry.gauge("pages_total", "The pages")
+
+        counter.inc()
+        self.assertIn("pages_total 1", registry.render())
+
+    def test_stage(self):
+        registry = MetricsRegistry()
+
+        with registry.stage("text", "keywords"):
+            pass
+
+        with self.assertRaises(NoContentError):
+            with registry.stage("text", "keywords"):
+                raise NoContentError()
+
+        self.assertEqual(registry.stage_seconds.count(("text", "keywords")), 2)
+        self.assertEqual(registry.errors.value(("text", "NoContentError")), 1)
+
+    def test_time_stage_without_registry(self):
+        with time_stage(None, "text", "keywords"):
+            pass
+
+
+class AnalyserMetricsTests(TestCase):
+    def test_html_analyser(self):
+        tests_dir = path.dirname(path.abspath(__file__))
+        with open(path.join(tests_dir, "data", "page1.html")) as f:
+            content = f.read()
+
+        registry = MetricsRegistry()
+        analyser = HtmlAnalyser(
+            text_analyser=Mock(),
+            metrics_registry=registry,
+        )
+
+        analyser.analyse(WebPage(url="http://www.example.com", html=content))
+        with self.assertRaises(NoContentError):
+            analyser.analyse(WebPage(url="http://www.example.com", html=""))
+
+        self.assertEqual(registry.documents.value(("html",)), 1)
+        self.assertEqual(registry.errors.value(("html", "NoContentError")), 1)
+        self.assertEqual(
+            registry.stage_seconds.count(("html", "article_extraction")), 2
+        )
+        self.assertEqual(
+            registry.stage_seconds.count(("html", "metadata_extraction")), 1
+        )
+
+    @patch("requests.get")
+    def test_download_web_page(self, get_mock):
+        registry = MetricsRegistry()
+
+        get_mock.return_value = Mock(
+            status_code=200, content=b"<html></html>", text="<html></html>"
+        )
+        download_web_page("http://www.example.com", metrics_registry=registry)
+
+        get_mock.return_value = Mock(
+            status_code=404, content=b"not found", text="not found"
+        )
+        with self.assertRaises(WebPageDownloadError):
+            download_web_page(
+                "http://www.example.com", metrics_registry=registry
+            )
+
+        self.assertEqual(registry.downloaded_bytes.value(), 22)
+        self.assertEqual(registry.documents.value(("downloader",)), 1)
+        self.assertEqual(
+            registry.errors.value(("downloader", "WebPageDownloadError")), 1
+        )
+
+    def test_template_cache_requests(self):
+        registry = MetricsRegistry()
+        extractor = TemplateArticleExtractor(
+            article_extractor=Mock(extract_article=Mock(return_value="text")),
+            metrics_registry=registry,
+        )
+
+        extractor.extract_article("<html></html>")
+
+        self.assertEqual(
+            registry.cache_requests.value(("article_template", "full")), 1
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
+import io
 import json
+import tracemalloc
+from os import path
+from tempfile import TemporaryDirectory
 from unittest import TestCase, main
 
 import arrow
@@ -8,6 +12,7 @@ from text_analysis_helpers.models import (
     SocialNetworkData,
     TextAnalysisResult,
     TextStatistics,
+    payload_digest,
 )
 
 
@@ -93,6 +98,91 @@ class TextAnalysisResultTest(TestCase):
         self.assertIsInstance(json_data, str)
         json.loads(json_data)
 
+    def test_write(self):
+        f = io.BytesIO()
+        self.analysis_result.write(f)
+
+        self.assertDictEqual(
+            json.loads(f.getvalue()), self.analysis_result.as_dict()
+        )
+
+    def test_save(self):
+        with TemporaryDirectory() as temp_dir:
+            filename = path.join(temp_dir, "result.json")
+            self.analysis_result.save(filename)
+
+            with open(filename) as f:
+                self.assertDictEqual(
+                    json.load(f), self.analysis_result.as_dict()
+                )
+
+    def test_from_dict(self):
+        analysis_result = TextAnalysisResult.from_dict(
+            self.analysis_result.as_dict()
+        )
+
+        self.assertIsInstance(analysis_result, TextAnalysisResult)
+        self.assertEqual(analysis_result.named_entities, {"PERSON": {"john"}})
+        self.assertEqual(
+            analysis_result.created_at, self.analysis_result.created_at
+        )
+        self.assertDictEqual(
+            analysis_result.as_dict(), self.analysis_result.as_dict()
+        )
+
+    def test_load(self):
+        with TemporaryDirectory() as temp_dir:
+            filename = path.join(temp_dir, "result.json")
+            self.analysis_result.save(filename)
+
+            analysis_result = TextAnalysisResult.load(filename)
+
+        self.assertDictEqual(
+            analysis_result.as_dict(), self.analysis_result.as_dict()
+        )
+
+    def test_binary_format(self):
+        for compress in [False, True]:
+            data = self.analysis_result.as_bytes(compress=compress)
+            analysis_result = TextAnalysisResult.from_bytes(data)
+
+            self.assertIsInstance(data, bytes)
+            self.assertDictEqual(
+                analysis_result.as_dict(), self.analysis_result.as_dict()
+            )
+
+    def test_discard_text(self):
+        self.analysis_result.discard_text()
+
+        self.assertIsNone(self.analysis_result.text)
+        self.assertEqual(
+            self.analysis_result.text_digest, payload_digest("hello world")
+        )
+
+        data = self.analysis_result.as_dict()
+        self.assertIsNone(data["text"])
+        self.assertEqual(data["text_digest"], payload_digest("hello world"))
+
+        analysis_result = TextAnalysisResult.from_dict(data)
+        self.assertIsNone(analysis_result.text)
+        self.assertEqual(
+            analysis_result.text_digest, payload_digest("hello world")
+        )
+
+    def test_skipped_stages(self):
+        self.assertNotIn("skipped_stages", self.analysis_result.as_dict())
+
+        self.analysis_result.skipped_stages = ["summary"]
+        self.analysis_result.truncated_stages = ["named_entities"]
+
+        data = self.analysis_result.as_dict()
+        self.assertEqual(data["skipped_stages"], ["summary"])
+        self.assertEqual(data["truncated_stages"], ["named_entities"])
+
+        analysis_result = TextAnalysisResult.from_dict(data)
+        self.assertEqual(analysis_result.skipped_stages, ["summary"])
+        self.assertEqual(analysis_result.truncated_stages, ["named_entities"])
+
 
 class HtmlAnalysisResultTest(TestCase):
     def setUp(self):
@@ -221,6 +311,91 @@ class HtmlAnalysisResultTest(TestCase):
         self.assertIsInstance(json_data, str)
         json.loads(json_data)
 
+    def test_from_dict(self):
+        analysis_result = HtmlAnalysisResult.from_dict(
+            json.loads(self.analysis_result.as_json())
+        )
+
+        self.assertIsInstance(analysis_result, HtmlAnalysisResult)
+        self.assertEqual(
+            analysis_result.social_network_data,
+            self.analysis_result.social_network_data,
+        )
+        self.assertEqual(analysis_result.images, self.analysis_result.images)
+        self.assertEqual(analysis_result.movies, self.analysis_result.movies)
+        self.assertDictEqual(
+            analysis_result.as_dict(), self.analysis_result.as_dict()
+        )
+
+    def test_binary_format(self):
+        self.analysis_result.html = "<html>" + "some html " * 1000 + "</html>"
+
+        for compress in [False, True]:
+            data = self.analysis_result.as_bytes(compress=compress)
+            analysis_result = HtmlAnalysisResult.from_bytes(data)
+
+            self.assertDictEqual(
+                analysis_result.as_dict(), self.analysis_result.as_dict()
+            )
+
+        self.assertLess(
+            len(self.analysis_result.as_bytes(compress=True)),
+            len(self.analysis_result.as_json()) / 10,
+        )
+
+    def test_discard_html(self):
+        self.analysis_result.discard_html()
+
+        self.assertIsNone(self.analysis_result.html)
+        self.assertEqual(
+            self.analysis_result.html_digest,
+            payload_digest("some html goes here"),
+        )
+
+        data = self.analysis_result.as_dict()
+        self.assertIsNone(data["html"])
+
+        analysis_result = HtmlAnalysisResult.from_dict(data)
+        self.assertIsNone(analysis_result.html)
+        self.assertEqual(
+            analysis_result.html_digest, payload_digest("some html goes here")
+        )
+
+    def test_result_memory_usage(self):
+        text_data = TextAnalysisResult(
+            text=None,
+            keywords={},
+            readability_scores={},
+            statistics=self.analysis_result.statistics,
+            summary="",
+            named_entities={},
+            language="en",
+        )
+        social_network_data = SocialNetworkData(opengraph=None, twitter=None)
+
+        def create_result():
+            return HtmlAnalysisResult(
+                url="http://www.example.com",
+                html=None,
+                title="title",
+                social_network_data=social_network_data,
+                text_data=text_data,
+            )
+
+        self.assertFalse(hasattr(create_result(), "__dict__"))
+
+        result_count = 1000
+        tracemalloc.start()
+        try:
+            memory_before, _ = tracemalloc.get_traced_memory()
+            results = [create_result() for _ in range(result_count)]
+            memory_after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(len(results), result_count)
+        self.assertLess((memory_after - memory_before) / result_count, 512)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,129 @@
+import time
+from contextlib import contextmanager
+from unittest import TestCase, main
+
+from text_analysis_helpers.pipeline import Pipeline, Stage
+
+
+class PipelineTests(TestCase):
+    def test_process_items(self):
+        pipeline = Pipeline(
+            range(100),
+            [
+                Stage("double", lambda item: item * 2, workers=3),
+                Stage("increment", lambda item: item + 1, workers=2),
+            ],
+            queue_size=4,
+        )
+
+        results = list(pipeline)
+
+        self.assertCountEqual(results, [i * 2 + 1 for i in range(100)])
+
+        statistics = pipeline.statistics()
+        self.assertEqual(
+            [stage.name for stage in statistics], ["double", "increment"]
+        )
+        self.assertEqual(statistics[0].processed, 100)
+        self.assertEqual(statistics[0].failed, 0)
+        self.assertEqual(statistics[0].workers, 3)
+        self.assertEqual(statistics[1].processed, 100)
+        self.assertGreater(statistics[1].throughput, 0)
+
+    def test_skip_failed_items(self):
+        def fail_on_odd_numbers(item):
+            if item % 2:
+                raise ValueError("odd number")
+
+            return item
+
+        pipeline = Pipeline(
+            range(10), [Stage("filter", fail_on_odd_numbers, workers=2)]
+        )
+
+        with self.assertLogs("text_analysis_helpers.pipeline", "ERROR"):
+            results = list(pipeline)
+
+        self.assertCountEqual(results, [0, 2, 4, 6, 8])
+        self.assertEqual(pipeline.statistics()[0].failed, 5)
+
+    def test_bounded_queues(self):
+        produced = []
+
+        def source():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        pipeline = Pipeline(
+            source(), [Stage("identity", lambda item: item)], queue_size=2
+        )
+
+        iterator = iter(pipeline)
+        next(iterator)
+        time.sleep(0.3)
+
+        # two queues of size two, the item being processed by the stage, the
+        # item that the feeder is trying to add to the full queue and the
+        # item that has been returned
+        self.assertLessEqual(len(produced), 7)
+        self.assertLessEqual(pipeline.statistics()[0].queue_depth, 2)
+
+        iterator.close()
+
+    def test_source_error_is_raised(self):
+        def source():
+            yield 1
+            raise ValueError("source error")
+
+        pipeline = Pipeline(source(), [Stage("identity", lambda item: item)])
+
+        with self.assertRaises(ValueError):
+            list(pipeline)
+
+    def test_pipeline_can_only_run_once(self):
+        pipeline = Pipeline(range(3), [Stage("identity", lambda item: item)])
+        list(pipeline)
+
+        with self.assertRaises(RuntimeError):
+            list(pipeline)
+
+    def test_on_close(self):
+        closed = []
+        pipeline = Pipeline(
+            range(3),
+            [Stage("identity", lambda item: item)],
+            on_close=lambda: closed.append(True),
+        )
+
+        self.assertCountEqual(list(pipeline), [0, 1, 2])
+        pipeline.close()
+
+        self.assertEqual(closed, [True])
+
+    def test_context(self):
+        events = []
+
+        @contextmanager
+        def context():
+            events.append("enter")
+            try:
+                yield
+            finally:
+                events.append("exit")
+
+        pipeline = Pipeline(
+            range(3), [Stage("identity", lambda item: item)], context=context
+        )
+        self.assertEqual(events, [])
+
+        items = iter(pipeline)
+        self.assertEqual(next(items), 0)
+        self.assertEqual(events, ["enter"])
+
+        items.close()
+        self.assertEqual(events, ["enter", "exit"])
+
+
+if __name__ == "__main__":
+    main()
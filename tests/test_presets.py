@@ -0,0 +1,57 @@
+from unittest import TestCase, main
+from unittest.mock import Mock, patch
+
+from text_analysis_helpers.article_templates import LinearMSSArticleExtractor
+from text_analysis_helpers.presets import (
+    PRESETS,
+    create_html_analyser,
+    create_text_analyser,
+    get_preset,
+)
+from text_analysis_helpers.text import READABILITY_SCORES
+from text_analysis_helpers.tokenizers import simple_word_tokenize
+
+
+class PresetTests(TestCase):
+    def test_get_preset(self):
+        self.assertEqual(get_preset("fast").name, "fast")
+        self.assertEqual(set(PRESETS), {"fast", "balanced", "full"})
+
+        with self.assertRaises(ValueError):
+            get_preset("unknown")
+
+    def test_presets_use_known_components(self):
+        for preset in PRESETS.values():
+            self.assertTrue(
+                set(preset.readability_scores or ()) <= set(READABILITY_SCORES)
+            )
+
+    @patch("text_analysis_helpers.text.Rake")
+    def test_create_fast_text_analyser(self, rake_mock):
+        analyser = create_text_analyser("fast")
+
+        self.assertEqual(rake_mock.call_args.kwargs["top_k"], 20)
+
+        self.assertIs(analyser.word_tokenizer, simple_word_tokenize)
+        self.assertEqual(analyser.summarizer.algorithm, "luhn")
+        self.assertIsNone(analyser.named_entity_extractor)
+        self.assertEqual(analyser.disabled_stages, {"named_entities"})
+        self.assertEqual(
+            analyser.readability_scores,
+            get_preset("fast").readability_scores,
+        )
+
+    @patch("text_analysis_helpers.text.Rake", Mock())
+    def test_create_html_analyser(self):
+        analyser = create_html_analyser("fast", keep_html=False)
+
+        self.assertEqual(analyser.text_analyser.summarizer.algorithm, "luhn")
+        self.assertFalse(analyser._keep_html)
+        self.assertEqual(analyser._metadata_syntaxes, ("opengraph",))
+        self.assertIsInstance(
+            analyser._article_extractor, LinearMSSArticleExtractor
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import io
+import pstats
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from text_analysis_helpers.profiling import StageProfiler, profile
+
+
+def allocate(size: int) -> int:
+    data = bytearray(size)
+
+    return len(data)
+
+
+class StageProfilerTests(TestCase):
+    def test_summary(self):
+        profiler = StageProfiler()
+
+        with profiler.stage("text", "keywords"):
+            pass
+        with profiler.stage("text", "keywords"):
+            pass
+
+        summary = profiler.summary()
+
+        self.assertIn("text.keywords", summary)
+        self.assertNotIn("peak", summary)
+        self.assertIsNone(profiler.peak_memory("text", "keywords"))
+
+
+class ProfileTests(TestCase):
+    def test_profile(self):
+        summary_file = io.StringIO()
+
+        with TemporaryDirectory() as temp_dir:
+            output_file = path.join(temp_dir, "analysis.prof")
+
+            with profile(
+                output_file, trace_memory=True, summary_file=summary_file
+            ) as profiler:
+                with profiler.stage("text", "small"):
+                    allocate(1024)
+                with profiler.stage("text", "large"):
+                    allocate(1024 * 1024)
+
+            stats = pstats.Stats(output_file)
+
+        self.assertTrue(
+            any(function[2] == "allocate" for function in stats.stats)
+        )
+        self.assertGreaterEqual(
+            profiler.peak_memory("text", "large"), 1024 * 1024
+        )
+        self.assertLess(profiler.peak_memory("text", "small"), 1024 * 1024)
+
+        summary = summary_file.getvalue()
+        self.assertIn("peak memory", summary)
+        self.assertIn("text.large", summary)
+        self.assertIn("text.small", summary)
+        self.assertIn("allocate", summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import gzip
+import io
+import json
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from tests.helpers import create_analysis_result
+from text_analysis_helpers import serializers
+from text_analysis_helpers.models import TextAnalysisResult
+from text_analysis_helpers.serializers import (
+    BinaryWriter,
+    JsonLinesWriter,
+    compression_from_filename,
+    dump,
+    dumps,
+    open_file,
+    packb,
+    read_binary,
+    read_json_lines,
+    unpackb,
+)
+
+
+class SerializerTests(TestCase):
+    data = {"text": "καλημέρα", "items": [1, 2.5, None], "pair": ("a", "b")}
+    expected = {
+        "text": "καλημέρα",
+        "items": [1, 2.5, None],
+        "pair": ["a", "b"],
+    }
+
+    def test_dumps(self):
+        self.assertEqual(json.loads(dumps(self.data)), self.expected)
+
+    def test_dumps_without_orjson(self):
+        with patch.object(serializers, "orjson", None):
+            encoded = dumps(self.data)
+
+        self.assertEqual(json.loads(encoded), self.expected)
+
+    def test_dump(self):
+        for orjson in [serializers.orjson, None]:
+            with patch.object(serializers, "orjson", orjson):
+                f = io.BytesIO()
+                dump(self.data, f)
+
+            self.assertEqual(json.loads(f.getvalue()), self.expected)
+
+    def test_packb(self):
+        data = {"text": "hello " * 100, "html": None, "keywords": {"a": 1.0}}
+
+        self.assertEqual(unpackb(packb(data)), data)
+        self.assertEqual(unpackb(packb(data, compress=True)), data)
+        self.assertLess(len(packb(data, compress=True)), len(packb(data)))
+
+    def test_packb_without_msgpack(self):
+        with patch.object(serializers, "msgpack", None):
+            with self.assertRaises(ImportError):
+                packb({"text": "hello"})
+
+    def test_compression_from_filename(self):
+        self.assertEqual(compression_from_filename("a.jsonl.gz"), "gzip")
+        self.assertEqual(compression_from_filename("a.jsonl.bz2"), "bz2")
+        self.assertEqual(compression_from_filename("a.jsonl.xz"), "xz")
+        self.assertIsNone(compression_from_filename("a.jsonl"))
+
+    def test_open_file_with_unsupported_compression(self):
+        with self.assertRaises(ValueError):
+            open_file("a.jsonl", "wb", compression="rar")
+
+
+class JsonLinesWriterTests(TestCase):
+    def test_write(self):
+        with TemporaryDirectory() as temp_dir:
+            filename = path.join(temp_dir, "results.jsonl")
+
+            with JsonLinesWriter(filename) as writer:
+                writer.write(create_analysis_result("hello world"))
+                writer.write(create_analysis_result("hello again"))
+
+            with JsonLinesWriter(filename, append=True) as writer:
+                writer.write(create_analysis_result("last one"))
+
+            with open(filename) as f:
+                lines = [json.loads(line) for line in f]
+
+        self.assertEqual(
+            [line["text"] for line in lines],
+            ["hello world", "hello again", "last one"],
+        )
+        self.assertEqual(lines[0]["named_entities"], {"PERSON": ["john"]})
+
+    def test_write_compressed(self):
+        with TemporaryDirectory() as temp_dir:
+            filename = path.join(temp_dir, "results.jsonl.gz")
+
+            with JsonLinesWriter(filename) as writer:
+                writer.write(create_analysis_result("hello world"))
+
+            with gzip.open(filename, "rt") as f:
+                lines = [json.loads(line) for line in f]
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]["text"], "hello world")
+
+    def test_read_json_lines(self):
+        with TemporaryDirectory() as temp_dir:
+            filename = path.join(temp_dir, "results.jsonl.xz")
+
+            with JsonLinesWriter(filename) as writer:
+                writer.write(create_analysis_result("hello world"))
+                writer.write(create_analysis_result("hello again"))
+
+            results = list(read_json_lines(filename))
+
+        self.assertEqual(
+            [result["text"] for result in results],
+            ["hello world", "hello again"],
+        )
+
+
+class BinaryWriterTests(TestCase):
+    def test_write(self):
+        for compress_fields in [False, True]:
+            with TemporaryDirectory() as temp_dir:
+                filename = path.join(temp_dir, "results.bin")
+
+                with BinaryWriter(
+                    filename, compress_fields=compress_fields
+                ) as writer:
+                    writer.write(create_analysis_result("hello world"))
+                    writer.write(create_analysis_result("hello again"))
+
+                with BinaryWriter(filename, append=True) as writer:
+                    writer.write(create_analysis_result("last one"))
+
+                results = [
+                    TextAnalysisResult.from_dict(data)
+                    for data in read_binary(filename)
+                ]
+
+            self.assertEqual(
+                [result.text for result in results],
+                ["hello world", "hello again", "last one"],
+            )
+            self.assertEqual(results[0].named_entities, {"PERSON": {"john"}})
+
+
+if __name__ == "__main__":
+    main()
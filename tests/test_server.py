@@ -0,0 +1,297 @@
+import json
+import socket
+import threading
+import time
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from text_analysis_helpers.exceptions import NoContentError
+from text_analysis_helpers.models import WebPage
+from text_analysis_helpers.server import AnalysisService, create_server
+
+
+class FakeResult(object):
+    def __init__(self, data):
+        self._data = data
+
+    def as_dict(self):
+        return self._data
+
+
+class FakeTextAnalyser(object):
+    def __init__(self, delay: float):
+        self._delay = delay
+
+    def analyse(self, text):
+        time.sleep(self._delay)
+        if not text:
+            raise NoContentError()
+
+        return FakeResult({"text": text})
+
+
+class FakeHtmlAnalyser(object):
+    def __init__(self, delay: float = 0.0):
+        self.text_analyser = FakeTextAnalyser(delay)
+        self.analysed_pages = 0
+
+    def analyse(self, web_page):
+        self.analysed_pages += 1
+
+        return FakeResult({"url": web_page.url, "html": web_page.html})
+
+    def analyse_url(self, url, timeout):
+        # the download takes as long as the text analysis
+        time.sleep(self.text_analyser._delay)
+
+        return self.analyse(WebPage(url=url, html=f"<html>{timeout}</html>"))
+
+
+class AnalysisServerTests(TestCase):
+    def start_server(self, delay=0.0, workers=1, max_queued=0, timeout=5):
+        self.analysers = []
+
+        def create_analyser():
+            analyser = FakeHtmlAnalyser(delay)
+            self.analysers.append(analyser)
+
+            return analyser
+
+        self.service = AnalysisService(
+            analyser_factory=create_analyser,
+            workers=workers,
+            max_queued=max_queued,
+            timeout=timeout,
+        )
+        self.server = create_server(self.service, port=0)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.start()
+
+        def stop_server():
+            self.server.shutdown()
+            thread.join()
+            self.server.server_close()
+            self.service.close()
+
+        self.addCleanup(stop_server)
+
+    def post(self, endpoint, data):
+        request = Request(
+            self.url + endpoint,
+            data=json.dumps(data).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urlopen(request) as response:
+                return response.status, json.loads(response.read())
+        except HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_analysers_are_warmed_up(self):
+        self.start_server(workers=2)
+
+        self.assertEqual(len(self.analysers), 2)
+        for analyser in self.analysers:
+            self.assertEqual(analyser.analysed_pages, 1)
+
+    def test_health(self):
+        self.start_server()
+
+        with urlopen(self.url + "/health") as response:
+            data = json.loads(response.read())
+
+        self.assertEqual(data["status"], "ok")
+        self.assertEqual(data["workers"], 1)
+        self.assertEqual(data["in_flight"], 0)
+
+    def test_analyse_text(self):
+        self.start_server()
+
+        status, data = self.post("/analyse/text", {"text": "hello world"})
+
+        self.assertEqual(status, 200)
+        self.assertEqual(data, {"text": "hello world"})
+
+    def test_analyse_html(self):
+        self.start_server()
+
+        status, data = self.post(
+            "/analyse/html",
+            {"url": "http://www.example.com", "html": "<html></html>"},
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            data, {"url": "http://www.example.com", "html": "<html></html>"}
+        )
+
+    def test_invalid_requests(self):
+        self.start_server()
+
+        self.assertEqual(self.post("/analyse/text", {})[0], 400)
+        self.assertEqual(self.post("/analyse/text", ["hello"])[0], 400)
+        self.assertEqual(self.post("/analyse/html", {"html": ""})[0], 400)
+        self.assertEqual(self.post("/analyse/text", {"text": ""})[0], 422)
+        self.assertEqual(self.post("/unknown", {"text": "hello"})[0], 404)
+
+    def send_raw_request(self, content_length, body):
+        host, port = self.server.server_address[:2]
+        with socket.create_connection((host, port), timeout=5) as client:
+            client.sendall(
+                b"POST /analyse/text HTTP/1.1\r\n"
+                b"Host: 127.0.0.1\r\n"
+                b"Content-Length: " + content_length + b"\r\n\r\n" + body
+            )
+            response = b""
+            while chunk := client.recv(4096):
+                response += chunk
+
+        return response
+
+    def test_invalid_content_length(self):
+        self.start_server()
+        self.server.max_request_size = 10
+
+        for content_length in [b"-1", b"hello"]:
+            response = self.send_raw_request(content_length, b"x" * 1000)
+
+            self.assertTrue(
+                response.startswith(b"HTTP/1.0 400"), response[:100]
+            )
+
+    def test_reject_requests_when_busy(self):
+        self.start_server(delay=0.5)
+
+        responses = []
+        thread = threading.Thread(
+            target=lambda: responses.append(
+                self.post("/analyse/text", {"text": "first"})
+            )
+        )
+        thread.start()
+
+        while self.service.in_flight == 0:
+            time.sleep(0.01)
+
+        status, _ = self.post("/analyse/text", {"text": "second"})
+        thread.join()
+
+        self.assertEqual(status, 503)
+        self.assertEqual(responses[0][0], 200)
+
+    def test_analyse_url(self):
+        self.start_server()
+
+        status, data = self.post(
+            "/analyse/html", {"url": "http://www.example.com"}
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            data, {"url": "http://www.example.com", "html": "<html>5</html>"}
+        )
+
+    def test_downloads_are_limited(self):
+        self.start_server(delay=0.5)
+
+        responses = []
+        thread = threading.Thread(
+            target=lambda: responses.append(
+                self.post("/analyse/html", {"url": "http://www.example.com"})
+            )
+        )
+        thread.start()
+
+        while self.service.in_flight == 0:
+            time.sleep(0.01)
+
+        status, _ = self.post(
+            "/analyse/html", {"url": "http://www.example.com"}
+        )
+        thread.join()
+
+        self.assertEqual(status, 503)
+        self.assertEqual(responses[0][0], 200)
+
+    def test_download_timeout(self):
+        self.start_server(delay=0.5, timeout=0.05)
+
+        status, _ = self.post(
+            "/analyse/html", {"url": "http://www.example.com"}
+        )
+
+        self.assertEqual(status, 504)
+
+    def test_timeout(self):
+        self.start_server(delay=0.5, timeout=0.05)
+
+        status, data = self.post("/analyse/text", {"text": "hello world"})
+
+        self.assertEqual(status, 504)
+
+    def test_metrics(self):
+        self.start_server()
+
+        self.post("/analyse/text", {"text": "hello world"})
+        self.post("/analyse/text", {})
+
+        with urlopen(self.url + "/metrics") as response:
+            metrics = response.read().decode("utf-8")
+
+        self.assertIn(
+            'text_analysis_responses_total{path="/analyse/text",status="200"} '
+            "1",
+            metrics,
+        )
+        self.assertIn(
+            'text_analysis_responses_total{path="/analyse/text",status="400"} '
+            "1",
+            metrics,
+        )
+        self.assertIn("text_analysis_workers 1", metrics)
+
+
+class AnalysisUnixServerTests(TestCase):
+    def test_analyse_text(self):
+        service = AnalysisService(analyser_factory=FakeHtmlAnalyser)
+
+        with TemporaryDirectory() as temp_dir:
+            socket_file = path.join(temp_dir, "server.sock")
+            server = create_server(service, unix_socket=socket_file)
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+
+            try:
+                body = json.dumps({"text": "hello world"}).encode("utf-8")
+                with socket.socket(socket.AF_UNIX) as client:
+                    client.connect(socket_file)
+                    client.sendall(
+                        b"POST /analyse/text HTTP/1.0\r\n"
+                        b"Content-Length: "
+                        + str(len(body)).encode("ascii")
+                        + b"\r\n\r\n"
+                        + body
+                    )
+                    response = b""
+                    while chunk := client.recv(4096):
+                        response += chunk
+            finally:
+                server.shutdown()
+                thread.join()
+                server.server_close()
+                service.close()
+
+            self.assertFalse(path.exists(socket_file))
+
+        headers, body = response.split(b"\r\n\r\n", 1)
+        self.assertTrue(headers.startswith(b"HTTP/1.0 200"))
+        self.assertEqual(json.loads(body), {"text": "hello world"})
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,20 @@
+import time
 from datetime import datetime
 from unittest import TestCase, main
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import arrow
+import numpy as np
 from dateutil.tz import tzutc
 
+from text_analysis_helpers.budgets import StageCostEstimator
 from text_analysis_helpers.exceptions import NoContentError
 from text_analysis_helpers.models import TextAnalysisResult
-from text_analysis_helpers.text import TextAnalyser
+from text_analysis_helpers.text import (
+    TextAnalyser,
+    TextStatisticsAccumulator,
+    calculate_text_statistics,
+)
 
 
 class TextAnalyserTests(TestCase):
@@ -97,6 +104,131 @@ tincidunt dui sed tincidunt. Duis ut lobortis eros, nec egestas mi."""
         with self.assertRaises(NoContentError):
             analyser.analyse("")
 
+    def test_analyse_after_deadline(self):
+        analyser = TextAnalyser(
+            keyword_extractor=Mock(),
+            summarizer=Mock(),
+            named_entity_extractor=Mock(),
+        )
+
+        text_analysis_result = analyser.analyse(
+            "This is a sentence. This is another sentence.",
+            deadline=time.monotonic() - 1,
+        )
+
+        self.assertEqual(text_analysis_result.statistics.sentence_count, 2)
+        self.assertEqual(
+            sorted(text_analysis_result.skipped_stages),
+            [
+                "keywords",
+                "language_detection",
+                "named_entities",
+                "readability",
+                "summary",
+            ],
+        )
+        self.assertEqual(text_analysis_result.keywords, {})
+        self.assertEqual(text_analysis_result.summary, "")
+        self.assertIsNone(text_analysis_result.language)
+        analyser.summarizer.summarize.assert_not_called()
+
+    def test_analyse_with_budget(self):
+        # the summary is so expensive that only about 1000 characters can be
+        # summarized in the budget. The rest of the stages are free.
+        cost_estimator = StageCostEstimator(
+            {
+                "readability": 0.0,
+                "keywords": 0.0,
+                "summary": 1.0,
+                "named_entities": 0.0,
+                "language_detection": 0.0,
+            }
+        )
+        summarizer = Mock()
+        summarizer.summarize.return_value = "summary"
+        analyser = TextAnalyser(
+            keyword_extractor=Mock(),
+            summarizer=summarizer,
+            named_entity_extractor=Mock(),
+            budget=1000,
+            cost_estimator=cost_estimator,
+        )
+        text = " ".join(
+            f"This is the sentence number {index}." for index in range(100)
+        )
+
+        text_analysis_result = analyser.analyse(text)
+
+        self.assertIsNone(text_analysis_result.skipped_stages)
+        self.assertEqual(text_analysis_result.truncated_stages, ["summary"])
+        self.assertEqual(text_analysis_result.summary, "summary")
+        summarized_text = summarizer.summarize.call_args[0][0]
+        self.assertTrue(text.startswith(summarized_text))
+        self.assertLessEqual(len(summarized_text), 1000)
+        analyser.keyword_extractor.extract_keywords.assert_called_once_with(
+            text
+        )
+
+
+class TextStatisticsAccumulatorTests(TestCase):
+    def setUp(self):
+        self.sentence_word_counts = [5, 13, 9, 7, 12, 9, 11, 6, 10, 13]
+
+    def assert_statistics(self, statistics, sentence_word_counts):
+        expected_statistics = np.array(sentence_word_counts)
+
+        self.assertEqual(statistics.sentence_count, len(sentence_word_counts))
+        self.assertEqual(statistics.word_count, expected_statistics.sum())
+        self.assertEqual(
+            statistics.mean_sentence_word_count, expected_statistics.mean()
+        )
+        self.assertEqual(
+            statistics.median_sentence_word_count,
+            np.median(expected_statistics),
+        )
+        self.assertEqual(
+            statistics.min_sentence_word_count, expected_statistics.min()
+        )
+        self.assertEqual(
+            statistics.max_sentence_word_count, expected_statistics.max()
+        )
+        self.assertAlmostEqual(
+            statistics.sentence_word_count_std, expected_statistics.std()
+        )
+        self.assertAlmostEqual(
+            statistics.sentence_word_count_variance, expected_statistics.var()
+        )
+
+    def test_result(self):
+        for sentence_word_counts in [
+            self.sentence_word_counts,
+            self.sentence_word_counts[:-1],
+            [7],
+        ]:
+            self.assert_statistics(
+                calculate_text_statistics(sentence_word_counts),
+                sentence_word_counts,
+            )
+
+    def test_merge(self):
+        accumulator = TextStatisticsAccumulator()
+        for start in range(0, len(self.sentence_word_counts), 3):
+            end = start + 3
+            accumulator.merge(
+                TextStatisticsAccumulator().update(
+                    self.sentence_word_counts[start:end]
+                )
+            )
+        accumulator.merge(TextStatisticsAccumulator())
+
+        self.assert_statistics(accumulator.result(), self.sentence_word_counts)
+
+    def test_empty_result(self):
+        statistics = TextStatisticsAccumulator().result()
+
+        self.assertEqual(statistics.sentence_count, 0)
+        self.assertEqual(statistics.median_sentence_word_count, 0.0)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,45 @@
+from unittest import TestCase, main
+
+from text_analysis_helpers.tokenizers import (
+    simple_sentence_tokenize,
+    simple_word_tokenize,
+)
+
+
+class SimpleTokenizerTests(TestCase):
+    def test_sentence_tokenize(self):
+        text = (
+            'How are you? "Fine." I paid 3.50 dollars (a lot).\n\n'
+            "A new paragraph without punctuation"
+        )
+
+        self.assertEqual(
+            simple_sentence_tokenize(text),
+            [
+                "How are you?",
+                '"Fine."',
+                "I paid 3.50 dollars (a lot).",
+                "A new paragraph without punctuation",
+            ],
+        )
+        self.assertEqual(simple_sentence_tokenize(""), [])
+
+    def test_word_tokenize(self):
+        self.assertEqual(
+            simple_word_tokenize("It's a well-known fact, it costs 3.50."),
+            [
+                "It's",
+                "a",
+                "well-known",
+                "fact",
+                ",",
+                "it",
+                "costs",
+                "3.50",
+                ".",
+            ],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,440 @@
+import heapq
+import logging
+import math
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from text_analysis_helpers.serializers import read_binary, read_json_lines
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+RESULT_READERS = {"jsonl": read_json_lines, "binary": read_binary}
+
+
+class QuantileSketch(object):
+    """A mergeable sketch of the distribution of some values
+
+    The values are counted in logarithmic buckets, like in DDSketch, so
+    every quantile is estimated with a relative error of at most
+    `relative_accuracy` and the sketches of different shards can be merged
+    by adding their bucket counts. When there are more than `max_buckets`
+    buckets, the buckets of the values that are closest to zero are
+    collapsed.
+    """
+
+    def __init__(
+        self, relative_accuracy: float = 0.01, max_buckets: int = 2048
+    ):
+        """Create a new QuantileSketch object
+
+        :param relative_accuracy: the maximum relative error of the
+            estimated quantiles
+        :param max_buckets: the maximum number of buckets for the positive
+            and for the negative values
+        """
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.zero_count = 0
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive_buckets: Dict[int, int] = defaultdict(int)
+        self._negative_buckets: Dict[int, int] = defaultdict(int)
+
+    def _bucket(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _collapse(self, buckets: Dict[int, int]):
+        if len(buckets) <= self.max_buckets:
+            return
+
+        # the smallest values are merged into the first bucket that is kept
+        keys = sorted(buckets)
+        collapsed_count = len(keys) - self.max_buckets
+        first_key = keys[collapsed_count]
+        for key in keys[:collapsed_count]:
+            buckets[first_key] += buckets.pop(key)
+
+    def add(self, value: float, count: int = 1):
+        """Add a value
+
+        :param value: the value
+        :param count: the number of times the value was observed
+        """
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        if value > 0:
+            self._positive_buckets[self._bucket(value)] += count
+            self._collapse(self._positive_buckets)
+        elif value < 0:
+            self._negative_buckets[self._bucket(-value)] += count
+            self._collapse(self._negative_buckets)
+        else:
+            self.zero_count += count
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Add the values of another sketch to this one
+
+        :param other: a sketch with the same relative accuracy
+        :return: this object
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError(
+                "sketches with different accuracy can't be merged"
+            )
+
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.zero_count += other.zero_count
+        for key, count in other._positive_buckets.items():
+            self._positive_buckets[key] += count
+        for key, count in other._negative_buckets.items():
+            self._negative_buckets[key] += count
+        self._collapse(self._positive_buckets)
+        self._collapse(self._negative_buckets)
+
+        return self
+
+    def _bucket_value(self, key: int) -> float:
+        return 2 * self._gamma**key / (self._gamma + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile
+
+        :param q: the quantile, between 0 and 1
+        :return: the estimated value or None if the sketch is empty
+        """
+        if self.count == 0:
+            return None
+
+        # the extreme values are known exactly
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        position = 0
+        value = None
+        for key in sorted(self._negative_buckets, reverse=True):
+            position += self._negative_buckets[key]
+            if position > rank:
+                value = -self._bucket_value(key)
+                break
+        else:
+            position += self.zero_count
+            if position > rank:
+                value = 0.0
+            else:
+                for key in sorted(self._positive_buckets):
+                    position += self._positive_buckets[key]
+                    if position > rank:
+                        value = self._bucket_value(key)
+                        break
+
+        if value is None:
+            return self.max
+
+        return min(max(value, self.min), self.max)
+
+    def report(self, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> dict:
+        """Summarize the distribution
+
+        :param quantiles: the quantiles to estimate
+        :return: the number of values, their mean, minimum and maximum and
+            the estimated quantiles
+        """
+        if self.count == 0:
+            return {"count": 0}
+
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count,
+            "min": self.min,
+            "max": self.max,
+            "quantiles": {str(q): self.quantile(q) for q in quantiles},
+        }
+
+
+class HeavyHitters(object):
+    """Finds the most frequent items of a stream with bounded memory
+
+    At most twice `capacity` items are counted. When there are more, only
+    the `capacity` most frequent are kept and the largest count that was
+    dropped is added to the error bound. The counts are lower bounds of the
+    true counts and the true count of every item is at most its count plus
+    `error`. Counters of different shards can be merged.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """Create a new HeavyHitters object
+
+        :param capacity: the number of items whose counts are kept
+        """
+        self.capacity = capacity
+        self.error = 0
+        self._counts: Dict[Hashable, int] = defaultdict(int)
+
+    def _prune(self):
+        if len(self._counts) <= 2 * self.capacity:
+            return
+
+        counts = sorted(self._counts.items(), key=itemgetter(1), reverse=True)
+        self.error += counts[self.capacity][1]
+        self._counts = defaultdict(int, counts[: self.capacity])
+
+    def add(self, item: Hashable, count: int = 1):
+        """Count an item
+
+        :param item: the item
+        :param count: the number of times the item was observed
+        """
+        self._counts[item] += count
+        self._prune()
+
+    def merge(self, other: "HeavyHitters") -> "HeavyHitters":
+        """Add the counts of another counter to this one
+
+        :param other: the counter to add
+        :return: this object
+        """
+        self.error += other.error
+        for item, count in other._counts.items():
+            self._counts[item] += count
+        self._prune()
+
+        return self
+
+    def top(self, k: int) -> List[Tuple[Hashable, int]]:
+        """Get the most frequent items
+
+        :param k: the number of items to return
+        :return: the items and their counts in decreasing count order
+        """
+        return heapq.nlargest(k, self._counts.items(), key=itemgetter(1))
+
+
+class CorpusAggregate(object):
+    """Aggregates the text analysis results of a corpus
+
+    The aggregate keeps sketches of the distributions of the readability
+    scores and of the document statistics, the number of documents of every
+    language and the keywords and named entities that are found in most
+    documents. Its memory doesn't depend on the number of documents and the
+    aggregates of different shards can be merged.
+    """
+
+    def __init__(self, capacity: int = 1000, relative_accuracy: float = 0.01):
+        """Create a new CorpusAggregate object
+
+        :param capacity: the number of keywords and named entities whose
+            counts are kept
+        :param relative_accuracy: the relative accuracy of the quantile
+            sketches
+        """
+        self.capacity = capacity
+        self.relative_accuracy = relative_accuracy
+        self.document_count = 0
+        self.languages: Dict[Optional[str], int] = defaultdict(int)
+        self.readability_scores: Dict[str, QuantileSketch] = {}
+        self.statistics: Dict[str, QuantileSketch] = {}
+        self.keywords = HeavyHitters(capacity)
+        self.named_entities = HeavyHitters(capacity)
+
+    def _sketch(self, sketches: Dict[str, QuantileSketch], name: str):
+        sketch = sketches.get(name)
+        if sketch is None:
+            sketch = QuantileSketch(self.relative_accuracy)
+            sketches[name] = sketch
+
+        return sketch
+
+    def add(self, data: dict):
+        """Add an analysis result
+
+        :param data: the analysis result data that were created by the
+            `as_dict` method of a text or html analysis result
+        """
+        self.document_count += 1
+        self.languages[data.get("language")] += 1
+
+        for score, value in (data.get("readability_scores") or {}).items():
+            # the text scores, like the text standard, aren't aggregated
+            if isinstance(value, (int, float)):
+                self._sketch(self.readability_scores, score).add(value)
+
+        for name, value in (data.get("statistics") or {}).items():
+            self._sketch(self.statistics, name).add(value)
+
+        # the keywords and the entities are counted once per document
+        for keyword in {
+            keyword.lower() for keyword in data.get("keywords") or {}
+        }:
+            self.keywords.add(keyword)
+        for named_entity_type, entities in (
+            data.get("named_entities") or {}
+        ).items():
+            for entity in set(entities):
+                self.named_entities.add((named_entity_type, entity))
+
+    def merge(self, other: "CorpusAggregate") -> "CorpusAggregate":
+        """Add the results of another aggregate to this one
+
+        :param other: the aggregate to add
+        :return: this object
+        """
+        self.document_count += other.document_count
+        for language, count in other.languages.items():
+            self.languages[language] += count
+        for sketches, other_sketches in [
+            (self.readability_scores, other.readability_scores),
+            (self.statistics, other.statistics),
+        ]:
+            for name, sketch in other_sketches.items():
+                self._sketch(sketches, name).merge(sketch)
+        self.keywords.merge(other.keywords)
+        self.named_entities.merge(other.named_entities)
+
+        return self
+
+    def report(self, top: int = 50) -> dict:
+        """Create the corpus report
+
+        :param top: the number of keywords and named entities to report
+        :return: the report
+        """
+        return {
+            "document_count": self.document_count,
+            "languages": {
+                str(language): count
+                for language, count in sorted(
+                    self.languages.items(),
+                    key=itemgetter(1),
+                    reverse=True,
+                )
+            },
+            "readability_scores": {
+                score: sketch.report()
+                for score, sketch in sorted(self.readability_scores.items())
+            },
+            "statistics": {
+                name: sketch.report()
+                for name, sketch in sorted(self.statistics.items())
+            },
+            "keywords": [
+                {"keyword": keyword, "documents": count}
+                for keyword, count in self.keywords.top(top)
+            ],
+            "keywords_error": self.keywords.error,
+            "named_entities": [
+                {
+                    "type": named_entity_type,
+                    "entity": entity,
+                    "documents": count,
+                }
+                for (named_entity_type, entity), count in (
+                    self.named_entities.top(top)
+                )
+            ],
+            "named_entities_error": self.named_entities.error,
+        }
+
+
+def aggregate_results(
+    results: Iterable[dict],
+    capacity: int = 1000,
+    relative_accuracy: float = 0.01,
+) -> CorpusAggregate:
+    """Aggregate a stream of analysis results
+
+    :param results: the analysis result data
+    :param capacity: the number of keywords and named entities whose counts
+        are kept
+    :param relative_accuracy: the relative accuracy of the quantile sketches
+    :return: the aggregate
+    """
+    aggregate = CorpusAggregate(capacity, relative_accuracy)
+    for data in results:
+        aggregate.add(data)
+
+    return aggregate
+
+
+def aggregate_file(
+    filename: str,
+    result_format: str = "jsonl",
+    capacity: int = 1000,
+    relative_accuracy: float = 0.01,
+) -> CorpusAggregate:
+    """Aggregate the analysis results of a file
+
+    :param filename: a json lines or a binary file with analysis results
+    :param result_format: `jsonl` or `binary`
+    :param capacity: the number of keywords and named entities whose counts
+        are kept
+    :param relative_accuracy: the relative accuracy of the quantile sketches
+    :return: the aggregate
+    """
+    if result_format not in RESULT_READERS:
+        raise ValueError(f"unknown result format {result_format}")
+
+    logger.info("aggregating %s", filename)
+
+    return aggregate_results(
+        RESULT_READERS[result_format](filename), capacity, relative_accuracy
+    )
+
+
+def aggregate_files(
+    filenames: List[str],
+    result_format: str = "jsonl",
+    capacity: int = 1000,
+    relative_accuracy: float = 0.01,
+    max_workers: Optional[int] = None,
+) -> CorpusAggregate:
+    """Aggregate the analysis results of some files in parallel
+
+    Every file is aggregated by a worker process and the aggregates are
+    merged.
+
+    :param filenames: the json lines or binary files with analysis results
+    :param result_format: `jsonl` or `binary`
+    :param capacity: the number of keywords and named entities whose counts
+        are kept
+    :param relative_accuracy: the relative accuracy of the quantile sketches
+    :param max_workers: the number of worker processes. Defaults to the
+        number of cpus. When it is 0 the files are aggregated in the current
+        process.
+    :return: the aggregate
+    """
+    aggregate = CorpusAggregate(capacity, relative_accuracy)
+    arguments = [
+        (filename, result_format, capacity, relative_accuracy)
+        for filename in filenames
+    ]
+
+    if max_workers == 0:
+        for file_arguments in arguments:
+            aggregate.merge(aggregate_file(*file_arguments))
+    else:
+        max_workers = min(max_workers or os.cpu_count() or 1, len(filenames))
+        with ProcessPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+            for file_aggregate in executor.map(
+                aggregate_file, *zip(*arguments)
+            ):
+                aggregate.merge(file_aggregate)
+
+    return aggregate
@@ -0,0 +1,262 @@
+import gzip
+import logging
+import os
+import re
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from text_analysis_helpers.models import WebPage
+
+logger = logging.getLogger(__name__)
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+HTML_FILE_EXTENSIONS = (".html", ".htm")
+
+_CHARSET_RE = re.compile(
+    rb"""<meta[^>]+charset=["']?([a-zA-Z0-9_\-]+)""", re.I
+)
+_READ_CHUNK_SIZE = 64 * 1024
+
+
+def _parse_headers(lines: list[bytes]) -> dict[str, str]:
+    headers = {}
+    for line in lines:
+        name, separator, value = line.decode("latin-1").partition(":")
+        if separator:
+            headers[name.strip().lower()] = value.strip()
+
+    return headers
+
+
+def _read_header_block(stream: BinaryIO) -> Optional[Tuple[bytes, dict]]:
+    """Read a WARC version line and the header block that follows it
+
+    :param stream: the WARC file
+    :return: the version line and the headers or None if the end of the file
+        was reached
+    """
+    line = stream.readline()
+    while line in (b"\r\n", b"\n"):
+        line = stream.readline()
+
+    if not line:
+        return None
+
+    version = line.strip()
+    lines = []
+    for line in iter(stream.readline, b""):
+        if line in (b"\r\n", b"\n"):
+            break
+        lines.append(line.rstrip(b"\r\n"))
+
+    return version, _parse_headers(lines)
+
+
+def _skip(stream: BinaryIO, size: int):
+    while size > 0:
+        data = stream.read(min(size, _READ_CHUNK_SIZE))
+        if not data:
+            break
+        size -= len(data)
+
+
+def _dechunk(body: bytes) -> bytes:
+    chunks = []
+    position = 0
+    while True:
+        line_end = body.find(b"\r\n", position)
+        if line_end == -1:
+            break
+        size = int(body[position:line_end].split(b";")[0] or b"0", 16)
+        if size == 0:
+            break
+        start = line_end + 2
+        end = start + size
+        chunks.append(body[start:end])
+        position = end + 2
+
+    return b"".join(chunks)
+
+
+def _decompress(body: bytes, content_encoding: str) -> bytes:
+    content_encoding = content_encoding.lower()
+    if content_encoding in ("gzip", "x-gzip"):
+        return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    elif content_encoding == "deflate":
+        return zlib.decompress(body)
+
+    return body
+
+
+def _content_type_charset(content_type: str) -> Optional[str]:
+    for parameter in content_type.split(";")[1:]:
+        name, _, value = parameter.partition("=")
+        if name.strip().lower() == "charset":
+            return value.strip().strip("\"'") or None
+
+    return None
+
+
+def _is_html(content_type: str) -> bool:
+    return content_type.split(";")[0].strip().lower() in HTML_CONTENT_TYPES
+
+
+def decode_html(content: bytes, charset: Optional[str] = None) -> str:
+    """Decode the raw contents of an html document
+
+    The charset that was declared in the response headers is used if it is
+    available, otherwise the charset will be looked up in the meta tags of
+    the document. Utf-8 is used when no charset could be found.
+
+    :param content: the raw html document
+    :param charset: the charset that was declared for the document
+    :return: the decoded html document
+    """
+    if charset is None:
+        match = _CHARSET_RE.search(content[:2048])
+        if match:
+            charset = match.group(1).decode("ascii")
+
+    try:
+        return content.decode(charset or "utf-8", errors="replace")
+    except LookupError:
+        logger.warning("unknown html charset: charset(%s)", charset)
+        return content.decode("utf-8", errors="replace")
+
+
+def _parse_http_response(block: bytes) -> Optional[Tuple[dict, bytes]]:
+    header_end = block.find(b"\r\n\r\n")
+    if header_end == -1:
+        return None
+
+    status_line, *header_lines = block[:header_end].split(b"\r\n")
+    status_line_parts = status_line.split()
+    if len(status_line_parts) < 2 or not status_line_parts[1].isdigit():
+        return None
+
+    status_code = int(status_line_parts[1])
+    if status_code < 200 or status_code >= 300:
+        return None
+
+    headers = _parse_headers(header_lines)
+    body_start = header_end + 4
+    body = block[body_start:]
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        body = _dechunk(body)
+    body = _decompress(body, headers.get("content-encoding", ""))
+
+    return headers, body
+
+
+def _record_to_web_page(headers: dict, block: bytes) -> Optional[WebPage]:
+    warc_type = headers.get("warc-type")
+    url = headers.get("warc-target-uri", "").strip("<>")
+    content_type = headers.get("content-type", "")
+
+    if warc_type == "response" and content_type.startswith("application/http"):
+        response = _parse_http_response(block)
+        if response is None:
+            return None
+        http_headers, body = response
+        content_type = http_headers.get("content-type", "")
+    elif warc_type == "resource":
+        body = block
+    else:
+        return None
+
+    if not _is_html(content_type):
+        return None
+
+    return WebPage(
+        url=url,
+        html=decode_html(body, _content_type_charset(content_type)),
+    )
+
+
+def read_warc(
+    filename: str, max_record_size: Optional[int] = 10 * 1024 * 1024
+) -> Iterator[WebPage]:
+    """Read the html documents that are stored in a WARC file
+
+    Only successful html responses and html resource records are returned.
+    The records are read one at a time so memory usage is bounded by the
+    size of the largest record. Files that end with `.gz` are expected to be
+    gzip compressed.
+
+    :param filename: the path to the WARC file
+    :param max_record_size: records with a content block that is larger than
+        this number of bytes are skipped. Set to None to read every record.
+    :return: an iterator over the web pages in the archive
+    """
+    opener = gzip.open if filename.endswith(".gz") else open
+
+    with opener(filename, "rb") as f:
+        while True:
+            header_block = _read_header_block(f)
+            if header_block is None:
+                break
+
+            version, headers = header_block
+            if not version.startswith(b"WARC/"):
+                logger.warning(
+                    "invalid WARC record: filename(%s) version(%s)",
+                    filename,
+                    version,
+                )
+                break
+
+            content_length = int(headers.get("content-length", "0"))
+            if (
+                max_record_size is not None
+                and content_length > max_record_size
+            ):
+                logger.warning(
+                    "skipping large WARC record: url(%s) size(%d)",
+                    headers.get("warc-target-uri"),
+                    content_length,
+                )
+                _skip(f, content_length)
+                continue
+
+            block = f.read(content_length)
+            web_page = _record_to_web_page(headers, block)
+            if web_page is not None:
+                yield web_page
+
+
+def read_html_directory(
+    directory: str, extensions: Tuple[str, ...] = HTML_FILE_EXTENSIONS
+) -> Iterator[WebPage]:
+    """Read the html files that are stored in a directory
+
+    The directory is searched recursively and the files are returned sorted
+    by their path. The url of every web page is the file uri of the html
+    file.
+
+    :param directory: the directory that contains the html files
+    :param extensions: the extensions of the files that will be read
+    :return: an iterator over the web pages in the directory
+    """
+    for root, directories, filenames in os.walk(directory):
+        directories.sort()
+        for filename in sorted(filenames):
+            if not filename.lower().endswith(extensions):
+                continue
+
+            path = Path(root, filename).absolute()
+            yield WebPage(
+                url=path.as_uri(), html=decode_html(path.read_bytes())
+            )
+
+
+def read_web_pages(path: str) -> Iterator[WebPage]:
+    """Read the web pages that are stored in a WARC file or a directory
+
+    :param path: the path to a WARC file or to a directory with html files
+    :return: an iterator over the web pages
+    """
+    if os.path.isdir(path):
+        return read_html_directory(path)
+
+    return read_warc(path)
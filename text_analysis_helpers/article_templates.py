@@ -0,0 +1,349 @@
+import logging
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from articles.extractors import ArticleExtractor
+from articles.html import create_paragraphs
+from articles.mss.extractors import MSSArticleExtractor
+from lxml import html
+from lxml.html.clean import Cleaner
+
+from text_analysis_helpers.metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TemplateStatistics:
+    fast_path_hits: int
+    fast_path_misses: int
+    full_extractions: int
+    learned_domains: int
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of the extractions that used a learned template"""
+        total = self.fast_path_hits + self.fast_path_misses
+        total += self.full_extractions
+
+        return self.fast_path_hits / total if total else 0.0
+
+
+class _DomainTemplate(object):
+    def __init__(self):
+        self.path = None
+        self.learned_paths = Counter()
+        self.learned_pages = 0
+        self.consecutive_failures = 0
+
+
+def find_maximum_subsequence(scores: List[float]) -> Tuple[int, int]:
+    """Find the subsequence of token scores with the highest sum
+
+    This gives the same subsequence as the MSS article extractor in linear
+    time.
+
+    :param scores: the score of every token
+    :return: the start index and the length of the subsequence
+    """
+    best_score = float("-inf")
+    best_start = 0
+    best_length = 1
+    start = 0
+    score = 0.0
+
+    for i, token_score in enumerate(scores):
+        score += token_score
+        if score > best_score:
+            best_score = score
+            best_start = start
+            best_length = i + 1 - start
+        if score < 0:
+            start = i + 1
+            score = 0.0
+
+    return best_start, best_length
+
+
+class LinearMSSArticleExtractor(MSSArticleExtractor):
+    """MSS article extractor that runs in linear time
+
+    `MSSArticleExtractor` sums the best subsequence again for every token,
+    so its duration grows with the square of the page size. This extractor
+    extracts the same article.
+    """
+
+    def _find_maximum_subsequence(
+        self, scores: List[float]
+    ) -> Tuple[int, int]:
+        return find_maximum_subsequence(scores)
+
+
+def _tokenize_element(element, tokens: List[str], elements: list):
+    """Tokenize the element the same way the MSS article extractor does and
+    keep track of the element that every token belongs to"""
+    tokens.append("<" + element.tag + ">")
+    elements.append(element)
+
+    if element.text:
+        for term in element.text.strip().split():
+            tokens.append(term)
+            elements.append(element)
+
+    for child in element.getchildren():
+        _tokenize_element(child, tokens, elements)
+        if child.tail:
+            for term in child.tail.strip().split():
+                tokens.append(term)
+                elements.append(element)
+
+    tokens.append("</" + element.tag + ">")
+    elements.append(element)
+
+
+def _common_ancestor(first_element, second_element):
+    ancestors = {first_element}
+    ancestors.update(first_element.iterancestors())
+    if second_element in ancestors:
+        return second_element
+
+    for ancestor in second_element.iterancestors():
+        if ancestor in ancestors:
+            return ancestor
+
+    return None
+
+
+class TemplateArticleExtractor(ArticleExtractor):
+    """Article extractor that learns the content container of every domain
+
+    The first pages of a domain are processed with the Maximum Subsequence
+    algorithm and the DOM path of the element that contains the extracted
+    article is recorded. When the same path has been found in enough pages it
+    becomes the template of the domain and later pages are extracted
+    directly from the element at that path. Pages where the element is
+    missing or contains too little text fall back to the full extraction and
+    the template is learned again after repeated failures.
+    """
+
+    def __init__(
+        self,
+        article_extractor: Optional[MSSArticleExtractor] = None,
+        learning_pages: int = 5,
+        min_agreement: float = 0.6,
+        min_words: int = 20,
+        max_failures: int = 3,
+        max_domains: int = 10000,
+        metrics_registry: Optional[MetricsRegistry] = None,
+    ):
+        """Create a new TemplateArticleExtractor object
+
+        :param article_extractor: the MSS article extractor that is used while
+            the template of a domain is learned and when the template fails
+        :param learning_pages: the number of pages of a domain that are used
+            to learn its template
+        :param min_agreement: the fraction of the learning pages whose
+            content must be at the same path for the template to be used
+        :param min_words: the minimum number of words the template element
+            must contain for the extraction to be accepted
+        :param max_failures: the number of consecutive template failures
+            after which the domain template is learned again
+        :param max_domains: the maximum number of domains to keep templates
+            for. The least recently used domains are discarded first.
+        :param metrics_registry: the registry to report the template cache
+            hits and misses to
+        """
+        self._article_extractor = (
+            article_extractor or LinearMSSArticleExtractor()
+        )
+        self._learning_pages = learning_pages
+        self._min_agreement = min_agreement
+        self._min_words = min_words
+        self._max_failures = max_failures
+        self._max_domains = max_domains
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+        self._fast_path_hits = 0
+        self._fast_path_misses = 0
+        self._full_extractions = 0
+        self._metrics_registry = metrics_registry
+
+    def _record_template_lookup(self, result: str):
+        if self._metrics_registry is not None:
+            self._metrics_registry.cache_requests.inc(
+                ("article_template", result)
+            )
+
+    def _parse(self, document: str):
+        cleaner = Cleaner(style=True)
+
+        return cleaner.clean_html(html.document_fromstring(document))
+
+    def _get_template(self, domain: str) -> _DomainTemplate:
+        template = self._templates.get(domain)
+        if template is None:
+            template = _DomainTemplate()
+            self._templates[domain] = template
+            if len(self._templates) > self._max_domains:
+                self._templates.popitem(last=False)
+        else:
+            self._templates.move_to_end(domain)
+
+        return template
+
+    def _find_maximum_subsequence(self, tokens: List[str]) -> Tuple[int, int]:
+        """Find the token span with the highest score
+
+        :param tokens: the document tokens
+        :return: the start and end index of the span
+        """
+        if not tokens:
+            return 0, 0
+
+        scoring = self._article_extractor.scoring
+        start, length = find_maximum_subsequence(
+            [scoring.score(token) for token in tokens]
+        )
+
+        return start, start + length
+
+    def _learn(self, html_document) -> Tuple[str, Optional[str]]:
+        """Extract the article with the MSS algorithm and find the path of
+        the element that contains it
+
+        :param html_document: the cleaned html document
+        :return: the article and the path of the content element
+        """
+        tokens = []
+        elements = []
+        _tokenize_element(html_document, tokens, elements)
+        start, end = self._find_maximum_subsequence(tokens)
+        article = "\n\n".join(create_paragraphs(tokens[start:end]))
+
+        if start >= end:
+            return article, None
+
+        container = _common_ancestor(elements[start], elements[end - 1])
+        if container is None:
+            return article, None
+
+        return article, container.getroottree().getpath(container)
+
+    def _extract_with_template(
+        self, html_document, path: str
+    ) -> Optional[str]:
+        matches = html_document.xpath(path)
+        if len(matches) != 1:
+            return None
+
+        tokens = []
+        _tokenize_element(matches[0], tokens, [])
+        words = [
+            token
+            for token in tokens
+            if not (token.startswith("<") and token.endswith(">"))
+        ]
+        if len(words) < self._min_words:
+            return None
+
+        return "\n\n".join(create_paragraphs(tokens))
+
+    def extract_article(self, document: str, url: Optional[str] = None) -> str:
+        """Extract the article from the page contents
+
+        :param document: the html document to extract the article from
+        :param url: the url of the document. The full MSS extraction is used
+            when the url is not given.
+        :return: the extracted article
+        """
+        domain = urlsplit(url).hostname if url else None
+        if not domain:
+            with self._lock:
+                self._full_extractions += 1
+            self._record_template_lookup("full")
+            return self._article_extractor.extract_article(document)
+
+        html_document = self._parse(document)
+        with self._lock:
+            template = self._get_template(domain)
+            path = template.path
+
+        if path is not None:
+            article = self._extract_with_template(html_document, path)
+            with self._lock:
+                if article is not None:
+                    self._fast_path_hits += 1
+                    template.consecutive_failures = 0
+                    self._record_template_lookup("hit")
+                    return article
+
+                self._fast_path_misses += 1
+                self._record_template_lookup("miss")
+                template.consecutive_failures += 1
+                if template.consecutive_failures >= self._max_failures:
+                    logger.info(
+                        "relearning article template: domain(%s)", domain
+                    )
+                    self._templates[domain] = _DomainTemplate()
+
+            article, _ = self._learn(html_document)
+
+            return article
+
+        article, learned_path = self._learn(html_document)
+        self._record_template_lookup("full")
+        with self._lock:
+            self._full_extractions += 1
+            if template.path is None and learned_path is not None:
+                template.learned_paths[learned_path] += 1
+            template.learned_pages += 1
+            if template.learned_pages >= self._learning_pages:
+                self._select_template(domain, template)
+
+        return article
+
+    def _select_template(self, domain: str, template: _DomainTemplate):
+        if not template.learned_paths:
+            template.learned_pages = 0
+            return
+
+        path, count = template.learned_paths.most_common(1)[0]
+        if count / template.learned_pages >= self._min_agreement:
+            template.path = path
+            logger.info(
+                "learned article template: domain(%s) path(%s)", domain, path
+            )
+        else:
+            template.learned_paths.clear()
+            template.learned_pages = 0
+
+    def template_path(self, domain: str) -> Optional[str]:
+        """Get the learned content element path of a domain
+
+        :param domain: the domain
+        :return: the path or None if no template has been learned
+        """
+        with self._lock:
+            template = self._templates.get(domain)
+
+            return template.path if template else None
+
+    def statistics(self) -> TemplateStatistics:
+        """Get the template usage statistics
+
+        :return: the statistics
+        """
+        with self._lock:
+            return TemplateStatistics(
+                fast_path_hits=self._fast_path_hits,
+                fast_path_misses=self._fast_path_misses,
+                full_extractions=self._full_extractions,
+                learned_domains=sum(
+                    1
+                    for template in self._templates.values()
+                    if template.path is not None
+                ),
+            )
@@ -0,0 +1,148 @@
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+
+from text_analysis_helpers.html import HtmlAnalyser
+from text_analysis_helpers.models import (
+    HtmlAnalysisResult,
+    TextAnalysisResult,
+    WebPage,
+)
+
+logger = logging.getLogger(__name__)
+
+_worker_analyser = None
+
+
+def initialize_worker(analyser_factory: Callable[[], HtmlAnalyser]):
+    """Create the analyser of a worker process
+
+    It is the initializer of the process pools that analyse web pages.
+
+    :param analyser_factory: a picklable callable that creates the analyser
+    """
+    global _worker_analyser
+
+    _worker_analyser = analyser_factory()
+
+
+def _analyse_web_page(web_page: WebPage) -> HtmlAnalysisResult:
+    return _worker_analyser.analyse(web_page)
+
+
+def extract_article_in_worker(web_page: WebPage) -> str:
+    """Extract the article of a web page with the worker analyser
+
+    :param web_page: the web page
+    :return: the article text
+    """
+    return _worker_analyser._extract_article(web_page)
+
+
+def analyse_text_in_worker(text: str) -> TextAnalysisResult:
+    """Analyse a text with the text analyser of the worker analyser
+
+    :param text: the text to analyse
+    :return: the text analysis result
+    """
+    return _worker_analyser.text_analyser.analyse(text)
+
+
+def extract_metadata_in_worker(web_page: WebPage) -> dict:
+    """Extract the metadata of a web page with the worker analyser
+
+    :param web_page: the web page
+    :return: the web page metadata
+    """
+    return _worker_analyser._extract_metadata(web_page)
+
+
+def analyse_web_pages(
+    web_pages: Iterable[WebPage],
+    analyser_factory: Callable[[], HtmlAnalyser] = HtmlAnalyser,
+    max_workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+) -> Iterator[HtmlAnalysisResult]:
+    """Analyse the given web pages in parallel
+
+    Every worker process creates its own analyser once, when it starts. The
+    web pages are consumed lazily and at most `max_pending` of them are
+    being analysed at any time, so memory usage stays bounded for any number
+    of web pages. The results are returned in the same order as the web
+    pages. Web pages that could not be analysed are logged and skipped.
+
+    :param web_pages: the web pages to analyse
+    :param analyser_factory: a picklable callable that creates the analyser
+        that each worker will use
+    :param max_workers: the number of worker processes. Defaults to the
+        number of cpus. When it is 0 the web pages are analysed in the
+        current process, which is useful when profiling.
+    :param max_pending: the maximum number of web pages that are submitted
+        for analysis but whose result hasn't been returned yet. Defaults to
+        twice the number of workers.
+    :return: an iterator over the analysis results
+    """
+    if max_workers == 0:
+        return _analyse_in_process(web_pages, analyser_factory())
+
+    return _analyse_in_pool(
+        web_pages,
+        analyser_factory,
+        max_workers or os.cpu_count() or 1,
+        max_pending,
+    )
+
+
+def _analyse_in_process(
+    web_pages: Iterable[WebPage], analyser: HtmlAnalyser
+) -> Iterator[HtmlAnalysisResult]:
+    for web_page in web_pages:
+        try:
+            yield analyser.analyse(web_page)
+        except Exception:
+            logger.exception(
+                "failed to analyse web page: url(%s)", web_page.url
+            )
+
+
+def _analyse_in_pool(
+    web_pages: Iterable[WebPage],
+    analyser_factory: Callable[[], HtmlAnalyser],
+    max_workers: int,
+    max_pending: Optional[int],
+) -> Iterator[HtmlAnalysisResult]:
+    max_pending = max_pending or 2 * max_workers
+    pending = deque()
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=initialize_worker,
+        initargs=(analyser_factory,),
+    ) as executor:
+        try:
+            for web_page in web_pages:
+                if len(pending) >= max_pending:
+                    result = _get_result(*pending.popleft())
+                    if result is not None:
+                        yield result
+
+                future = executor.submit(_analyse_web_page, web_page)
+                pending.append((web_page.url, future))
+
+            while pending:
+                result = _get_result(*pending.popleft())
+                if result is not None:
+                    yield result
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def _get_result(url, future) -> Optional[HtmlAnalysisResult]:
+    try:
+        return future.result()
+    except Exception:
+        logger.exception("failed to analyse web page: url(%s)", url)
+        return None
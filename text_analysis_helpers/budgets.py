@@ -0,0 +1,122 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+# initial estimates of the duration of every stage in seconds per character
+# of text. They are replaced by the measured durations after the first few
+# documents have been analysed.
+DEFAULT_STAGE_COSTS = {
+    "language_detection": 5e-7,
+    "keywords": 2e-6,
+    "readability": 5e-6,
+    "summary": 2e-5,
+    "named_entities": 4e-5,
+}
+
+
+class StageCostEstimator(object):
+    """Estimates the duration of the analysis stages
+
+    The cost of every stage is kept as an exponentially weighted moving
+    average of its duration per character of the analysed text.
+    """
+
+    def __init__(
+        self,
+        initial_costs: Optional[Dict[str, float]] = None,
+        smoothing: float = 0.2,
+    ):
+        """Create a new StageCostEstimator object
+
+        :param initial_costs: the initial cost of every stage in seconds per
+            character
+        :param smoothing: the weight of the latest measurement in the moving
+            average
+        """
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be in the range (0, 1]")
+
+        self.smoothing = smoothing
+        self._costs = dict(initial_costs or DEFAULT_STAGE_COSTS)
+        self._lock = threading.Lock()
+
+    def cost(self, stage: str) -> float:
+        """Get the cost of a stage
+
+        :param stage: the stage name
+        :return: the cost in seconds per character
+        """
+        with self._lock:
+            return self._costs.get(stage, 0.0)
+
+    def estimate(self, stage: str, size: int) -> float:
+        """Estimate the duration of a stage
+
+        :param stage: the stage name
+        :param size: the number of characters of the text
+        :return: the estimated duration in seconds
+        """
+        return self.cost(stage) * size
+
+    def update(self, stage: str, size: int, duration: float):
+        """Update the cost of a stage with a measured duration
+
+        :param stage: the stage name
+        :param size: the number of characters of the text
+        :param duration: the duration of the stage in seconds
+        """
+        if size <= 0:
+            return
+
+        cost = duration / size
+        with self._lock:
+            previous_cost = self._costs.get(stage)
+            if previous_cost is None:
+                self._costs[stage] = cost
+            else:
+                self._costs[stage] = (
+                    self.smoothing * cost
+                    + (1 - self.smoothing) * previous_cost
+                )
+
+    def order(self, stages: Iterable[str]) -> List[str]:
+        """Sort stages from the cheapest to the most expensive
+
+        :param stages: the stage names
+        :return: the sorted stage names
+        """
+        with self._lock:
+            return sorted(stages, key=lambda stage: self._costs.get(stage, 0))
+
+
+def create_deadline(
+    deadline: Optional[float] = None, budget: Optional[float] = None
+) -> Optional[float]:
+    """Get the deadline of an analysis
+
+    :param deadline: the deadline as a `time.monotonic()` timestamp
+    :param budget: the number of seconds the analysis may take
+    :return: the earliest of the deadline and the end of the budget or None
+        if there is neither
+    """
+    if budget is not None:
+        budget_deadline = time.monotonic() + budget
+        deadline = (
+            budget_deadline
+            if deadline is None
+            else min(deadline, budget_deadline)
+        )
+
+    return deadline
+
+
+def remaining_time(deadline: Optional[float]) -> Optional[float]:
+    """Get the time that remains until a deadline
+
+    :param deadline: the deadline as a `time.monotonic()` timestamp
+    :return: the remaining seconds or None if there is no deadline
+    """
+    if deadline is None:
+        return None
+
+    return deadline - time.monotonic()
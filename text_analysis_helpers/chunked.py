@@ -0,0 +1,560 @@
+import hashlib
+import logging
+import os
+import re
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from text_analysis_helpers.exceptions import NoContentError
+from text_analysis_helpers.keywords.rake import Rake, RakeAccumulator
+from text_analysis_helpers.models import TextAnalysisResult
+from text_analysis_helpers.text import TextAnalyser, TextStatisticsAccumulator
+from text_analysis_helpers.tokenizers import PARAGRAPH_BOUNDARY, SENTENCE_END
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 100 * 1024
+
+# the readability scores that are counts instead of averages
+_SUMMED_READABILITY_SCORES = {"difficult_words"}
+
+_WHITESPACE = re.compile(r"\s*")
+
+_worker_analyser = None
+
+
+class ChunkResult(object):
+    """The mergeable analysis data of a chunk of a text"""
+
+    __slots__ = (
+        "size",
+        "statistics",
+        "keyword_counts",
+        "keywords",
+        "readability_scores",
+        "summary",
+        "named_entities",
+        "language",
+    )
+
+    def __init__(
+        self,
+        size: int,
+        statistics: TextStatisticsAccumulator,
+        keyword_counts: Optional[RakeAccumulator],
+        keywords: Optional[Dict[str, float]],
+        readability_scores: dict,
+        summary: str,
+        named_entities: Dict[str, Set[str]],
+        language: Optional[str],
+    ):
+        """Create a new ChunkResult object
+
+        :param size: the number of characters of the chunk
+        :param statistics: the statistics of the chunk sentences
+        :param keyword_counts: the RAKE counts when the keyword extractor is
+            Rake
+        :param keywords: the keywords when the keyword extractor is not Rake
+        :param readability_scores: the readability scores
+        :param summary: the chunk summary
+        :param named_entities: the named entities
+        :param language: the detected language
+        """
+        self.size = size
+        self.statistics = statistics
+        self.keyword_counts = keyword_counts
+        self.keywords = keywords
+        self.readability_scores = readability_scores
+        self.summary = summary
+        self.named_entities = named_entities
+        self.language = language
+
+
+def _split_long_text(text: str, max_chunk_size: int) -> Iterator[str]:
+    # the whitespace after a sentence is kept in the same segment, so the
+    # segments start with the next sentence
+    ends = [
+        _WHITESPACE.match(text, match.end()).end()
+        for match in SENTENCE_END.finditer(text)
+    ]
+
+    start = 0
+    for end in ends + [len(text)]:
+        # the sentences that are longer than the chunk size are split
+        # anywhere
+        for position in range(start, end, max_chunk_size):
+            segment_end = min(position + max_chunk_size, end)
+            yield text[position:segment_end]
+        start = end
+
+
+def _paragraphs(text: str) -> Iterator[str]:
+    start = 0
+    for match in PARAGRAPH_BOUNDARY.finditer(text):
+        end = match.end()
+        yield text[start:end]
+        start = end
+
+    yield text[start:]
+
+
+def split_text(
+    text: str, max_chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> List[str]:
+    """Split a text into chunks at paragraph or sentence boundaries
+
+    The paragraphs are grouped into chunks of at most `max_chunk_size`
+    characters. Paragraphs that are longer than that are split at sentence
+    boundaries. The chunks can be joined back into the original text.
+
+    :param text: the text to split
+    :param max_chunk_size: the maximum chunk size in characters
+    :return: the chunks
+    """
+    chunks = []
+    chunk_segments = []
+    chunk_size = 0
+    for paragraph in _paragraphs(text):
+        if len(paragraph) > max_chunk_size:
+            segments = _split_long_text(paragraph, max_chunk_size)
+        else:
+            segments = [paragraph]
+
+        for segment in segments:
+            if chunk_segments and chunk_size + len(segment) > max_chunk_size:
+                chunks.append("".join(chunk_segments))
+                chunk_segments = []
+                chunk_size = 0
+
+            chunk_segments.append(segment)
+            chunk_size += len(segment)
+
+    if chunk_segments:
+        chunks.append("".join(chunk_segments))
+
+    return [chunk for chunk in chunks if chunk]
+
+
+def analyse_chunk(analyser: TextAnalyser, chunk: str) -> ChunkResult:
+    """Analyse a chunk of a text
+
+    :param analyser: the text analyser whose components to use
+    :param chunk: the chunk to analyse
+    :return: the mergeable analysis data of the chunk
+    """
+    disabled_stages = analyser.disabled_stages
+
+    sentences, sentence_words = analyser._tokenize(chunk)
+    statistics = TextStatisticsAccumulator().update(
+        len(words) for words in sentence_words
+    )
+
+    keyword_counts = None
+    keywords = None
+    if "keywords" not in disabled_stages:
+        if isinstance(analyser.keyword_extractor, Rake):
+            keyword_counts = analyser.keyword_extractor.count_keywords(chunk)
+            # only the counts are sent back from the worker processes
+            keyword_counts.rake = None
+        else:
+            keywords = analyser.keyword_extractor.extract_keywords(chunk)
+
+    def run_stage(stage: str):
+        if stage in disabled_stages:
+            return None
+
+        stage_input = analyser._stage_input(stage, chunk)
+        if stage_input is chunk:
+            return analyser._run_stage(stage, chunk, sentences, sentence_words)
+
+        return analyser._run_stage(stage, stage_input)
+
+    return ChunkResult(
+        size=len(chunk),
+        statistics=statistics,
+        keyword_counts=keyword_counts,
+        keywords=keywords,
+        readability_scores=run_stage("readability") or {},
+        summary=run_stage("summary") or "",
+        named_entities=run_stage("named_entities") or {},
+        language=run_stage("language_detection"),
+    )
+
+
+class ChunkResultAccumulator(object):
+    """Merges the analysis data of the chunks of a text
+
+    The chunk results are merged as they are added, so only the merged data
+    is kept in memory:
+
+    - the keywords are scored from the merged RAKE word and candidate counts
+    - the sentence statistics are merged
+    - the readability scores are averaged, weighted by the chunk word counts
+    - the named entities of the chunks are joined
+    - the language is the language of most of the text
+    - the summary is the summary of the chunk summaries. When the buffered
+      chunk summaries are longer than `max_summaries_size` they are
+      summarized and only their summary is kept, so they are reduced
+      hierarchically instead of growing with the text.
+    """
+
+    def __init__(
+        self,
+        max_summaries_size: Optional[int] = None,
+        summarize: Optional[Callable[[str], str]] = None,
+    ):
+        """Create a new ChunkResultAccumulator object
+
+        :param max_summaries_size: the maximum size in characters of the
+            buffered chunk summaries or None to keep all of them
+        :param summarize: the callable that summarizes the buffered chunk
+            summaries when they are longer than `max_summaries_size`
+        """
+        self.max_summaries_size = max_summaries_size
+        self.summarize = summarize
+        self._statistics = TextStatisticsAccumulator()
+        self._keyword_counts = None
+        # the scores of keyword extractors other than Rake can't be merged
+        # exactly, so the scores of every chunk are added
+        self._keywords = defaultdict(float)
+        self._readability_sums = {}
+        self._readability_weights = defaultdict(int)
+        self._readability_texts = defaultdict(lambda: defaultdict(int))
+        self._named_entities = defaultdict(set)
+        self._language_sizes = defaultdict(int)
+        self._summaries = []
+        self._summaries_size = 0
+
+    def add(self, chunk_result: ChunkResult):
+        """Add the analysis data of a chunk
+
+        :param chunk_result: the analysis data of the chunk
+        """
+        self._statistics.merge(chunk_result.statistics)
+        word_count = chunk_result.statistics.word_count
+
+        if chunk_result.keyword_counts is not None:
+            # the counts of the first chunk keep the keyword selection
+            # options of the extractor
+            if self._keyword_counts is None:
+                self._keyword_counts = chunk_result.keyword_counts
+            else:
+                self._keyword_counts.merge(chunk_result.keyword_counts)
+        for keyword, score in (chunk_result.keywords or {}).items():
+            self._keywords[keyword] += score
+
+        for score, value in chunk_result.readability_scores.items():
+            self._readability_sums.setdefault(score, 0)
+            if isinstance(value, str):
+                self._readability_texts[score][value] += word_count
+            elif score in _SUMMED_READABILITY_SCORES:
+                self._readability_sums[score] += value
+            else:
+                self._readability_sums[score] += value * word_count
+                self._readability_weights[score] += word_count
+
+        for named_entity_type, entities in chunk_result.named_entities.items():
+            self._named_entities[named_entity_type].update(entities)
+
+        if chunk_result.language is not None:
+            self._language_sizes[chunk_result.language] += chunk_result.size
+
+        if chunk_result.summary:
+            self._add_summary(chunk_result.summary)
+
+    def _add_summary(self, summary: str):
+        self._summaries.append(summary)
+        self._summaries_size += len(summary)
+
+        if (
+            self.summarize is not None
+            and self.max_summaries_size is not None
+            and len(self._summaries) > 1
+            and self._summaries_size > self.max_summaries_size
+        ):
+            summary = self.summarize(self.chunk_summaries)
+            self._summaries = [summary] if summary else []
+            self._summaries_size = len(summary)
+
+    @property
+    def chunk_summaries(self) -> str:
+        """The summaries of the chunks"""
+        return "\n\n".join(self._summaries)
+
+    def _readability_scores(self) -> dict:
+        readability_scores = {}
+        for score, value_sum in self._readability_sums.items():
+            if score in self._readability_texts:
+                # the text scores take the value of the chunks with most words
+                value_word_counts = self._readability_texts[score]
+                readability_scores[score] = max(
+                    value_word_counts, key=value_word_counts.get
+                )
+            elif score in _SUMMED_READABILITY_SCORES:
+                readability_scores[score] = value_sum
+            elif self._readability_weights[score]:
+                readability_scores[score] = round(
+                    value_sum / self._readability_weights[score], 2
+                )
+            else:
+                readability_scores[score] = 0.0
+
+        return readability_scores
+
+    def result(self, text: Optional[str], summary: str) -> TextAnalysisResult:
+        """Create the analysis result of the whole text
+
+        :param text: the analysed text
+        :param summary: the summary of the text
+        :return: the analysis result
+        """
+        if self._keyword_counts is not None:
+            keywords = self._keyword_counts.result()
+        else:
+            keywords = dict(self._keywords)
+
+        language = None
+        if self._language_sizes:
+            language = max(self._language_sizes, key=self._language_sizes.get)
+
+        return TextAnalysisResult(
+            text=text,
+            keywords=keywords,
+            readability_scores=self._readability_scores(),
+            statistics=self._statistics.result(),
+            summary=summary,
+            named_entities=dict(self._named_entities),
+            language=language,
+        )
+
+
+def merge_chunk_results(
+    text: Optional[str], chunk_results: Iterable[ChunkResult], summary: str
+) -> TextAnalysisResult:
+    """Merge the analysis data of the chunks of a text
+
+    :param text: the analysed text
+    :param chunk_results: the analysis data of every chunk
+    :param summary: the summary of the text
+    :return: the analysis result of the whole text
+    """
+    accumulator = ChunkResultAccumulator()
+    for chunk_result in chunk_results:
+        accumulator.add(chunk_result)
+
+    return accumulator.result(text, summary)
+
+
+def _summarize(analyser: TextAnalyser, chunk_summaries: str) -> str:
+    if not chunk_summaries or "summary" in analyser.disabled_stages:
+        return ""
+
+    return analyser.summarizer.summarize(chunk_summaries)
+
+
+def _initialize_worker(analyser_factory: Callable[[], TextAnalyser]):
+    global _worker_analyser
+
+    _worker_analyser = analyser_factory()
+
+
+def _analyse_worker_chunk(chunk: str) -> ChunkResult:
+    return analyse_chunk(_worker_analyser, chunk)
+
+
+def _summarize_in_worker(chunk_summaries: str) -> str:
+    return _summarize(_worker_analyser, chunk_summaries)
+
+
+def _summarize_in_executor(executor, chunk_summaries: str) -> str:
+    return executor.submit(_summarize_in_worker, chunk_summaries).result()
+
+
+def _analyse_chunks(
+    chunks: Iterable[str],
+    analyser_factory: Callable[[], TextAnalyser],
+    max_workers: Optional[int],
+    max_pending: Optional[int],
+    max_chunk_size: int,
+) -> TextAnalysisResult:
+    """Analyse the chunks of a text and merge the results
+
+    The chunks are consumed lazily and at most `max_pending` of them are
+    being analysed at any time. The chunk summaries are summarized whenever
+    they are longer than a chunk.
+
+    :return: the analysis result without the text and with the digest of
+        the text
+    """
+    text_digest = hashlib.sha256()
+    chunk_count = 0
+
+    if max_workers == 0:
+        analyser = analyser_factory()
+        accumulator = ChunkResultAccumulator(
+            max_chunk_size, partial(_summarize, analyser)
+        )
+        for chunk in chunks:
+            text_digest.update(chunk.encode("utf-8"))
+            accumulator.add(analyse_chunk(analyser, chunk))
+            chunk_count += 1
+
+        summary = _summarize(analyser, accumulator.chunk_summaries)
+    else:
+        max_workers = max_workers or os.cpu_count() or 1
+        max_pending = max_pending or 2 * max_workers
+        pending = deque()
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_initialize_worker,
+            initargs=(analyser_factory,),
+        ) as executor:
+            accumulator = ChunkResultAccumulator(
+                max_chunk_size, partial(_summarize_in_executor, executor)
+            )
+            try:
+                for chunk in chunks:
+                    if len(pending) >= max_pending:
+                        accumulator.add(pending.popleft().result())
+
+                    text_digest.update(chunk.encode("utf-8"))
+                    pending.append(
+                        executor.submit(_analyse_worker_chunk, chunk)
+                    )
+                    chunk_count += 1
+
+                while pending:
+                    accumulator.add(pending.popleft().result())
+            finally:
+                for future in pending:
+                    future.cancel()
+
+            summary = executor.submit(
+                _summarize_in_worker, accumulator.chunk_summaries
+            ).result()
+
+    if chunk_count == 0:
+        raise NoContentError()
+    logger.debug("analysed %d chunks", chunk_count)
+
+    analysis_result = accumulator.result(None, summary)
+    analysis_result.text_digest = text_digest.hexdigest()
+
+    return analysis_result
+
+
+def analyse_chunked(
+    text: str,
+    analyser_factory: Callable[[], TextAnalyser] = TextAnalyser,
+    max_chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: Optional[int] = None,
+    keep_text: bool = True,
+) -> TextAnalysisResult:
+    """Analyse a large text in chunks in parallel
+
+    The text is split into chunks at paragraph and sentence boundaries and
+    every chunk is analysed by a worker process, so the memory that the
+    analysis needs depends on the chunk size instead of the text size. The
+    chunk results are merged with a `ChunkResultAccumulator`. The keyword
+    scores and the statistics are the same as the scores of the whole text,
+    except for the candidate keywords that cross chunk boundaries.
+
+    :param text: the text to analyse
+    :param analyser_factory: a picklable callable that creates the analyser
+        that each worker will use
+    :param max_chunk_size: the maximum chunk size in characters
+    :param max_workers: the number of worker processes. Defaults to the
+        number of cpus. When it is 0 the chunks are analysed in the current
+        process.
+    :param keep_text: keep the analysed text in the result
+    :return: the analysis result
+    """
+    if len(text) == 0:
+        raise NoContentError()
+
+    chunks = split_text(text, max_chunk_size)
+    if max_workers != 0:
+        max_workers = min(max_workers or os.cpu_count() or 1, len(chunks))
+
+    analysis_result = _analyse_chunks(
+        chunks,
+        analyser_factory,
+        max_workers,
+        max_pending=None,
+        max_chunk_size=max_chunk_size,
+    )
+    if keep_text:
+        analysis_result.text = text
+        analysis_result.text_digest = None
+
+    return analysis_result
+
+
+def iter_file_chunks(
+    filename: str,
+    max_chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+) -> Iterator[str]:
+    """Read a text file in chunks that end at paragraph or sentence
+    boundaries
+
+    The file is read incrementally. The text after the last boundary of
+    every buffer that is read is carried over to the next chunk, so at most
+    about twice the chunk size is kept in memory.
+
+    :param filename: the path to the file
+    :param max_chunk_size: the maximum chunk size in characters
+    :param encoding: the file encoding
+    :return: an iterator over the chunks
+    """
+    with open(filename, "r", encoding=encoding) as f:
+        remainder = ""
+        while True:
+            data = f.read(max_chunk_size)
+            if not data:
+                if remainder:
+                    yield from split_text(remainder, max_chunk_size)
+                return
+
+            chunks = split_text(remainder + data, max_chunk_size)
+            # the last chunk might end in the middle of a sentence
+            remainder = chunks.pop()
+            yield from chunks
+
+
+def analyse_file_chunked(
+    filename: str,
+    analyser_factory: Callable[[], TextAnalyser] = TextAnalyser,
+    max_chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    encoding: str = "utf-8",
+) -> TextAnalysisResult:
+    """Analyse a text file in chunks without loading the whole file
+
+    The file is read incrementally with `iter_file_chunks` and the chunks
+    are analysed and merged like in `analyse_chunked`, so files that are
+    larger than the available memory can be analysed. The text is not kept
+    in the result, only its digest.
+
+    :param filename: the path to the file
+    :param analyser_factory: a picklable callable that creates the analyser
+        that each worker will use
+    :param max_chunk_size: the maximum chunk size in characters
+    :param max_workers: the number of worker processes. Defaults to the
+        number of cpus. When it is 0 the chunks are analysed in the current
+        process.
+    :param max_pending: the maximum number of chunks that are being analysed
+        at any time. Defaults to twice the number of workers.
+    :param encoding: the file encoding
+    :return: the analysis result
+    """
+    return _analyse_chunks(
+        iter_file_chunks(filename, max_chunk_size, encoding),
+        analyser_factory,
+        max_workers,
+        max_pending,
+        max_chunk_size,
+    )
@@ -1,21 +1,196 @@
 from argparse import ArgumentParser
 
-from text_analysis_helpers.html import HtmlAnalyser
-from text_analysis_helpers.text import TextAnalyser
 
+def _create_html_analyser(preset=None, metrics_registry=None):
+    if preset is not None:
+        from text_analysis_helpers.presets import create_html_analyser
 
-def analyse_url(args):
-    analyser = HtmlAnalyser()
+        return create_html_analyser(preset, metrics_registry=metrics_registry)
+
+    from text_analysis_helpers.html import HtmlAnalyser
+
+    return HtmlAnalyser(metrics_registry=metrics_registry)
+
+
+def analyse_url(args, metrics_registry=None):
+    analyser = _create_html_analyser(args.preset, metrics_registry)
     analysis_result = analyser.analyse_url(args.url)
     analysis_result.save(args.output)
 
 
-def analyse_file(args):
-    analyser = TextAnalyser()
-    analysis_result = analyser.analyse_file(args.filename)
+def _create_text_analyser(preset=None, metrics_registry=None):
+    if preset is not None:
+        from text_analysis_helpers.presets import create_text_analyser
+
+        return create_text_analyser(preset, metrics_registry=metrics_registry)
+
+    from text_analysis_helpers.text import TextAnalyser
+
+    return TextAnalyser(metrics_registry=metrics_registry)
+
+
+def analyse_file(args, metrics_registry=None):
+    if args.chunk_size is not None:
+        from functools import partial
+
+        from text_analysis_helpers.chunked import analyse_file_chunked
+
+        # the chunks are analysed in this process when profiling so that the
+        # profile covers the analysis
+        analysis_result = analyse_file_chunked(
+            args.filename,
+            analyser_factory=partial(
+                _create_text_analyser, args.preset, metrics_registry
+            ),
+            max_chunk_size=args.chunk_size,
+            max_workers=0 if metrics_registry is not None else args.workers,
+        )
+    else:
+        analyser = _create_text_analyser(args.preset, metrics_registry)
+        analysis_result = analyser.analyse_file(args.filename)
+
     analysis_result.save(args.output)
 
 
+def analyse_archive(args, metrics_registry=None):
+    from functools import partial
+
+    from text_analysis_helpers.archives import read_web_pages
+    from text_analysis_helpers.batch import analyse_web_pages
+    from text_analysis_helpers.serializers import JsonLinesWriter
+
+    web_pages = read_web_pages(args.path)
+    if metrics_registry is None:
+        analysis_results = analyse_web_pages(
+            web_pages,
+            analyser_factory=partial(_create_html_analyser, args.preset),
+            max_workers=args.workers,
+        )
+    else:
+        # the web pages are analysed in this process so that the profile
+        # covers the analysis
+        analysis_results = analyse_web_pages(
+            web_pages,
+            analyser_factory=partial(
+                _create_html_analyser, args.preset, metrics_registry
+            ),
+            max_workers=0,
+        )
+
+    with JsonLinesWriter(args.output) as writer:
+        for analysis_result in analysis_results:
+            writer.write(analysis_result)
+
+
+def run_server(args, metrics_registry=None):
+    import logging
+
+    from text_analysis_helpers.server import serve
+
+    logging.basicConfig(level=logging.INFO)
+
+    serve(
+        host=args.host,
+        port=args.port,
+        unix_socket=args.unix_socket,
+        workers=args.workers,
+        max_queued=args.max_queued,
+        timeout=args.timeout,
+        max_request_size=args.max_request_size,
+        preset=args.preset,
+    )
+
+
+def _iter_corpus_documents(paths, document_per_line):
+    import os
+
+    filenames = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, directory_filenames in os.walk(path):
+                filenames.extend(
+                    os.path.join(directory, filename)
+                    for filename in sorted(directory_filenames)
+                    if filename.endswith(".txt")
+                )
+        else:
+            filenames.append(path)
+
+    for filename in filenames:
+        with open(filename, "r") as f:
+            if document_per_line:
+                for line in f:
+                    if line.strip():
+                        yield line
+            else:
+                yield f.read()
+
+
+def build_idf_index(args, metrics_registry=None):
+    from text_analysis_helpers.keywords.tfidf import (
+        IdfIndexBuilder,
+        NgramExtractor,
+    )
+
+    builder = IdfIndexBuilder(
+        NgramExtractor(
+            max_ngram_size=args.max_ngram_size, language=args.language
+        ),
+        min_document_frequency=args.min_document_frequency,
+    )
+    for document in _iter_corpus_documents(args.paths, args.document_per_line):
+        builder.add_document(document)
+
+    builder.build().save(args.output)
+
+
+def aggregate(args, metrics_registry=None):
+    from text_analysis_helpers.aggregates import aggregate_files
+    from text_analysis_helpers.serializers import dumps
+
+    corpus_aggregate = aggregate_files(
+        args.paths,
+        result_format=args.format,
+        capacity=args.capacity,
+        max_workers=args.workers,
+    )
+
+    with open(args.output, "wb") as f:
+        f.write(dumps(corpus_aggregate.report(top=args.top)))
+
+
+def add_preset_argument(parser):
+    parser.add_argument(
+        "--preset",
+        choices=["fast", "balanced", "full"],
+        default=None,
+        help="analyse with the components of a speed/quality preset instead "
+        "of the default analysers",
+    )
+
+
+def add_profiling_arguments(parser):
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="profile the analysis and print a summary of the time spent in "
+        "every stage",
+    )
+
+    parser.add_argument(
+        "--profile-output",
+        default="analysis.prof",
+        help="the file in which to save the cProfile statistics",
+    )
+
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="record the peak memory of every stage with tracemalloc when "
+        "profiling",
+    )
+
+
 def get_arguments():
     parser = ArgumentParser()
     subparsers = parser.add_subparsers()
@@ -33,6 +208,8 @@ def get_arguments():
     )
 
     url_parser.add_argument("url", help="the url to analyse")
+    add_preset_argument(url_parser)
+    add_profiling_arguments(url_parser)
     url_parser.set_defaults(func=analyse_url)
 
     file_parser = subparsers.add_parser(
@@ -48,11 +225,211 @@ def get_arguments():
     )
 
     file_parser.add_argument("filename", help="the file to analyse")
+
+    file_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="read the file in chunks of at most this many characters and "
+        "analyse them in parallel. The text isn't kept in the result.",
+    )
+
+    file_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="the number of worker processes that analyse the chunks",
+    )
+    add_preset_argument(file_parser)
+    add_profiling_arguments(file_parser)
     file_parser.set_defaults(func=analyse_file)
 
+    archive_parser = subparsers.add_parser(
+        "analyse-archive",
+        description="analyse the web pages in a WARC file or a directory "
+        "with html files",
+        help="analyse the web pages in a WARC file or a directory",
+    )
+
+    archive_parser.add_argument(
+        "--output",
+        default="analysis_results.jsonl",
+        help="the name of the json lines file in which to save the results. "
+        "The file is compressed if it ends with .gz, .bz2 or .xz",
+    )
+
+    archive_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="the number of worker processes to use",
+    )
+
+    archive_parser.add_argument(
+        "path", help="the WARC file or the directory to analyse"
+    )
+    add_preset_argument(archive_parser)
+    add_profiling_arguments(archive_parser)
+    archive_parser.set_defaults(func=analyse_archive)
+
+    serve_parser = subparsers.add_parser(
+        "serve",
+        description="run an analysis server that keeps the analysers loaded",
+        help="run an analysis server",
+    )
+
+    serve_parser.add_argument(
+        "--host", default="127.0.0.1", help="the address to listen on"
+    )
+
+    serve_parser.add_argument(
+        "--port", type=int, default=8000, help="the port to listen on"
+    )
+
+    serve_parser.add_argument(
+        "--unix-socket",
+        default=None,
+        help="listen on this unix socket instead of a tcp port",
+    )
+
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="the number of documents to analyse concurrently",
+    )
+
+    serve_parser.add_argument(
+        "--max-queued",
+        type=int,
+        default=8,
+        help="the number of requests that can wait for an analyser before "
+        "new requests are rejected",
+    )
+
+    serve_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30,
+        help="the number of seconds to wait for an analysis result",
+    )
+
+    serve_parser.add_argument(
+        "--max-request-size",
+        type=int,
+        default=10 * 1024 * 1024,
+        help="the maximum request size in bytes",
+    )
+    add_preset_argument(serve_parser)
+    serve_parser.set_defaults(func=run_server)
+
+    idf_index_parser = subparsers.add_parser(
+        "build-idf-index",
+        description="compute the inverse document frequencies of the "
+        "n-grams of a corpus for the TF-IDF keyword extractor",
+        help="build the IDF index of a corpus",
+    )
+
+    idf_index_parser.add_argument(
+        "--output",
+        default="idf_index.bin",
+        help="the name of the file in which to save the index",
+    )
+
+    idf_index_parser.add_argument(
+        "--max-ngram-size",
+        type=int,
+        default=3,
+        help="the maximum number of words of the indexed n-grams",
+    )
+
+    idf_index_parser.add_argument(
+        "--min-document-frequency",
+        type=int,
+        default=2,
+        help="don't index the n-grams that are found in fewer documents",
+    )
+
+    idf_index_parser.add_argument(
+        "--language",
+        default="english",
+        help="the language of the stop words",
+    )
+
+    idf_index_parser.add_argument(
+        "--document-per-line",
+        action="store_true",
+        help="every line of the corpus files is a document",
+    )
+
+    idf_index_parser.add_argument(
+        "paths",
+        nargs="+",
+        help="the text files or the directories with .txt files of the "
+        "corpus",
+    )
+    idf_index_parser.set_defaults(func=build_idf_index)
+
+    aggregate_parser = subparsers.add_parser(
+        "aggregate",
+        description="create a report with the distributions of the "
+        "readability scores and the statistics, the languages and the most "
+        "common keywords and named entities of analysis result files",
+        help="aggregate the analysis results of a corpus",
+    )
+
+    aggregate_parser.add_argument(
+        "--output",
+        default="aggregate_report.json",
+        help="the name of the file in which to save the report",
+    )
+
+    aggregate_parser.add_argument(
+        "--format",
+        choices=["jsonl", "binary"],
+        default="jsonl",
+        help="the format of the result files",
+    )
+
+    aggregate_parser.add_argument(
+        "--top",
+        type=int,
+        default=50,
+        help="the number of keywords and named entities to report",
+    )
+
+    aggregate_parser.add_argument(
+        "--capacity",
+        type=int,
+        default=1000,
+        help="the number of keywords and named entities whose counts are "
+        "kept",
+    )
+
+    aggregate_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="the number of worker processes that aggregate the files",
+    )
+
+    aggregate_parser.add_argument(
+        "paths", nargs="+", help="the analysis result files"
+    )
+    aggregate_parser.set_defaults(func=aggregate)
+
     return parser.parse_args()
 
 
 def main():
     args = get_arguments()
-    args.func(args)
+
+    if getattr(args, "profile", False):
+        from text_analysis_helpers.profiling import profile
+
+        with profile(
+            args.profile_output, trace_memory=args.profile_memory
+        ) as profiler:
+            args.func(args, profiler)
+    else:
+        args.func(args)
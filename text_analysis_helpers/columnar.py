@@ -0,0 +1,265 @@
+from dataclasses import fields
+from typing import Iterable
+
+from text_analysis_helpers import serializers
+from text_analysis_helpers.models import (
+    HtmlAnalysisResult,
+    TextAnalysisResult,
+    TextStatistics,
+)
+from text_analysis_helpers.text import READABILITY_SCORES
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+    pq = None
+
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+
+
+def _statistics_type(field_type) -> "pa.DataType":
+    return pa.int64() if field_type is int else pa.float64()
+
+
+def _readability_type(score: str) -> "pa.DataType":
+    return pa.string() if score == "text_standard" else pa.float64()
+
+
+def create_schema(
+    html_results: bool, include_text: bool = False, include_html: bool = False
+) -> "pa.Schema":
+    """Create the arrow schema of the analysis results
+
+    :param html_results: create the schema for html analysis results
+    :param include_text: include the analysed text
+    :param include_html: include the html of the web pages
+    :return: the schema
+    """
+    if pa is None:
+        raise ImportError(
+            "pyarrow is required for the columnar export. Install "
+            "text-analysis-helpers with the columnar extra."
+        )
+
+    schema_fields = [
+        pa.field("created_at", pa.timestamp("us", tz="UTC")),
+        pa.field("created_at_timestamp", pa.float64()),
+    ]
+
+    if html_results:
+        schema_fields.extend(
+            [
+                pa.field("url", pa.string()),
+                pa.field("title", pa.string()),
+                pa.field("images", pa.list_(pa.string())),
+                pa.field("movies", pa.list_(pa.string())),
+                pa.field("twitter", pa.map_(pa.string(), pa.string())),
+                pa.field("opengraph", pa.string()),
+            ]
+        )
+        if include_html:
+            schema_fields.append(pa.field("html", pa.large_string()))
+
+    if include_text:
+        schema_fields.append(pa.field("text", pa.large_string()))
+
+    schema_fields.extend(
+        [
+            pa.field("summary", pa.string()),
+            pa.field("language", pa.string()),
+            pa.field("keywords", pa.map_(pa.string(), pa.float64())),
+            pa.field(
+                "named_entities",
+                pa.map_(pa.string(), pa.list_(pa.string())),
+            ),
+        ]
+    )
+    schema_fields.extend(
+        pa.field(f"statistics_{field.name}", _statistics_type(field.type))
+        for field in fields(TextStatistics)
+    )
+    schema_fields.extend(
+        pa.field(f"readability_{score}", _readability_type(score))
+        for score in READABILITY_SCORES
+    )
+
+    return pa.schema(schema_fields)
+
+
+def _readability_value(score: str, value):
+    if value is None or score == "text_standard":
+        return value
+
+    return float(value)
+
+
+class ColumnarWriter(object):
+    """Write analysis results to a Parquet or Arrow IPC file
+
+    Every result is stored as a row. The text statistics and the readability
+    scores are flattened into separate columns and the keywords and named
+    entities are stored as map columns. The rows are buffered and written as
+    a row group (or record batch) every `row_group_size` results so memory
+    usage stays bounded. Files that end with `.arrow`, `.feather` or `.ipc`
+    are written in the Arrow IPC format, everything else as Parquet.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        include_text: bool = False,
+        include_html: bool = False,
+        row_group_size: int = 10000,
+        compression: str = "zstd",
+    ):
+        """Create a new ColumnarWriter object
+
+        :param filename: the output file
+        :param include_text: store the analysed text
+        :param include_html: store the html of the web pages
+        :param row_group_size: the number of results in every row group
+        :param compression: the Parquet compression codec
+        """
+        self._filename = filename
+        self._include_text = include_text
+        self._include_html = include_html
+        self._row_group_size = row_group_size
+        self._compression = compression
+        self._schema = None
+        self._writer = None
+        self._rows = []
+
+    def _create_writer(self, html_results: bool):
+        self._schema = create_schema(
+            html_results, self._include_text, self._include_html
+        )
+
+        if self._filename.endswith(ARROW_EXTENSIONS):
+            self._writer = pa.ipc.new_file(self._filename, self._schema)
+        else:
+            self._writer = pq.ParquetWriter(
+                self._filename, self._schema, compression=self._compression
+            )
+
+    def _create_row(self, analysis_result: TextAnalysisResult) -> dict:
+        row = {
+            "created_at": analysis_result.created_at,
+            "created_at_timestamp": analysis_result.created_at_timestamp,
+            "summary": analysis_result.summary,
+            "language": analysis_result.language,
+            "keywords": list(analysis_result.keywords.items()),
+            "named_entities": [
+                (named_entity_type, sorted(named_entities))
+                for named_entity_type, named_entities in (
+                    analysis_result.named_entities.items()
+                )
+            ],
+        }
+
+        if "url" in self._schema.names:
+            social_network_data = analysis_result.social_network_data
+            twitter = social_network_data.twitter
+            opengraph = social_network_data.opengraph
+            row.update(
+                {
+                    "url": analysis_result.url,
+                    "title": analysis_result.title,
+                    "images": analysis_result.images,
+                    "movies": analysis_result.movies,
+                    "twitter": list(twitter.items()) if twitter else None,
+                    "opengraph": (
+                        serializers.dumps(opengraph).decode("utf-8")
+                        if opengraph is not None
+                        else None
+                    ),
+                }
+            )
+            if self._include_html:
+                row["html"] = analysis_result.html
+
+        if self._include_text:
+            row["text"] = analysis_result.text
+
+        for field in fields(TextStatistics):
+            row[f"statistics_{field.name}"] = getattr(
+                analysis_result.statistics, field.name
+            )
+
+        readability_scores = analysis_result.readability_scores
+        for score in READABILITY_SCORES:
+            row[f"readability_{score}"] = _readability_value(
+                score, readability_scores.get(score)
+            )
+
+        return row
+
+    def write(self, analysis_result: TextAnalysisResult):
+        """Add an analysis result to the file
+
+        :param analysis_result: the analysis result
+        """
+        if self._writer is None:
+            self._create_writer(
+                isinstance(analysis_result, HtmlAnalysisResult)
+            )
+
+        self._rows.append(self._create_row(analysis_result))
+        if len(self._rows) >= self._row_group_size:
+            self.flush()
+
+    def write_all(self, analysis_results: Iterable[TextAnalysisResult]):
+        """Add the analysis results to the file
+
+        :param analysis_results: the analysis results
+        """
+        for analysis_result in analysis_results:
+            self.write(analysis_result)
+
+    def flush(self):
+        """Write the buffered results to the file as a new row group"""
+        if not self._rows:
+            return
+
+        table = pa.Table.from_pylist(self._rows, schema=self._schema)
+        self._rows = []
+        self._writer.write_table(table)
+
+    def close(self):
+        """Write the buffered results and close the file"""
+        if self._writer is None:
+            self._create_writer(html_results=False)
+
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def export_results(
+    analysis_results: Iterable[TextAnalysisResult],
+    filename: str,
+    include_text: bool = False,
+    include_html: bool = False,
+    row_group_size: int = 10000,
+):
+    """Export analysis results to a Parquet or Arrow IPC file
+
+    :param analysis_results: the analysis results to export
+    :param filename: the output file
+    :param include_text: store the analysed text
+    :param include_html: store the html of the web pages
+    :param row_group_size: the number of results in every row group
+    """
+    with ColumnarWriter(
+        filename,
+        include_text=include_text,
+        include_html=include_html,
+        row_group_size=row_group_size,
+    ) as writer:
+        writer.write_all(analysis_results)
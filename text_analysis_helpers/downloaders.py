@@ -1,25 +1,42 @@
-import requests
+from typing import Optional
 
 from text_analysis_helpers.exceptions import WebPageDownloadError
+from text_analysis_helpers.metrics import MetricsRegistry, time_stage
 from text_analysis_helpers.models import WebPage
 
 
-def download_web_page(url: str, timeout: int = 5, **kwargs) -> WebPage:
+def download_web_page(
+    url: str,
+    timeout: int = 5,
+    metrics_registry: Optional[MetricsRegistry] = None,
+    **kwargs,
+) -> WebPage:
     """Download a web page
 
     :param url: the url of the web page
     :param timeout: the request timeout
+    :param metrics_registry: the registry to report the download duration,
+        the downloaded bytes and the errors to
     :param kwargs: additional arguments to pass to the `requests.get` method
     :return: the web page contents
     """
-    response = requests.get(url, timeout=timeout, **kwargs)
-
-    if response.status_code < 200 or response.status_code >= 300:
-        raise WebPageDownloadError(
-            message="failed to download web page",
-            url=url,
-            status_code=response.status_code,
-            response=response.text,
-        )
+    import requests
+
+    with time_stage(metrics_registry, "downloader", "download"):
+        response = requests.get(url, timeout=timeout, **kwargs)
+
+        if metrics_registry is not None:
+            metrics_registry.downloaded_bytes.inc(amount=len(response.content))
+
+        if response.status_code < 200 or response.status_code >= 300:
+            raise WebPageDownloadError(
+                message="failed to download web page",
+                url=url,
+                status_code=response.status_code,
+                response=response.text,
+            )
+
+    if metrics_registry is not None:
+        metrics_registry.documents.inc(("downloader",))
 
     return WebPage(url=url, html=response.text)
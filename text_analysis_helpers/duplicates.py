@@ -0,0 +1,376 @@
+import copy
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from text_analysis_helpers import serializers
+from text_analysis_helpers.helpers import current_date
+from text_analysis_helpers.metrics import MetricsRegistry
+from text_analysis_helpers.models import TextAnalysisResult
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+
+INDEX_FORMAT = "text-analysis-helpers-duplicate-index"
+INDEX_VERSION = 1
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def _shingle_hash(shingle: str) -> int:
+    digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+
+    return int.from_bytes(digest, "little")
+
+
+def simhash(tokens: List[str], shingle_size: int = 2) -> int:
+    """Calculate the 64 bit SimHash fingerprint of some tokens
+
+    Every shingle of `shingle_size` consecutive tokens is hashed and every
+    bit of the fingerprint is set when it is set in most of the shingle
+    hashes, so texts that share most of their shingles have fingerprints
+    that differ in few bits.
+
+    :param tokens: the tokens
+    :param shingle_size: the number of tokens in every shingle
+    :return: the fingerprint
+    """
+    import numpy as np
+
+    shingles = [
+        " ".join(shingle)
+        for shingle in zip(*(tokens[i:] for i in range(shingle_size)))
+    ] or [" ".join(tokens)]
+    shingle_count = len(shingles)
+    hashes = np.fromiter(
+        map(_shingle_hash, shingles), dtype=np.uint64, count=shingle_count
+    )
+    bits = (
+        hashes[:, np.newaxis] >> np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+    ) & np.uint64(1)
+    majority = 2 * bits.sum(axis=0) > shingle_count
+
+    return int.from_bytes(
+        np.packbits(majority, bitorder="little").tobytes(), "little"
+    )
+
+
+def hamming_distance(first: int, second: int) -> int:
+    """Count the bits in which two fingerprints differ
+
+    :param first: the first fingerprint
+    :param second: the second fingerprint
+    :return: the number of different bits
+    """
+    return bin(first ^ second).count("1")
+
+
+@dataclass
+class DuplicateMatch:
+    fingerprint: int
+    distance: int
+    url: Optional[str]
+    data: dict
+
+    def create_result(
+        self, text: str, keep_text: bool = True
+    ) -> TextAnalysisResult:
+        """Create the analysis result of a near duplicate text
+
+        The analysis of the text that was indexed is reused and only the
+        text and the creation date are updated.
+
+        :param text: the near duplicate text
+        :param keep_text: keep the text in the result. When this is False
+            only the digest of the text is kept.
+        :return: the analysis result
+        """
+        data = copy.deepcopy(self.data)
+        data["text"] = text
+        data["created_at_timestamp"] = current_date().timestamp()
+
+        analysis_result = TextAnalysisResult.from_dict(data)
+        if not keep_text:
+            analysis_result.discard_text()
+
+        return analysis_result
+
+
+@dataclass
+class DuplicateIndexStatistics:
+    hits: int
+    misses: int
+    entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of the lookups that found a near duplicate"""
+        total = self.hits + self.misses
+
+        return self.hits / total if total else 0.0
+
+
+class _IndexEntry(object):
+    __slots__ = ("url", "data")
+
+    def __init__(self, url: Optional[str], data: dict):
+        self.url = url
+        self.data = data
+
+
+class DuplicateIndex(object):
+    """An index of the analysis results of the texts that were analysed
+
+    The texts are indexed by their SimHash fingerprint. A text whose
+    fingerprint differs from the fingerprint of an indexed text in at most
+    `max_distance` bits is a near duplicate of it and the indexed analysis
+    result can be reused. The fingerprint is split in `max_distance + 1`
+    bands and at least one of them is equal in the fingerprints of near
+    duplicates, so only the texts that share a band are compared. When there
+    are more than `max_entries` texts the least recently used are
+    discarded. The index can be saved to a json lines file and loaded again.
+    """
+
+    def __init__(
+        self,
+        max_distance: int = 4,
+        max_entries: int = 100000,
+        shingle_size: int = 2,
+        min_tokens: int = 20,
+        metrics_registry: Optional[MetricsRegistry] = None,
+    ):
+        """Create a new DuplicateIndex object
+
+        :param max_distance: the maximum number of different fingerprint
+            bits of near duplicate texts
+        :param max_entries: the maximum number of texts to index
+        :param shingle_size: the number of words in every shingle
+        :param min_tokens: the texts with fewer words are neither indexed
+            nor looked up, because their fingerprints aren't reliable
+        :param metrics_registry: the registry to report the lookup hits and
+            misses to
+        """
+        if not 0 <= max_distance < FINGERPRINT_BITS:
+            raise ValueError(f"invalid maximum distance {max_distance}")
+
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.shingle_size = shingle_size
+        self.min_tokens = min_tokens
+        self._metrics_registry = metrics_registry
+        self._entries: Dict[int, _IndexEntry] = OrderedDict()
+        self._bands: List[Dict[int, Set[int]]] = [
+            {} for _ in range(max_distance + 1)
+        ]
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        band_count = max_distance + 1
+        self._band_masks = []
+        offset = 0
+        for band in range(band_count):
+            width = FINGERPRINT_BITS // band_count
+            width += band < FINGERPRINT_BITS % band_count
+            self._band_masks.append((offset, (1 << width) - 1))
+            offset += width
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def fingerprint(self, text: str) -> Optional[int]:
+        """Calculate the fingerprint of a text
+
+        :param text: the text
+        :return: the fingerprint or None if the text is too short
+        """
+        tokens = _WORD_PATTERN.findall(text.lower())
+        if len(tokens) < self.min_tokens:
+            return None
+
+        return simhash(tokens, self.shingle_size)
+
+    def _band_values(self, fingerprint: int):
+        for band, (offset, mask) in enumerate(self._band_masks):
+            yield band, (fingerprint >> offset) & mask
+
+    def _record_lookup(self, result: str):
+        if self._metrics_registry is not None:
+            self._metrics_registry.cache_requests.inc(("duplicate", result))
+
+    def lookup(self, fingerprint: int) -> Optional[DuplicateMatch]:
+        """Find the indexed text that is most similar to a fingerprint
+
+        :param fingerprint: the fingerprint
+        :return: the closest near duplicate or None if there isn't one
+        """
+        with self._lock:
+            candidates = set()
+            for band, value in self._band_values(fingerprint):
+                candidates.update(self._bands[band].get(value, ()))
+
+            best_fingerprint = None
+            best_distance = self.max_distance + 1
+            for candidate in candidates:
+                distance = hamming_distance(fingerprint, candidate)
+                if distance < best_distance:
+                    best_fingerprint = candidate
+                    best_distance = distance
+
+            if best_fingerprint is None:
+                self._misses += 1
+                self._record_lookup("miss")
+                return None
+
+            self._hits += 1
+            self._record_lookup("hit")
+            self._entries.move_to_end(best_fingerprint)
+            entry = self._entries[best_fingerprint]
+
+            return DuplicateMatch(
+                fingerprint=best_fingerprint,
+                distance=best_distance,
+                url=entry.url,
+                data=entry.data,
+            )
+
+    def _add_entry(self, fingerprint: int, entry: _IndexEntry):
+        if fingerprint in self._entries:
+            self._entries.move_to_end(fingerprint)
+        else:
+            for band, value in self._band_values(fingerprint):
+                self._bands[band].setdefault(value, set()).add(fingerprint)
+        self._entries[fingerprint] = entry
+
+        if len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            for band, value in self._band_values(evicted):
+                fingerprints = self._bands[band][value]
+                fingerprints.discard(evicted)
+                if not fingerprints:
+                    del self._bands[band][value]
+
+    def add(
+        self,
+        fingerprint: int,
+        analysis_result: TextAnalysisResult,
+        url: Optional[str] = None,
+    ):
+        """Index the analysis result of a text
+
+        The text itself isn't kept in the index.
+
+        :param fingerprint: the fingerprint of the text
+        :param analysis_result: the analysis result of the text
+        :param url: the url of the web page the text was extracted from
+        """
+        data = analysis_result.as_dict()
+        data["text"] = None
+        data.pop("text_digest", None)
+        # the encoded data don't share any objects with the result
+        data = serializers.loads(serializers.dumps(data))
+
+        with self._lock:
+            self._add_entry(fingerprint, _IndexEntry(url, data))
+
+    def statistics(self) -> DuplicateIndexStatistics:
+        """Get the lookup statistics
+
+        :return: the statistics
+        """
+        with self._lock:
+            return DuplicateIndexStatistics(
+                hits=self._hits,
+                misses=self._misses,
+                entries=len(self._entries),
+            )
+
+    def save(self, filename: str):
+        """Save the index to a json lines file
+
+        The entries are saved from the least to the most recently used.
+        Files with a `.gz`, `.bz2` or `.xz` extension are compressed.
+
+        :param filename: the output file
+        """
+        with self._lock:
+            entries = list(self._entries.items())
+
+        with serializers.open_file(filename, "wb") as f:
+            f.write(
+                serializers.dumps(
+                    {
+                        "format": INDEX_FORMAT,
+                        "version": INDEX_VERSION,
+                        "max_distance": self.max_distance,
+                        "max_entries": self.max_entries,
+                        "shingle_size": self.shingle_size,
+                        "min_tokens": self.min_tokens,
+                    }
+                )
+            )
+            f.write(b"\n")
+            for fingerprint, entry in entries:
+                f.write(
+                    serializers.dumps(
+                        {
+                            "fingerprint": fingerprint,
+                            "url": entry.url,
+                            "result": entry.data,
+                        }
+                    )
+                )
+                f.write(b"\n")
+
+    @classmethod
+    def load(
+        cls,
+        filename: str,
+        max_entries: Optional[int] = None,
+        metrics_registry: Optional[MetricsRegistry] = None,
+    ) -> "DuplicateIndex":
+        """Load an index that was saved with `save`
+
+        :param filename: the index file
+        :param max_entries: the maximum number of texts to index. The saved
+            maximum is used by default. When it is smaller than the number of
+            saved entries the least recently used are discarded.
+        :param metrics_registry: the registry to report the lookup hits and
+            misses to
+        :return: the index
+        """
+        with serializers.open_file(filename, "rb") as f:
+            header = serializers.loads(f.readline() or b"{}")
+            if (
+                header.get("format") != INDEX_FORMAT
+                or header.get("version") != INDEX_VERSION
+            ):
+                raise ValueError(f"{filename} is not a duplicate index file")
+
+            index = cls(
+                max_distance=header["max_distance"],
+                max_entries=max_entries or header["max_entries"],
+                shingle_size=header["shingle_size"],
+                min_tokens=header["min_tokens"],
+                metrics_registry=metrics_registry,
+            )
+            for line in f:
+                if line.strip():
+                    data = serializers.loads(line)
+                    index._add_entry(
+                        data["fingerprint"],
+                        _IndexEntry(data["url"], data["result"]),
+                    )
+
+        logger.info(
+            "loaded duplicate index: filename(%s) entries(%d)",
+            filename,
+            len(index),
+        )
+
+        return index
@@ -1,5 +1,4 @@
-import arrow
-
-
 def current_date():
+    import arrow
+
     return arrow.utcnow()
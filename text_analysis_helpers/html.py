@@ -1,20 +1,35 @@
 import logging
-from typing import Optional
-
-import extruct
-from articles.extractors import ArticleExtractor
-from articles.mss.extractors import MSSArticleExtractor
-from bs4 import BeautifulSoup
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from text_analysis_helpers.downloaders import download_web_page
 from text_analysis_helpers.exceptions import NoContentError
+from text_analysis_helpers.metrics import MetricsRegistry, time_stage
 from text_analysis_helpers.models import (
     HtmlAnalysisResult,
     SocialNetworkData,
+    TextAnalysisResult,
     WebPage,
 )
+from text_analysis_helpers.pipeline import Pipeline, Stage
 from text_analysis_helpers.text import TextAnalyser
 
+if TYPE_CHECKING:
+    from articles.extractors import ArticleExtractor
+    from bs4 import BeautifulSoup
+
+    from text_analysis_helpers.duplicates import DuplicateIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,23 +39,72 @@ class HtmlAnalyser(object):
     def __init__(
         self,
         text_analyser: Optional[TextAnalyser] = None,
-        article_extractor: Optional[ArticleExtractor] = None,
+        article_extractor: Optional["ArticleExtractor"] = None,
+        keep_html: bool = True,
+        keep_text: bool = True,
+        metrics_registry: Optional[MetricsRegistry] = None,
+        metadata_syntaxes: Optional[Sequence[str]] = None,
+        duplicate_index: Optional["DuplicateIndex"] = None,
     ):
         """Create a new HtmlAnalyser
 
         :param text_analyser: the text analysed to use
         :param article_extractor: the article extractor object that will
             extract the article from the html page
+        :param keep_html: keep the web page html in the result. When this is
+            False only the digest of the html is kept.
+        :param keep_text: keep the text that was extracted from the web page
+            in the result. When this is False only the digest of the text is
+            kept.
+        :param metrics_registry: the registry to report the stage durations,
+            the analysed web pages and the errors to. The default text
+            analyser reports to it as well.
+        :param metadata_syntaxes: the syntaxes of the structured metadata that
+            extruct should extract, for example `opengraph`. All of them are
+            extracted by default.
+        :param duplicate_index: the index of the analysed articles. The text
+            analysis of the articles that are near duplicates of an indexed
+            article is skipped and the indexed analysis is reused.
         """
-        self._text_analyser = text_analyser or TextAnalyser()
-        self._article_extractor = article_extractor or MSSArticleExtractor()
+        from text_analysis_helpers.article_templates import (
+            TemplateArticleExtractor,
+        )
+
+        if article_extractor is None:
+            from articles.mss.extractors import MSSArticleExtractor
+
+            article_extractor = MSSArticleExtractor()
+
+        self._text_analyser = text_analyser or TextAnalyser(
+            metrics_registry=metrics_registry
+        )
+        self._article_extractor = article_extractor
+        # only the template extractor uses the url of the web page
+        self._article_extractor_uses_url = isinstance(
+            article_extractor, TemplateArticleExtractor
+        )
+        self._keep_html = keep_html
+        self._keep_text = keep_text
+        self._metrics_registry = metrics_registry
+        self._metadata_syntaxes = metadata_syntaxes
+        self._duplicate_index = duplicate_index
 
-    def _extract_page_data(self, soup: BeautifulSoup) -> dict:
+    @property
+    def text_analyser(self) -> TextAnalyser:
+        """The text analyser that analyses the extracted article"""
+        return self._text_analyser
+
+    @property
+    def duplicate_index(self) -> Optional["DuplicateIndex"]:
+        """The index of the analysed articles"""
+        return self._duplicate_index
+
+    def _extract_page_data(self, soup: "BeautifulSoup") -> dict:
         title = soup.find("title")
 
         return {"title": title.text if title else None}
 
-    def _extract_twitter_card(self, soup: BeautifulSoup) -> dict | None:
+    def _extract_twitter_card(self, soup: "BeautifulSoup") -> dict | None:
         card = {}
 
         for meta in soup.find_all("meta"):
@@ -67,6 +131,7 @@ class HtmlAnalyser(object):
         timeout: int = 5,
         headers: Optional[dict] = None,
         verify: Optional[bool] = True,
+        deadline: Optional[float] = None,
     ) -> HtmlAnalysisResult:
         """Download and analyse the contents of the given url
 
@@ -74,36 +139,295 @@ class HtmlAnalyser(object):
         :param timeout: the request timeout
         :param headers: the headers to add to the request
         :param verify: verify ssl
+        :param deadline: the analysis deadline as a `time.monotonic()`
+            timestamp
         :return: the analysis result
         """
         web_page = download_web_page(
-            url=url, timeout=timeout, headers=headers, verify=verify
+            url=url,
+            timeout=timeout,
+            metrics_registry=self._metrics_registry,
+            headers=headers,
+            verify=verify,
         )
 
-        return self.analyse(web_page)
+        return self.analyse(web_page, deadline=deadline)
 
-    def analyse(self, web_page: WebPage) -> HtmlAnalysisResult:
-        """Analyse the web page contents
+    def _stage(self, stage: str):
+        return time_stage(self._metrics_registry, "html", stage)
 
-        :param web_page: the web page contents
-        :return: the analysis result
+    def _extract_article(self, web_page: WebPage) -> str:
+        with self._stage("article_extraction"):
+            if len(web_page.html) == 0:
+                raise NoContentError()
+
+            if self._article_extractor_uses_url:
+                return self._article_extractor.extract_article(
+                    web_page.html, url=web_page.url
+                )
+
+            return self._article_extractor.extract_article(web_page.html)
+
+    def _extract_metadata(self, web_page: WebPage) -> dict:
+        import extruct
+        from bs4 import BeautifulSoup
+
+        with self._stage("metadata_extraction"):
+            soup = BeautifulSoup(web_page.html, "html.parser")
+            page_data = self._extract_page_data(soup)
+            if self._metadata_syntaxes is not None:
+                extracted_data = extruct.extract(
+                    web_page.html,
+                    base_url=web_page.url,
+                    syntaxes=list(self._metadata_syntaxes),
+                )
+            else:
+                extracted_data = extruct.extract(
+                    web_page.html, base_url=web_page.url
+                )
+            twitter_card = self._extract_twitter_card(soup)
+
+        return {
+            "title": page_data["title"],
+            "social_network_data": SocialNetworkData(
+                opengraph=extracted_data.get("opengraph"), twitter=twitter_card
+            ),
+        }
+
+    def _analyse_text(
+        self,
+        web_page: WebPage,
+        page_content: str,
+        deadline: Optional[float] = None,
+        analyse: Optional[Callable[[str], TextAnalysisResult]] = None,
+    ) -> Tuple[TextAnalysisResult, Optional[str]]:
+        """Analyse the article or reuse the analysis of a near duplicate
+
+        :param web_page: the web page the article was extracted from
+        :param page_content: the article
+        :param deadline: the analysis deadline as a `time.monotonic()`
+            timestamp
+        :param analyse: the callable that analyses the article. The text
+            analyser of this object is used by default.
+        :return: the text analysis result and the url of the near duplicate
+            whose analysis was reused
         """
-        if len(web_page.html) == 0:
-            raise NoContentError()
+        fingerprint = None
+        if self._duplicate_index is not None:
+            fingerprint = self._duplicate_index.fingerprint(page_content)
+
+        if fingerprint is not None:
+            match = self._duplicate_index.lookup(fingerprint)
+            if match is not None:
+                logger.debug(
+                    "reusing the analysis of a near duplicate: url(%s) "
+                    "duplicate_of(%s) distance(%d)",
+                    web_page.url,
+                    match.url,
+                    match.distance,
+                )
+                analysis_result = match.create_result(
+                    page_content, keep_text=self._text_analyser.keep_text
+                )
+
+                return analysis_result, match.url
+
+        if analyse is not None:
+            text_analysis_result = analyse(page_content)
+        elif deadline is not None:
+            text_analysis_result = self._text_analyser.analyse(
+                page_content, deadline=deadline
+            )
+        else:
+            text_analysis_result = self._text_analyser.analyse(page_content)
 
-        page_content = self._article_extractor.extract_article(web_page.html)
-        text_analysis_result = self._text_analyser.analyse(page_content)
-        soup = BeautifulSoup(web_page.html, "html.parser")
-        page_data = self._extract_page_data(soup)
-        extracted_data = extruct.extract(web_page.html, base_url=web_page.url)
-        twitter_card = self._extract_twitter_card(soup)
+        # the partial analysis results that were created in order to finish
+        # before a deadline are not reused
+        if fingerprint is not None and not (
+            text_analysis_result.skipped_stages
+            or text_analysis_result.truncated_stages
+        ):
+            self._duplicate_index.add(
+                fingerprint, text_analysis_result, url=web_page.url
+            )
 
-        return HtmlAnalysisResult(
+        return text_analysis_result, None
+
+    def _create_result(
+        self,
+        web_page: WebPage,
+        text_analysis_result: TextAnalysisResult,
+        metadata: dict,
+        duplicate_of: Optional[str] = None,
+    ) -> HtmlAnalysisResult:
+        analysis_result = HtmlAnalysisResult(
             url=web_page.url,
             html=web_page.html,
-            title=page_data["title"],
-            social_network_data=SocialNetworkData(
-                opengraph=extracted_data.get("opengraph"), twitter=twitter_card
-            ),
+            title=metadata["title"],
+            social_network_data=metadata["social_network_data"],
             text_data=text_analysis_result,
         )
+        analysis_result.duplicate_of = duplicate_of
+
+        if not self._keep_html:
+            analysis_result.discard_html()
+        if not self._keep_text:
+            analysis_result.discard_text()
+
+        if self._metrics_registry is not None:
+            self._metrics_registry.documents.inc(("html",))
+
+        return analysis_result
+
+    def analyse(
+        self, web_page: WebPage, deadline: Optional[float] = None
+    ) -> HtmlAnalysisResult:
+        """Analyse the web page contents
+
+        :param web_page: the web page contents
+        :param deadline: the analysis deadline as a `time.monotonic()`
+            timestamp. The text analysis stages that are not expected to
+            finish before it are truncated or skipped.
+        :return: the analysis result
+        """
+        page_content = self._extract_article(web_page)
+        text_analysis_result, duplicate_of = self._analyse_text(
+            web_page, page_content, deadline=deadline
+        )
+        metadata = self._extract_metadata(web_page)
+
+        return self._create_result(
+            web_page, text_analysis_result, metadata, duplicate_of
+        )
+
+    def analyse_stream(
+        self,
+        pages: Iterable[Union[WebPage, str]],
+        download_workers: int = 8,
+        analysis_workers: int = 2,
+        queue_size: int = 16,
+        timeout: int = 5,
+        headers: Optional[dict] = None,
+        verify: Optional[bool] = True,
+        analyser_factory: Optional[Callable[[], "HtmlAnalyser"]] = None,
+    ) -> Pipeline:
+        """Analyse a stream of web pages using a staged pipeline
+
+        The download, article extraction, text analysis, metadata extraction
+        and result construction stages run concurrently and are connected
+        with bounded queues. Urls are downloaded by the download threads and
+        web pages skip the download stage. When `analyser_factory` is given,
+        the article extraction, text analysis and metadata extraction run in
+        a pool of `analysis_workers` processes, each of which creates its own
+        analyser once, so the CPU bound stages run in parallel. The pool is
+        created when the iteration starts and shut down when it stops.
+        Otherwise they run in threads of this process with the analysers of
+        this object and, because of the GIL, they only overlap with the
+        downloads.
+        The returned pipeline starts when it is iterated and it yields the
+        analysis results as soon as they are ready, so they might not be in
+        the same order as the pages. Pages that fail to be analysed are
+        logged and skipped. Use the `statistics` method of the pipeline to
+        monitor the queue depth and the throughput of every stage.
+
+        :param pages: the web pages or the urls to analyse
+        :param download_workers: the number of threads that download urls
+        :param analysis_workers: the number of worker processes, or of
+            threads for each of the analysis stages when there is no
+            `analyser_factory`
+        :param queue_size: the capacity of the queue in front of each stage
+        :param timeout: the request timeout
+        :param headers: the headers to add to the requests
+        :param verify: verify ssl
+        :param analyser_factory: a picklable callable that creates the
+            analyser of every worker process. The near duplicates are still
+            looked up in the duplicate index of this object.
+        :return: the analysis pipeline
+        """
+        executor: Optional[Executor] = None
+        extract_page_article = self._extract_article
+        extract_page_metadata = self._extract_metadata
+        analyse_page_text = None
+        context = None
+        if analyser_factory is not None:
+            from text_analysis_helpers import batch
+
+            @contextmanager
+            def worker_pool() -> Iterator[None]:
+                nonlocal executor
+
+                with ProcessPoolExecutor(
+                    max_workers=analysis_workers,
+                    initializer=batch.initialize_worker,
+                    initargs=(analyser_factory,),
+                ) as executor:
+                    yield
+
+            context = worker_pool
+
+            def run_in_worker(func: Callable) -> Callable:
+                def run(*args):
+                    return executor.submit(func, *args).result()
+
+                return run
+
+            extract_page_article = run_in_worker(
+                batch.extract_article_in_worker
+            )
+            extract_page_metadata = run_in_worker(
+                batch.extract_metadata_in_worker
+            )
+            analyse_page_text = run_in_worker(batch.analyse_text_in_worker)
+
+        def download(page: Union[WebPage, str]) -> WebPage:
+            if isinstance(page, WebPage):
+                return page
+
+            return download_web_page(
+                url=page,
+                timeout=timeout,
+                metrics_registry=self._metrics_registry,
+                headers=headers,
+                verify=verify,
+            )
+
+        def extract_article(web_page: WebPage) -> tuple:
+            return web_page, extract_page_article(web_page)
+
+        def analyse_text(item: tuple) -> tuple:
+            web_page, page_content = item
+
+            return (
+                web_page,
+                *self._analyse_text(
+                    web_page, page_content, analyse=analyse_page_text
+                ),
+            )
+
+        def extract_metadata(item: tuple) -> tuple:
+            web_page, text_analysis_result, duplicate_of = item
+
+            return (
+                web_page,
+                text_analysis_result,
+                extract_page_metadata(web_page),
+                duplicate_of,
+            )
+
+        def create_result(item: tuple) -> HtmlAnalysisResult:
+            return self._create_result(*item)
+
+        stages = [
+            Stage("download", download, download_workers),
+            Stage("article_extraction", extract_article, analysis_workers),
+            Stage("text_analysis", analyse_text, analysis_workers),
+            Stage("metadata_extraction", extract_metadata, analysis_workers),
+            Stage("result_construction", create_result, 1),
+        ]
+
+        return Pipeline(
+            pages,
+            stages,
+            queue_size=queue_size,
+            context=context,
+        )
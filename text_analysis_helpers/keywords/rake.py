@@ -1,12 +1,267 @@
-from collections import defaultdict
+import heapq
+from collections import Counter, defaultdict
+from functools import lru_cache
 from itertools import combinations_with_replacement
-from typing import Callable, Dict, List, Optional, Set, Tuple
-
-import nltk
-from nltk.corpus import stopwords
+from operator import itemgetter
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 from text_analysis_helpers.keywords.extractors import KeywordExtractor
 
+DEFAULT_DELIMITERS = (",", "’", "‘", "“", "”", "“", "?", "—", ".")
+
+
+@lru_cache(maxsize=None)
+def load_stop_words(language: str) -> Tuple[str, ...]:
+    """Load the nltk stop words of a language
+
+    The stop words of every language are loaded only once.
+
+    :param language: the language name, for example `english`
+    :return: the stop words
+    """
+    from nltk.corpus import stopwords
+
+    return tuple(stopwords.words(language))
+
+
+@lru_cache(maxsize=32)
+def compile_delimiter_table(
+    stop_words: Tuple[str, ...],
+    delimiters: Tuple[str, ...],
+    word_tokenizer: Callable,
+) -> FrozenSet[str]:
+    """Create the set of the tokens that split the candidate keywords
+
+    The stop words are added together with the tokens that the word
+    tokenizer splits them into, so that a token is a delimiter if its
+    lowercase form is in the set. The most recently used tables are cached,
+    so the extractors that use the same stop words, delimiters and tokenizer
+    share a table, and the tokenizers of the evicted tables are released.
+
+    :param stop_words: the stop words
+    :param delimiters: the word delimiters
+    :param word_tokenizer: the word tokenizer of the extractor
+    :return: the delimiter table
+    """
+    delimiter_table = set()
+    for stop_word in stop_words:
+        delimiter_table.add(stop_word)
+        delimiter_table.update(word_tokenizer(stop_word))
+    delimiter_table.update(delimiter.lower() for delimiter in delimiters)
+
+    return frozenset(delimiter_table)
+
+
+def split_candidate_keywords(
+    tokenized_sentences: Iterable[List[str]], delimiter_table: FrozenSet[str]
+) -> Iterator[List[str]]:
+    """Split the tokenized sentences into candidate keywords
+
+    A candidate keyword is a sequence of words that doesn't contain any
+    delimiter. The candidates never span sentences.
+
+    :param tokenized_sentences: the words of every sentence
+    :param delimiter_table: the delimiter table that is created by
+        `compile_delimiter_table`
+    :return: an iterator over the candidate keywords
+    """
+    for sentence in tokenized_sentences:
+        keyword = []
+        for word in sentence:
+            if not word:
+                continue
+
+            if word.lower() in delimiter_table:
+                if keyword:
+                    yield keyword
+                    keyword = []
+            else:
+                keyword.append(word)
+
+        if keyword:
+            yield keyword
+
+
+def select_keywords(
+    keyword_scores: Iterable[Tuple[str, float]],
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None,
+) -> Dict[str, float]:
+    """Select the keywords with the highest scores
+
+    :param keyword_scores: the keywords and their scores
+    :param top_k: the number of keywords to select or None to select all of
+        them
+    :param min_score: the minimum score of the selected keywords
+    :return: the selected keywords and their scores. When `top_k` is set
+        they are ordered by decreasing score.
+    """
+    if min_score is not None:
+        keyword_scores = (
+            (keyword, score)
+            for keyword, score in keyword_scores
+            if score >= min_score
+        )
+
+    if top_k is not None:
+        # only the top_k keywords are kept in the heap
+        keyword_scores = heapq.nlargest(
+            top_k, keyword_scores, key=itemgetter(1)
+        )
+
+    return dict(keyword_scores)
+
+
+class RakeAccumulator(object):
+    """Incrementally counts the words and the candidate keywords that the
+    RAKE scores use
+
+    Sentences can be added to the accumulator one batch at a time and
+    accumulators that processed different parts of a document or a corpus
+    can be merged. The keyword scores of the merged accumulator are the
+    scores of the whole document or corpus. Accumulators can be pickled, so
+    they can be sent between processes.
+    """
+
+    __slots__ = (
+        "rake",
+        "top_k",
+        "min_score",
+        "word_degrees",
+        "word_frequencies",
+        "candidate_counts",
+    )
+
+    def __init__(
+        self,
+        rake: Optional["Rake"] = None,
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None,
+    ):
+        """Create a new RakeAccumulator object
+
+        :param rake: the Rake extractor whose tokenizer, stop words and
+            delimiters are used to find the candidate keywords. It is only
+            needed in order to add sentences with `update`.
+        :param top_k: the default number of keywords that `result` returns
+        :param min_score: the default minimum score of the keywords that
+            `result` returns
+        """
+        self.rake = rake
+        self.top_k = top_k
+        self.min_score = min_score
+        self.word_degrees: Dict[str, int] = defaultdict(int)
+        self.word_frequencies: Dict[str, int] = defaultdict(int)
+        # the candidate keywords are grouped by their lowercase form and the
+        # count of every alias is kept in the order the aliases were found
+        self.candidate_counts: Dict[Tuple, Dict[Tuple, int]] = {}
+
+    def update(self, sentences: Iterable[str]) -> "RakeAccumulator":
+        """Count the candidate keywords of the given sentences
+
+        :param sentences: the sentences to process
+        :return: this object
+        """
+        if self.rake is None:
+            raise ValueError("a Rake extractor is required to add sentences")
+
+        tokenized_document = [
+            self.rake._word_tokenizer(sentence) for sentence in sentences
+        ]
+        self.add_candidates(
+            self.rake._extract_candidate_keywords(tokenized_document)
+        )
+
+        return self
+
+    def add_candidates(self, candidate_keywords: List[List[str]]):
+        """Count the given candidate keywords
+
+        :param candidate_keywords: the candidate keywords
+        """
+        for candidate in candidate_keywords:
+            normalised_candidate = tuple(word.lower() for word in candidate)
+
+            # these are the degrees and the frequencies of the co-occurrence
+            # matrix that Rake builds from all the word pairs of a candidate
+            candidate_size = len(candidate)
+            for word, count in Counter(normalised_candidate).items():
+                frequency = count * (count + 1) // 2
+                self.word_degrees[word] += (
+                    count * (candidate_size - count) + frequency
+                )
+                self.word_frequencies[word] += frequency
+
+            aliases = self.candidate_counts.setdefault(
+                normalised_candidate, {}
+            )
+            alias = tuple(candidate)
+            aliases[alias] = aliases.get(alias, 0) + 1
+
+    def merge(self, other: "RakeAccumulator") -> "RakeAccumulator":
+        """Add the counts of another accumulator to the counts of this one
+
+        :param other: the accumulator whose counts to add
+        :return: this object
+        """
+        for word, degree in other.word_degrees.items():
+            self.word_degrees[word] += degree
+        for word, frequency in other.word_frequencies.items():
+            self.word_frequencies[word] += frequency
+        for (
+            normalised_candidate,
+            other_aliases,
+        ) in other.candidate_counts.items():
+            aliases = self.candidate_counts.setdefault(
+                normalised_candidate, {}
+            )
+            for alias, count in other_aliases.items():
+                aliases[alias] = aliases.get(alias, 0) + count
+
+        return self
+
+    def result(
+        self, top_k: Optional[int] = None, min_score: Optional[float] = None
+    ) -> Dict[str, float]:
+        """Calculate the keyword scores
+
+        :param top_k: return only this many keywords with the highest scores.
+            Defaults to the `top_k` of the accumulator.
+        :param min_score: return only the keywords with at least this score.
+            Defaults to the `min_score` of the accumulator.
+        :return: the keywords and their scores. The first alias that was
+            found is used for every keyword.
+        """
+        word_scores = {
+            word: degree / self.word_frequencies[word]
+            for word, degree in self.word_degrees.items()
+        }
+
+        keyword_scores = (
+            (
+                " ".join(next(iter(aliases))),
+                sum(aliases.values())
+                * sum(word_scores[word] for word in normalised_candidate),
+            )
+            for normalised_candidate, aliases in self.candidate_counts.items()
+        )
+
+        return select_keywords(
+            keyword_scores,
+            top_k=self.top_k if top_k is None else top_k,
+            min_score=self.min_score if min_score is None else min_score,
+        )
+
 
 class Rake(KeywordExtractor):
     """RAKE keyword extractor"""
@@ -17,6 +272,10 @@ class Rake(KeywordExtractor):
         sentence_tokenizer: Optional[Callable] = None,
         stop_words: Optional[List[str]] = None,
         delimiters: Optional[List[str]] = None,
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None,
+        max_words: Optional[int] = None,
+        language: str = "english",
     ):
         """Create a new Rake objects
 
@@ -26,26 +285,33 @@ class Rake(KeywordExtractor):
             sentences
         :param stop_words: a list of stop words to use
         :param delimiters: the list of word delimiters
+        :param top_k: extract only this many keywords with the highest scores
+            or None to extract all of them
+        :param min_score: extract only the keywords with at least this score
+        :param max_words: ignore the candidate keywords that have more than
+            this many words
+        :param language: the language of the nltk stop words that are used
+            when no stop words are given
         """
-        self._word_tokenizer = word_tokenizer or nltk.word_tokenize
-        self._sentence_tokenizer = sentence_tokenizer or nltk.sent_tokenize
-        self._delimiters = delimiters or [
-            ",",
-            "’",
-            "‘",
-            "“",
-            "”",
-            "“",
-            "?",
-            "—",
-            ".",
-        ]
-
-        self._stop_words = set()
-        for stop_word in stop_words or stopwords.words("english"):
-            self._stop_words.add(stop_word)
-            split_stop_word = self._word_tokenizer(stop_word)
-            self._stop_words.update(split_stop_word)
+        if word_tokenizer is None or sentence_tokenizer is None:
+            import nltk
+
+            word_tokenizer = word_tokenizer or nltk.word_tokenize
+            sentence_tokenizer = sentence_tokenizer or nltk.sent_tokenize
+
+        if not stop_words:
+            stop_words = load_stop_words(language)
+
+        self.top_k = top_k
+        self.min_score = min_score
+        self.max_words = max_words
+        self._word_tokenizer = word_tokenizer
+        self._sentence_tokenizer = sentence_tokenizer
+        self._delimiter_table = compile_delimiter_table(
+            tuple(stop_words),
+            tuple(delimiters or DEFAULT_DELIMITERS),
+            word_tokenizer,
+        )
 
     def _extract_candidate_keywords(
         self, tokenized_document: List[List[str]]
@@ -55,41 +321,26 @@ class Rake(KeywordExtractor):
         :param tokenized_document: the tokenized document
         :return: the candidate keywords
         """
-        candidate_keywords = []
-
-        for sentence in tokenized_document:
-            keyword = []
-            for word in sentence:
-                if not word:
-                    continue
-
-                if self._is_delimiter(word):
-                    if keyword:
-                        candidate_keywords.append(keyword)
-                        keyword = []
-                else:
-                    keyword.append(word)
+        candidate_keywords = list(
+            split_candidate_keywords(tokenized_document, self._delimiter_table)
+        )
 
-            if keyword:
-                candidate_keywords.append(keyword)
+        if self.max_words is not None:
+            candidate_keywords = [
+                candidate
+                for candidate in candidate_keywords
+                if len(candidate) <= self.max_words
+            ]
 
         return candidate_keywords
 
-    def _is_stop_word(self, word: str) -> bool:
-        """Check if this word is a stop word
-
-        :param word: the word to check
-        :return True if this is a stop word
-        """
-        return word.lower() in self._stop_words
-
     def _is_delimiter(self, word: str) -> bool:
-        """Check if this word is a delimiter
+        """Check if this word is a stop word or a delimiter
 
         :param word: the word to check
         :return True if this word is a delimiter
         """
-        return self._is_stop_word(word) or word in self._delimiters
+        return word.lower() in self._delimiter_table
 
     def _tokenize_document(self, document: str) -> List[List[str]]:
         """Tokenize the given document in a list of tokenized sentences
@@ -204,6 +455,22 @@ class Rake(KeywordExtractor):
 
         return normalized_candidates_scores
 
+    def accumulator(self) -> RakeAccumulator:
+        """Create an accumulator that uses the tokenizer, the stop words and
+        the delimiters of this extractor
+
+        :return: the accumulator
+        """
+        return RakeAccumulator(self, self.top_k, self.min_score)
+
+    def count_keywords(self, document: str) -> RakeAccumulator:
+        """Count the words and the candidate keywords of a document
+
+        :param document: the document to process
+        :return: the accumulator with the counts of the document
+        """
+        return self.accumulator().update(self._sentence_tokenizer(document))
+
     def extract_keywords(self, document: str) -> Dict[str, float]:
         tokenized_document = self._tokenize_document(document)
         candidate_keywords = self._extract_candidate_keywords(
@@ -223,7 +490,11 @@ class Rake(KeywordExtractor):
             candidate_keyword_aliases, candidate_scores
         )
 
-        return {
-            " ".join(candidate_keyword): score
-            for candidate_keyword, score in candidate_scores.items()
-        }
+        return select_keywords(
+            (
+                (" ".join(candidate_keyword), score)
+                for candidate_keyword, score in candidate_scores.items()
+            ),
+            top_k=self.top_k,
+            min_score=self.min_score,
+        )
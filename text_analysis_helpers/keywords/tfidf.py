@@ -0,0 +1,369 @@
+import hashlib
+import logging
+import math
+import struct
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from text_analysis_helpers.keywords.extractors import KeywordExtractor
+from text_analysis_helpers.keywords.rake import (
+    DEFAULT_DELIMITERS,
+    compile_delimiter_table,
+    load_stop_words,
+    select_keywords,
+    split_candidate_keywords,
+)
+
+logger = logging.getLogger(__name__)
+
+IDF_INDEX_MAGIC = b"TAHIDF01"
+# the magic, the number of terms and the number of documents
+_IDF_INDEX_HEADER = struct.Struct("<8sQQ")
+
+
+def term_hash(term: str) -> int:
+    """Calculate the 64 bit hash of a term that is stored in the IDF index
+
+    The hash doesn't depend on the interpreter, so an index can be used by
+    every process.
+
+    :param term: the lowercase term
+    :return: the hash of the term
+    """
+    return int.from_bytes(
+        hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(),
+        "little",
+    )
+
+
+def calculate_idf(document_count: int, document_frequency: int) -> float:
+    """Calculate the smoothed inverse document frequency of a term
+
+    :param document_count: the number of documents in the corpus
+    :param document_frequency: the number of documents with the term
+    :return: the inverse document frequency
+    """
+    return math.log((1 + document_count) / (1 + document_frequency)) + 1
+
+
+class NgramExtractor(object):
+    """Extracts the n-grams of the candidate keywords of a document
+
+    The candidate keywords are the word sequences between stop words and
+    delimiters, like in RAKE, and every n-gram of a candidate up to
+    `max_ngram_size` words is counted.
+    """
+
+    def __init__(
+        self,
+        word_tokenizer: Optional[Callable] = None,
+        sentence_tokenizer: Optional[Callable] = None,
+        stop_words: Optional[List[str]] = None,
+        delimiters: Optional[List[str]] = None,
+        max_ngram_size: int = 3,
+        language: str = "english",
+    ):
+        """Create a new NgramExtractor object
+
+        :param word_tokenizer: a callable that splits a sentence into a
+            list of words
+        :param sentence_tokenizer: a callable that splits the text into
+            sentences
+        :param stop_words: a list of stop words to use. The nltk stop words
+            of the language are used by default.
+        :param delimiters: the list of word delimiters
+        :param max_ngram_size: the maximum number of words of an n-gram
+        :param language: the language of the nltk stop words
+        """
+        if word_tokenizer is None or sentence_tokenizer is None:
+            import nltk
+
+            word_tokenizer = word_tokenizer or nltk.word_tokenize
+            sentence_tokenizer = sentence_tokenizer or nltk.sent_tokenize
+
+        if not stop_words:
+            stop_words = load_stop_words(language)
+
+        self.max_ngram_size = max_ngram_size
+        self._word_tokenizer = word_tokenizer
+        self._sentence_tokenizer = sentence_tokenizer
+        self._delimiter_table = compile_delimiter_table(
+            tuple(stop_words),
+            tuple(delimiters or DEFAULT_DELIMITERS),
+            word_tokenizer,
+        )
+
+    def _candidate_keywords(self, document: str) -> Iterable[List[str]]:
+        tokenized_sentences = (
+            self._word_tokenizer(sentence)
+            for sentence in self._sentence_tokenizer(document)
+        )
+
+        return split_candidate_keywords(
+            tokenized_sentences, self._delimiter_table
+        )
+
+    def count_ngrams(self, document: str) -> Dict[str, Tuple[str, int]]:
+        """Count the n-grams of a document
+
+        :param document: the document to process
+        :return: the first alias that was found and the count of every
+            lowercase n-gram
+        """
+        ngram_counts = {}
+        for candidate in self._candidate_keywords(document):
+            candidate_size = len(candidate)
+            for start in range(candidate_size):
+                end = min(start + self.max_ngram_size, candidate_size)
+                for ngram_end in range(start + 1, end + 1):
+                    alias = " ".join(candidate[start:ngram_end])
+                    ngram = alias.lower()
+                    if ngram in ngram_counts:
+                        alias, count = ngram_counts[ngram]
+                        ngram_counts[ngram] = (alias, count + 1)
+                    else:
+                        ngram_counts[ngram] = (alias, 1)
+
+        return ngram_counts
+
+
+class IdfIndex(object):
+    """The inverse document frequencies of the terms of a corpus
+
+    The index is stored as the sorted 64 bit hashes of the terms followed by
+    their inverse document frequencies. An index that is loaded from a file
+    is memory-mapped, so the processes that use the same index file share
+    its pages instead of copying them.
+    """
+
+    def __init__(self, hashes, idfs, document_count: int):
+        """Create a new IdfIndex object
+
+        :param hashes: the sorted numpy array with the term hashes
+        :param idfs: the numpy array with the inverse document frequency of
+            every term
+        :param document_count: the number of documents in the corpus
+        """
+        self.hashes = hashes
+        self.idfs = idfs
+        self.document_count = document_count
+        # the terms that are not in the index are considered to be found in
+        # no document
+        self.default_idf = calculate_idf(document_count, 0)
+        self.filename = None
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def __reduce__(self):
+        # the worker processes map the index file instead of receiving a
+        # copy of the arrays
+        if self.filename is not None:
+            return IdfIndex.load, (self.filename,)
+
+        return IdfIndex, (self.hashes, self.idfs, self.document_count)
+
+    @classmethod
+    def load(cls, filename: str) -> "IdfIndex":
+        """Memory-map an index file that was created with `save`
+
+        :param filename: the index file
+        :return: the index
+        """
+        import numpy as np
+
+        with open(filename, "rb") as f:
+            magic, term_count, document_count = _IDF_INDEX_HEADER.unpack(
+                f.read(_IDF_INDEX_HEADER.size)
+            )
+        if magic != IDF_INDEX_MAGIC:
+            raise ValueError(f"{filename} is not an IDF index file")
+
+        if term_count == 0:
+            hashes = np.empty(0, dtype="<u8")
+            idfs = np.empty(0, dtype="<f4")
+        else:
+            hashes = np.memmap(
+                filename,
+                dtype="<u8",
+                mode="r",
+                offset=_IDF_INDEX_HEADER.size,
+                shape=(term_count,),
+            )
+            idfs = np.memmap(
+                filename,
+                dtype="<f4",
+                mode="r",
+                offset=_IDF_INDEX_HEADER.size + hashes.nbytes,
+                shape=(term_count,),
+            )
+
+        index = cls(hashes, idfs, document_count)
+        index.filename = filename
+
+        return index
+
+    def save(self, filename: str):
+        """Save the index
+
+        :param filename: the index file
+        """
+        with open(filename, "wb") as f:
+            f.write(
+                _IDF_INDEX_HEADER.pack(
+                    IDF_INDEX_MAGIC, len(self.hashes), self.document_count
+                )
+            )
+            self.hashes.astype("<u8").tofile(f)
+            self.idfs.astype("<f4").tofile(f)
+
+    def lookup(self, terms: List[str]) -> List[float]:
+        """Get the inverse document frequencies of some terms
+
+        :param terms: the lowercase terms
+        :return: the inverse document frequency of every term
+        """
+        import numpy as np
+
+        if len(self.hashes) == 0:
+            return [self.default_idf] * len(terms)
+
+        term_hashes = np.fromiter(
+            (term_hash(term) for term in terms),
+            dtype="<u8",
+            count=len(terms),
+        )
+        positions = np.minimum(
+            np.searchsorted(self.hashes, term_hashes), len(self.hashes) - 1
+        )
+        found = self.hashes[positions] == term_hashes
+        idfs = np.where(found, self.idfs[positions], self.default_idf)
+
+        return idfs.tolist()
+
+    def idf(self, term: str) -> float:
+        """Get the inverse document frequency of a term
+
+        :param term: the lowercase term
+        :return: the inverse document frequency
+        """
+        return self.lookup([term])[0]
+
+
+class IdfIndexBuilder(object):
+    """Counts the document frequencies of the n-grams of a corpus
+
+    The documents are processed one at a time, so only the document
+    frequencies are kept in memory.
+    """
+
+    def __init__(
+        self,
+        ngram_extractor: Optional[NgramExtractor] = None,
+        min_document_frequency: int = 2,
+    ):
+        """Create a new IdfIndexBuilder object
+
+        :param ngram_extractor: the object that extracts the n-grams of the
+            documents. It should be configured like the extractor of the
+            TfidfKeywordExtractor that will use the index.
+        :param min_document_frequency: the terms that are found in fewer
+            documents are not stored in the index. They get the inverse
+            document frequency of the unknown terms.
+        """
+        self.ngram_extractor = ngram_extractor or NgramExtractor()
+        self.min_document_frequency = min_document_frequency
+        self.document_count = 0
+        self._document_frequencies: Dict[int, int] = defaultdict(int)
+
+    def add_document(self, document: str):
+        """Count the n-grams of a document
+
+        :param document: the document to add
+        """
+        self.document_count += 1
+        for ngram in self.ngram_extractor.count_ngrams(document):
+            self._document_frequencies[term_hash(ngram)] += 1
+
+    def build(self) -> IdfIndex:
+        """Create the index
+
+        :return: the index
+        """
+        import numpy as np
+
+        terms = sorted(
+            (hash_value, document_frequency)
+            for hash_value, document_frequency in (
+                self._document_frequencies.items()
+            )
+            if document_frequency >= self.min_document_frequency
+        )
+        logger.info(
+            "indexed %d of %d terms from %d documents",
+            len(terms),
+            len(self._document_frequencies),
+            self.document_count,
+        )
+
+        hashes = np.fromiter(
+            (hash_value for hash_value, _ in terms),
+            dtype="<u8",
+            count=len(terms),
+        )
+        idfs = np.fromiter(
+            (
+                calculate_idf(self.document_count, document_frequency)
+                for _, document_frequency in terms
+            ),
+            dtype="<f4",
+            count=len(terms),
+        )
+
+        return IdfIndex(hashes, idfs, self.document_count)
+
+
+class TfidfKeywordExtractor(KeywordExtractor):
+    """Scores the n-grams of a document by TF-IDF
+
+    The n-grams that are found in many documents of the corpus, like the
+    boilerplate phrases of a web site, get low scores.
+    """
+
+    def __init__(
+        self,
+        idf_index: IdfIndex | str,
+        ngram_extractor: Optional[NgramExtractor] = None,
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None,
+    ):
+        """Create a new TfidfKeywordExtractor object
+
+        :param idf_index: the IDF index or the path to an index file
+        :param ngram_extractor: the object that extracts the n-grams of the
+            document. It should be configured like the extractor that was
+            used to create the index.
+        :param top_k: extract only this many keywords with the highest scores
+            or None to extract all of them
+        :param min_score: extract only the keywords with at least this score
+        """
+        if isinstance(idf_index, str):
+            idf_index = IdfIndex.load(idf_index)
+
+        self.idf_index = idf_index
+        self.ngram_extractor = ngram_extractor or NgramExtractor()
+        self.top_k = top_k
+        self.min_score = min_score
+
+    def extract_keywords(self, document: str) -> Dict[str, float]:
+        ngram_counts = self.ngram_extractor.count_ngrams(document)
+        idfs = self.idf_index.lookup(list(ngram_counts))
+
+        return select_keywords(
+            (
+                (alias, count * idf)
+                for (alias, count), idf in zip(ngram_counts.values(), idfs)
+            ),
+            top_k=self.top_k,
+            min_score=self.min_score,
+        )
@@ -0,0 +1,468 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import ContextManager, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape_label_value(value: str) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def _format_labels(
+    label_names: Tuple[str, ...],
+    label_values: Tuple,
+    extra: Optional[Tuple[str, str]] = None,
+) -> str:
+    labels = [
+        f'{name}="{_escape_label_value(value)}"'
+        for name, value in zip(label_names, label_values)
+    ]
+    if extra is not None:
+        labels.append(f'{extra[0]}="{extra[1]}"')
+
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    """Base class for the metrics"""
+
+    metric_type = None
+
+    def __init__(
+        self, name: str, description: str, label_names: Tuple[str, ...] = ()
+    ):
+        """Create a new metric
+
+        :param name: the metric name
+        :param description: the metric description
+        :param label_names: the names of the metric labels
+        """
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _check_labels(self, labels: Tuple):
+        if len(labels) != len(self.label_names):
+            raise ValueError(
+                f"{self.name} expects the labels {self.label_names}"
+            )
+
+    @abstractmethod
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        """The metric samples
+
+        :return: an iterator over the name suffix, the formatted labels and
+            the value of every sample
+        """
+        pass
+
+    def render(self) -> List[str]:
+        """Render the metric in the Prometheus text format
+
+        :return: the lines of the rendered metric
+        """
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        lines.extend(
+            f"{self.name}{suffix}{labels} {_format_value(value)}"
+            for suffix, labels, value in self.samples()
+        )
+
+        return lines
+
+
+class Counter(Metric):
+    """A value that only increases"""
+
+    metric_type = "counter"
+
+    def __init__(
+        self, name: str, description: str, label_names: Tuple[str, ...] = ()
+    ):
+        super(Counter, self).__init__(name, description, label_names)
+
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, labels: Tuple = (), amount: float = 1):
+        """Increase the counter
+
+        :param labels: the label values
+        :param amount: the amount to add
+        """
+        if amount < 0:
+            raise ValueError("counters can only be increased")
+
+        with self._lock:
+            try:
+                self._values[labels] += amount
+            except KeyError:
+                self._check_labels(labels)
+                self._values[labels] = amount
+
+    def value(self, labels: Tuple = ()) -> float:
+        """Get the counter value
+
+        :param labels: the label values
+        :return: the counter value
+        """
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+
+        for labels, value in values:
+            yield "", _format_labels(self.label_names, labels), value
+
+
+class Gauge(Counter):
+    """A value that can increase and decrease"""
+
+    metric_type = "gauge"
+
+    def inc(self, labels: Tuple = (), amount: float = 1):
+        with self._lock:
+            try:
+                self._values[labels] += amount
+            except KeyError:
+                self._check_labels(labels)
+                self._values[labels] = amount
+
+    def dec(self, labels: Tuple = (), amount: float = 1):
+        """Decrease the gauge
+
+        :param labels: the label values
+        :param amount: the amount to subtract
+        """
+        self.inc(labels, -amount)
+
+    def set(self, value: float, labels: Tuple = ()):
+        """Set the gauge value
+
+        :param value: the new value
+        :param labels: the label values
+        """
+        self._check_labels(labels)
+        with self._lock:
+            self._values[labels] = value
+
+
+class _HistogramValues(object):
+    __slots__ = ("bucket_counts", "sum", "count")
+
+    def __init__(self, bucket_count: int):
+        self.bucket_counts = [0] * bucket_count
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(Metric):
+    """Counts observations in configurable buckets"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        """Create a new Histogram object
+
+        :param name: the metric name
+        :param description: the metric description
+        :param label_names: the names of the metric labels
+        :param buckets: the upper bounds of the buckets in increasing order
+        """
+        super(Histogram, self).__init__(name, description, label_names)
+
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values: Dict[Tuple, _HistogramValues] = {}
+
+    def observe(self, value: float, labels: Tuple = ()):
+        """Add an observation
+
+        :param value: the observed value
+        :param labels: the label values
+        """
+        # only the bucket of the value is updated here. The buckets are made
+        # cumulative when the histogram is rendered.
+        bucket = bisect_left(self.buckets, value)
+
+        with self._lock:
+            values = self._values.get(labels)
+            if values is None:
+                self._check_labels(labels)
+                values = _HistogramValues(len(self.buckets))
+                self._values[labels] = values
+
+            values.bucket_counts[bucket] += 1
+            values.sum += value
+            values.count += 1
+
+    def count(self, labels: Tuple = ()) -> int:
+        """Get the number of observations
+
+        :param labels: the label values
+        :return: the number of observations
+        """
+        with self._lock:
+            values = self._values.get(labels)
+
+            return values.count if values else 0
+
+    def totals(self) -> Dict[Tuple, Tuple[int, float]]:
+        """Get the number and the sum of the observations
+
+        :return: a dictionary with the number and the sum of the
+            observations for every set of label values
+        """
+        with self._lock:
+            return {
+                labels: (values.count, values.sum)
+                for labels, values in self._values.items()
+            }
+
+    def samples(self):
+        with self._lock:
+            values = sorted(
+                (
+                    labels,
+                    list(histogram_values.bucket_counts),
+                    histogram_values.sum,
+                    histogram_values.count,
+                )
+                for labels, histogram_values in self._values.items()
+            )
+
+        for labels, bucket_counts, total, count in values:
+            cumulative_count = 0
+            for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative_count += bucket_count
+                yield (
+                    "_bucket",
+                    _format_labels(
+                        self.label_names,
+                        labels,
+                        ("le", _format_value(upper_bound)),
+                    ),
+                    cumulative_count,
+                )
+
+            formatted_labels = _format_labels(self.label_names, labels)
+            yield "_sum", formatted_labels, total
+            yield "_count", formatted_labels, count
+
+
+class StageTimer(object):
+    """Context manager that records the duration and the errors of an
+    analysis stage"""
+
+    __slots__ = ("_registry", "_labels", "_started_at")
+
+    def __init__(self, registry: "MetricsRegistry", labels: Tuple[str, str]):
+        self._registry = registry
+        self._labels = labels
+        self._started_at = 0.0
+
+    def __enter__(self):
+        self._started_at = time.perf_counter()
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._registry.stage_seconds.observe(
+            time.perf_counter() - self._started_at, self._labels
+        )
+        if exc_type is not None:
+            self._registry.record_error(self._labels[0], exc_type)
+
+        return False
+
+
+class MetricsRegistry(object):
+    """A collection of metrics
+
+    The registry contains the metrics that the analysers and the downloader
+    report into and it can render all of them in the Prometheus text
+    exposition format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Metric] = {}
+
+        self.documents = self.counter(
+            "text_analysis_documents_total",
+            "The number of documents that were analysed",
+            ("component",),
+        )
+        self.errors = self.counter(
+            "text_analysis_errors_total",
+            "The number of errors by exception type",
+            ("component", "exception"),
+        )
+        self.stage_seconds = self.histogram(
+            "text_analysis_stage_seconds",
+            "The duration of the analysis stages",
+            ("component", "stage"),
+        )
+        self.downloaded_bytes = self.counter(
+            "text_analysis_downloaded_bytes_total",
+            "The number of bytes that were downloaded",
+        )
+        self.cache_requests = self.counter(
+            "text_analysis_cache_requests_total",
+            "The number of cache lookups by result",
+            ("cache", "result"),
+        )
+        self.budget_stages = self.counter(
+            "text_analysis_budget_stages_total",
+            "The number of stages that were truncated or skipped in order to "
+            "finish the analysis before its deadline",
+            ("component", "stage", "action"),
+        )
+
+    def _register(self, metric_class, name: str, *args, **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_class(name, *args, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"metric {name} is a {metric.metric_type}")
+
+            return metric
+
+    def counter(
+        self, name: str, description: str, label_names: Tuple[str, ...] = ()
+    ) -> Counter:
+        """Get or create a counter
+
+        :param name: the metric name
+        :param description: the metric description
+        :param label_names: the names of the metric labels
+        :return: the counter
+        """
+        return self._register(Counter, name, description, label_names)
+
+    def gauge(
+        self, name: str, description: str, label_names: Tuple[str, ...] = ()
+    ) -> Gauge:
+        """Get or create a gauge
+
+        :param name: the metric name
+        :param description: the metric description
+        :param label_names: the names of the metric labels
+        :return: the gauge
+        """
+        return self._register(Gauge, name, description, label_names)
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        label_names: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Get or create a histogram
+
+        :param name: the metric name
+        :param description: the metric description
+        :param label_names: the names of the metric labels
+        :param buckets: the upper bounds of the buckets
+        :return: the histogram
+        """
+        return self._register(
+            Histogram, name, description, label_names, buckets=buckets
+        )
+
+    def stage(self, component: str, stage: str) -> StageTimer:
+        """Time an analysis stage
+
+        The duration of the stage is added to the stage histogram and an
+        error is counted if the stage raises an exception.
+
+        :param component: the component that runs the stage
+        :param stage: the stage name
+        :return: a context manager that times the stage
+        """
+        return StageTimer(self, (component, stage))
+
+    def record_error(self, component: str, exception_type: type):
+        """Count an error
+
+        :param component: the component in which the error occurred
+        :param exception_type: the type of the exception that was raised
+        """
+        self.errors.inc((component, exception_type.__name__))
+
+    def render(self) -> str:
+        """Render the metrics in the Prometheus text format
+
+        :return: the rendered metrics
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+
+_NO_STAGE_TIMER = nullcontext()
+
+
+def time_stage(
+    registry: Optional[MetricsRegistry], component: str, stage: str
+) -> ContextManager:
+    """Time an analysis stage if there is a metrics registry
+
+    :param registry: the metrics registry or None if metrics aren't
+        collected
+    :param component: the component that runs the stage
+    :param stage: the stage name
+    :return: a context manager that times the stage
+    """
+    if registry is None:
+        return _NO_STAGE_TIMER
+
+    return registry.stage(component, stage)
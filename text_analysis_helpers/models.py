@@ -1,11 +1,14 @@
-import json
+import hashlib
 from abc import ABCMeta, abstractmethod
 from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import IO
 
+from text_analysis_helpers import serializers
 from text_analysis_helpers.helpers import current_date
 
 
-@dataclass
+@dataclass(slots=True)
 class TextStatistics:
     sentence_count: int
     word_count: int
@@ -18,34 +21,117 @@ class TextStatistics:
     sentence_word_count_variance: float
 
 
-@dataclass
+@dataclass(slots=True)
 class WebPage:
     url: str
     html: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SocialNetworkData:
     opengraph: list | None
     twitter: dict | None
 
 
+def payload_digest(payload: str) -> str:
+    """Calculate the digest of a raw payload that is discarded from a result
+
+    :param payload: the payload
+    :return: the sha256 hex digest of the utf-8 encoded payload
+    """
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _restore_opengraph_properties(opengraph: list | None) -> list | None:
+    """Convert the opengraph properties back to tuples after they have been
+    decoded as lists"""
+    if opengraph is None:
+        return None
+
+    restored_opengraph = []
+    for opengraph_item in opengraph:
+        if "properties" in opengraph_item:
+            opengraph_item = dict(
+                opengraph_item,
+                properties=[
+                    tuple(opengraph_property)
+                    for opengraph_property in opengraph_item["properties"]
+                ],
+            )
+        restored_opengraph.append(opengraph_item)
+
+    return restored_opengraph
+
+
 class BaseAnalysisResult(metaclass=ABCMeta):
     """Base model for all analysis results"""
 
+    __slots__ = ("created_at", "created_at_timestamp")
+
     def __init__(self):
         creation_date = current_date()
 
         self.created_at = creation_date.datetime
         self.created_at_timestamp = creation_date.timestamp()
 
+    def _set_creation_date(self, data: dict):
+        self.created_at_timestamp = data["created_at_timestamp"]
+        self.created_at = datetime.fromtimestamp(
+            self.created_at_timestamp, tz=timezone.utc
+        )
+
+    @classmethod
+    @abstractmethod
+    def from_dict(cls, data: dict) -> "BaseAnalysisResult":
+        """Create an analysis result object from the data that were created
+        by `as_dict`
+
+        :param data: the analysis result data
+        :return: the analysis result object
+        """
+        pass
+
+    @classmethod
+    def load(cls, input_file: str) -> "BaseAnalysisResult":
+        """Load an analysis result that was saved with `save`
+
+        :param input_file: the json file
+        :return: the analysis result object
+        """
+        with open(input_file, "rb") as f:
+            return cls.from_dict(serializers.loads(f.read()))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BaseAnalysisResult":
+        """Create an analysis result object from the binary format
+
+        :param data: the encoded analysis result
+        :return: the analysis result object
+        """
+        return cls.from_dict(serializers.unpackb(data))
+
+    def as_bytes(self, compress: bool = False) -> bytes:
+        """Encode the analysis result in the compact binary format
+
+        :param compress: compress the html and text fields with zstd
+        :return: the encoded analysis result
+        """
+        return serializers.packb(self.as_dict(), compress=compress)
+
     def save(self, output_file: str):
         """Encode to json and save to a file
 
         :param output_file: the output file
         """
-        with open(output_file, "w") as f:
-            f.write(self.as_json())
+        with open(output_file, "wb") as f:
+            self.write(f)
+
+    def write(self, fp: IO[bytes]):
+        """Encode to json and write to a file object
+
+        :param fp: the binary file object to write to
+        """
+        serializers.dump(self.as_dict(), fp)
 
     @abstractmethod
     def as_dict(self) -> dict:
@@ -63,21 +149,36 @@ class BaseAnalysisResult(metaclass=ABCMeta):
 
         :return: the data encoded in json
         """
-        return json.dumps(self.as_dict())
+        return serializers.dumps(self.as_dict()).decode("utf-8")
 
 
 class TextAnalysisResult(BaseAnalysisResult):
     """Text analysis result"""
 
+    __slots__ = (
+        "text",
+        "text_digest",
+        "keywords",
+        "readability_scores",
+        "statistics",
+        "summary",
+        "named_entities",
+        "language",
+        "skipped_stages",
+        "truncated_stages",
+    )
+
     def __init__(
         self,
-        text: str,
+        text: str | None,
         keywords: dict[str, float],
         readability_scores: dict,
         statistics: TextStatistics,
         summary: str,
         named_entities: dict[str, set[str]],
         language: str | None,
+        skipped_stages: list[str] | None = None,
+        truncated_stages: list[str] | None = None,
     ):
         """Create a new TextAnalysisResult object
 
@@ -88,16 +189,52 @@ class TextAnalysisResult(BaseAnalysisResult):
         :param summary: the text summary
         :param named_entities: the extracted named entities
         :param language: the detected text language
+        :param skipped_stages: the analysis stages that were skipped in order
+            to finish before the deadline
+        :param truncated_stages: the analysis stages that analysed only the
+            beginning of the text in order to finish before the deadline
         """
         super(TextAnalysisResult, self).__init__()
 
         self.text = text
+        self.text_digest = None
         self.keywords = keywords
         self.readability_scores = readability_scores
         self.statistics = statistics
         self.summary = summary
         self.named_entities = named_entities
         self.language = language
+        self.skipped_stages = skipped_stages
+        self.truncated_stages = truncated_stages
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TextAnalysisResult":
+        analysis_result = cls(
+            text=data["text"],
+            keywords=data["keywords"],
+            readability_scores=data["readability_scores"],
+            statistics=TextStatistics(**data["statistics"]),
+            summary=data["summary"],
+            named_entities={
+                named_entity_type: set(named_entities)
+                for named_entity_type, named_entities in data[
+                    "named_entities"
+                ].items()
+            },
+            language=data["language"],
+            skipped_stages=data.get("skipped_stages"),
+            truncated_stages=data.get("truncated_stages"),
+        )
+        analysis_result.text_digest = data.get("text_digest")
+        analysis_result._set_creation_date(data)
+
+        return analysis_result
+
+    def discard_text(self):
+        """Discard the analysed text and keep only its digest"""
+        if self.text is not None:
+            self.text_digest = payload_digest(self.text)
+            self.text = None
 
     def as_dict(self):
         data = super(TextAnalysisResult, self).as_dict()
@@ -119,16 +256,34 @@ class TextAnalysisResult(BaseAnalysisResult):
             }
         )
 
+        if self.text_digest is not None:
+            data["text_digest"] = self.text_digest
+        if self.skipped_stages:
+            data["skipped_stages"] = list(self.skipped_stages)
+        if self.truncated_stages:
+            data["truncated_stages"] = list(self.truncated_stages)
+
         return data
 
 
 class HtmlAnalysisResult(TextAnalysisResult):
     """Html analysis result"""
 
+    __slots__ = (
+        "url",
+        "html",
+        "html_digest",
+        "title",
+        "social_network_data",
+        "images",
+        "movies",
+        "duplicate_of",
+    )
+
     def __init__(
         self,
         url: str,
-        html: str,
+        html: str | None,
         title: str,
         social_network_data: SocialNetworkData,
         text_data: TextAnalysisResult,
@@ -150,12 +305,17 @@ class HtmlAnalysisResult(TextAnalysisResult):
             summary=text_data.summary,
             named_entities=text_data.named_entities,
             language=text_data.language,
+            skipped_stages=text_data.skipped_stages,
+            truncated_stages=text_data.truncated_stages,
         )
 
+        self.text_digest = text_data.text_digest
         self.url = url
         self.html = html
+        self.html_digest = None
         self.title = title
         self.social_network_data = social_network_data
+        self.duplicate_of = None
 
         self._extract_images(social_network_data)
         self._extract_videos(social_network_data)
@@ -184,6 +344,34 @@ class HtmlAnalysisResult(TextAnalysisResult):
                 if property_name == "og:video" and value not in self.movies:
                     self.movies.append(value)
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "HtmlAnalysisResult":
+        social_network_data = data["social_network_data"]
+
+        analysis_result = cls(
+            url=data["url"],
+            html=data["html"],
+            title=data["title"],
+            social_network_data=SocialNetworkData(
+                opengraph=_restore_opengraph_properties(
+                    social_network_data["opengraph"]
+                ),
+                twitter=social_network_data["twitter"],
+            ),
+            text_data=TextAnalysisResult.from_dict(data),
+        )
+        analysis_result.html_digest = data.get("html_digest")
+        analysis_result.duplicate_of = data.get("duplicate_of")
+        analysis_result._set_creation_date(data)
+
+        return analysis_result
+
+    def discard_html(self):
+        """Discard the web page html and keep only its digest"""
+        if self.html is not None:
+            self.html_digest = payload_digest(self.html)
+            self.html = None
+
     def as_dict(self):
         data = super(HtmlAnalysisResult, self).as_dict()
 
@@ -201,4 +389,9 @@ class HtmlAnalysisResult(TextAnalysisResult):
             }
         )
 
+        if self.html_digest is not None:
+            data["html_digest"] = self.html_digest
+        if self.duplicate_of is not None:
+            data["duplicate_of"] = self.duplicate_of
+
         return data
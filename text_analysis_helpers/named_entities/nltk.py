@@ -1,32 +1,37 @@
 from collections import defaultdict
-from typing import Dict, Optional, Set
-
-from nltk import sent_tokenize, word_tokenize
-from nltk.data import load as nltk_data_load
-from nltk.tag.api import TaggerI
-from nltk.tag.perceptron import PerceptronTagger
-from nltk.tree import Tree
+from typing import TYPE_CHECKING, Dict, Optional, Set
 
 from text_analysis_helpers.named_entities.extractors import (
     NamedEntityExtractor,
 )
 
+if TYPE_CHECKING:
+    from nltk.tag.api import TaggerI
+
 
 class NltkNamedEntityExtractor(NamedEntityExtractor):
     """Named entity extractor using nltk"""
 
-    def __init__(self, pos_tagger: Optional[TaggerI] = None, ne_chunker=None):
+    def __init__(
+        self, pos_tagger: Optional["TaggerI"] = None, ne_chunker=None
+    ):
         """Create a new NltkNamedEntityExtractor onject
 
         :param pos_tagger: the part of speech tagger that will be used
         :param ne_chunker: the named entity chunker
         """
+        from nltk.data import load as nltk_data_load
+        from nltk.tag.perceptron import PerceptronTagger
+
         self._pos_tagger = pos_tagger or PerceptronTagger()
         self._ne_chunker = ne_chunker or nltk_data_load(
             "chunkers/maxent_ne_chunker/english_ace_multiclass.pickle"
         )
 
     def extract_named_entities(self, document: str) -> Dict[str, Set[str]]:
+        from nltk import sent_tokenize, word_tokenize
+        from nltk.tree import Tree
+
         sentences = sent_tokenize(document)
         sentence_words = [word_tokenize(sentence) for sentence in sentences]
 
@@ -0,0 +1,253 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+_POLL_INTERVAL = 0.1
+
+
+@dataclass
+class Stage:
+    """A pipeline stage
+
+    :param name: the stage name
+    :param func: the callable that processes a single item
+    :param workers: the number of threads that will run this stage
+    """
+
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+
+
+@dataclass
+class StageStatistics:
+    name: str
+    workers: int
+    queue_depth: int
+    queue_size: int
+    processed: int
+    failed: int
+    busy_time: float
+    elapsed_time: float
+
+    @property
+    def throughput(self) -> float:
+        """The number of items per second that the stage has processed"""
+        if self.elapsed_time <= 0:
+            return 0.0
+
+        return self.processed / self.elapsed_time
+
+
+class _StageCounters(object):
+    def __init__(self, workers: int):
+        self.lock = threading.Lock()
+        self.active_workers = workers
+        self.processed = 0
+        self.failed = 0
+        self.busy_time = 0.0
+
+
+class Pipeline(object):
+    """Process a stream of items through a sequence of concurrent stages
+
+    Every stage runs in its own set of worker threads and the stages are
+    connected with bounded queues. A stage that can't keep up will block the
+    stages before it when its input queue is full, so the number of items
+    that are buffered in the pipeline never exceeds the total queue
+    capacity. Items that fail in a stage are logged and dropped. The items
+    are not guaranteed to be returned in the order they were received.
+    """
+
+    def __init__(
+        self,
+        source: Iterable,
+        stages: List[Stage],
+        queue_size: int = 16,
+        on_close: Optional[Callable[[], None]] = None,
+        context: Optional[Callable[[], ContextManager]] = None,
+    ):
+        """Create a new Pipeline object
+
+        :param source: the items to process
+        :param stages: the pipeline stages in the order they will be applied
+        :param queue_size: the capacity of the queue in front of each stage
+        :param on_close: a callable that is called after the worker threads
+            exit, for example to shut down an executor the stages use
+        :param context: a callable that creates a context manager which is
+            entered when the iteration starts and exited after the worker
+            threads exit, for example to create an executor the stages use
+        """
+        self._source = source
+        self._stages = stages
+        self._queue_size = queue_size
+        self._queues = [
+            queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)
+        ]
+        self._counters = [_StageCounters(stage.workers) for stage in stages]
+        self._stop = threading.Event()
+        self._threads = []
+        self._error = None
+        self._started_at = None
+        self._on_close = on_close
+        self._context = context
+
+    def _put(self, target_queue: queue.Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                target_queue.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def _get(self, source_queue: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return source_queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+        return _DONE
+
+    def _feed(self):
+        try:
+            for item in self._source:
+                if not self._put(self._queues[0], item):
+                    return
+        except BaseException as e:
+            self._error = e
+            self._stop.set()
+            return
+
+        self._put(self._queues[0], _DONE)
+
+    def _work(self, index: int):
+        stage = self._stages[index]
+        counters = self._counters[index]
+        input_queue = self._queues[index]
+        output_queue = self._queues[index + 1]
+
+        while True:
+            item = self._get(input_queue)
+            if item is _DONE:
+                break
+
+            started_at = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except Exception:
+                logger.exception(
+                    "pipeline stage failed: stage(%s)", stage.name
+                )
+                with counters.lock:
+                    counters.failed += 1
+                    counters.busy_time += time.perf_counter() - started_at
+                continue
+
+            with counters.lock:
+                counters.processed += 1
+                counters.busy_time += time.perf_counter() - started_at
+
+            if not self._put(output_queue, result):
+                return
+
+        # let the other workers of this stage know that there are no more
+        # items and signal the next stage when the last worker exits
+        self._put(input_queue, _DONE)
+        with counters.lock:
+            counters.active_workers -= 1
+            last_worker = counters.active_workers == 0
+
+        if last_worker:
+            self._put(output_queue, _DONE)
+
+    def _start(self):
+        if self._started_at is not None:
+            raise RuntimeError("the pipeline has already been started")
+
+        self._started_at = time.perf_counter()
+        self._threads.append(threading.Thread(target=self._feed, daemon=True))
+        for index, stage in enumerate(self._stages):
+            for _ in range(stage.workers):
+                self._threads.append(
+                    threading.Thread(
+                        target=self._work, args=(index,), daemon=True
+                    )
+                )
+
+        for thread in self._threads:
+            thread.start()
+
+    def close(self):
+        """Stop the pipeline and wait for the worker threads to exit"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+        if self._on_close is not None:
+            on_close, self._on_close = self._on_close, None
+            on_close()
+
+    def __iter__(self) -> Iterator:
+        context = self._context() if self._context else nullcontext()
+        with context:
+            self._start()
+
+            try:
+                while True:
+                    item = self._get(self._queues[-1])
+                    if item is _DONE:
+                        break
+
+                    yield item
+            finally:
+                self.close()
+
+        if self._error is not None:
+            raise self._error
+
+    def statistics(self) -> List[StageStatistics]:
+        """Get a snapshot of the statistics of every stage
+
+        :return: the stage statistics in the order the stages are applied
+        """
+        elapsed_time = 0.0
+        if self._started_at is not None:
+            elapsed_time = time.perf_counter() - self._started_at
+
+        statistics = []
+        for stage, counters, input_queue in zip(
+            self._stages, self._counters, self._queues
+        ):
+            with counters.lock:
+                statistics.append(
+                    StageStatistics(
+                        name=stage.name,
+                        workers=stage.workers,
+                        queue_depth=input_queue.qsize(),
+                        queue_size=self._queue_size,
+                        processed=counters.processed,
+                        failed=counters.failed,
+                        busy_time=counters.busy_time,
+                        elapsed_time=elapsed_time,
+                    )
+                )
+
+        return statistics
@@ -0,0 +1,205 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from text_analysis_helpers.duplicates import DuplicateIndex
+from text_analysis_helpers.html import HtmlAnalyser
+from text_analysis_helpers.metrics import MetricsRegistry
+from text_analysis_helpers.text import TextAnalyser
+
+
+@dataclass(frozen=True)
+class AnalysisPreset:
+    """The components that the analysers of a preset use
+
+    :param name: the preset name
+    :param description: a short description of the preset
+    :param tokenizer: `nltk` for the nltk punkt tokenizers or `simple` for
+        the regular expression tokenizers and the stop words of sumy, which
+        don't need any nltk data
+    :param readability_scores: the readability scores to calculate or None
+        to calculate all of them
+    :param summarizer_algorithm: the sumy summarization algorithm
+    :param named_entities: extract the named entities
+    :param language_detection_max_size: the number of characters from the
+        beginning of the text that are used to detect the language or None
+        to use the whole text
+    :param metadata_syntaxes: the structured metadata syntaxes to extract
+        from web pages or None to extract all of them
+    :param max_keywords: the number of keywords with the highest scores to
+        keep or None to keep all of them
+    """
+
+    name: str
+    description: str
+    tokenizer: str
+    readability_scores: Optional[Tuple[str, ...]]
+    summarizer_algorithm: str
+    named_entities: bool
+    language_detection_max_size: Optional[int]
+    metadata_syntaxes: Optional[Tuple[str, ...]]
+    max_keywords: Optional[int]
+
+
+PRESETS: Dict[str, AnalysisPreset] = {
+    preset.name: preset
+    for preset in [
+        AnalysisPreset(
+            name="fast",
+            description="regular expression tokenizers, the readability "
+            "scores that don't count syllables, Luhn summaries and no named "
+            "entities",
+            tokenizer="simple",
+            readability_scores=(
+                "automated_readability_index",
+                "coleman_liau_index",
+            ),
+            summarizer_algorithm="luhn",
+            named_entities=False,
+            language_detection_max_size=2000,
+            metadata_syntaxes=("opengraph",),
+            max_keywords=20,
+        ),
+        AnalysisPreset(
+            name="balanced",
+            description="nltk tokenizers, the common readability scores, "
+            "TextRank summaries and nltk named entities",
+            tokenizer="nltk",
+            readability_scores=(
+                "flesch_reading_ease",
+                "flesch_kincaid_grade",
+                "automated_readability_index",
+                "coleman_liau_index",
+                "gunning_fog",
+            ),
+            summarizer_algorithm="text_rank",
+            named_entities=True,
+            language_detection_max_size=10000,
+            metadata_syntaxes=("opengraph",),
+            max_keywords=50,
+        ),
+        AnalysisPreset(
+            name="full",
+            description="the default analysers with every readability score "
+            "and LSA summaries",
+            tokenizer="nltk",
+            readability_scores=None,
+            summarizer_algorithm="lsa",
+            named_entities=True,
+            language_detection_max_size=None,
+            metadata_syntaxes=None,
+            max_keywords=None,
+        ),
+    ]
+}
+
+
+def get_preset(name: str) -> AnalysisPreset:
+    """Get a preset by name
+
+    :param name: the preset name
+    :return: the preset
+    """
+    try:
+        return PRESETS[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown preset {name}. The available presets are "
+            f"{', '.join(PRESETS)}"
+        )
+
+
+def create_text_analyser(
+    preset: str = "balanced",
+    keep_text: bool = True,
+    metrics_registry: Optional[MetricsRegistry] = None,
+    budget: Optional[float] = None,
+) -> TextAnalyser:
+    """Create a text analyser that uses the components of a preset
+
+    :param preset: the preset name
+    :param keep_text: keep the analysed text in the result
+    :param metrics_registry: the registry to report the metrics to
+    :param budget: the default number of seconds an analysis may take
+    :return: the text analyser
+    """
+    from text_analysis_helpers.summaries.sumy import SumySummarizer
+
+    analysis_preset = get_preset(preset)
+
+    tokenizers = {}
+    stop_words = None
+    if analysis_preset.tokenizer == "simple":
+        from sumy.utils import get_stop_words
+
+        from text_analysis_helpers.tokenizers import (
+            simple_sentence_tokenize,
+            simple_word_tokenize,
+        )
+
+        tokenizers = {
+            "word_tokenizer": simple_word_tokenize,
+            "sentence_tokenizer": simple_sentence_tokenize,
+        }
+        # the stop words that are bundled with sumy don't need the nltk data
+        stop_words = sorted(get_stop_words("english"))
+
+    disabled_stages = []
+    if not analysis_preset.named_entities:
+        disabled_stages.append("named_entities")
+
+    return TextAnalyser(
+        summarizer=SumySummarizer(
+            algorithm=analysis_preset.summarizer_algorithm, **tokenizers
+        ),
+        keep_text=keep_text,
+        metrics_registry=metrics_registry,
+        budget=budget,
+        readability_scores=analysis_preset.readability_scores,
+        disabled_stages=disabled_stages,
+        language_detection_max_size=(
+            analysis_preset.language_detection_max_size
+        ),
+        max_keywords=analysis_preset.max_keywords,
+        stop_words=stop_words,
+        **tokenizers,
+    )
+
+
+def create_html_analyser(
+    preset: str = "balanced",
+    keep_html: bool = True,
+    keep_text: bool = True,
+    metrics_registry: Optional[MetricsRegistry] = None,
+    budget: Optional[float] = None,
+    duplicate_index: Optional[DuplicateIndex] = None,
+) -> HtmlAnalyser:
+    """Create an html analyser that uses the components of a preset
+
+    The articles are extracted with the linear time MSS article extractor.
+
+    :param preset: the preset name
+    :param keep_html: keep the web page html in the result
+    :param keep_text: keep the extracted text in the result
+    :param metrics_registry: the registry to report the metrics to
+    :param budget: the default number of seconds the text analysis may take
+    :param duplicate_index: the index of the analysed articles whose
+        analysis is reused for their near duplicates
+    :return: the html analyser
+    """
+    from text_analysis_helpers.article_templates import (
+        LinearMSSArticleExtractor,
+    )
+
+    return HtmlAnalyser(
+        text_analyser=create_text_analyser(
+            preset, metrics_registry=metrics_registry, budget=budget
+        ),
+        # it extracts the same articles as the default MSS extractor, so
+        # every preset uses it
+        article_extractor=LinearMSSArticleExtractor(),
+        keep_html=keep_html,
+        keep_text=keep_text,
+        metrics_registry=metrics_registry,
+        metadata_syntaxes=get_preset(preset).metadata_syntaxes,
+        duplicate_index=duplicate_index,
+    )
@@ -0,0 +1,176 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import IO, Dict, Iterator, Optional, Tuple
+
+from text_analysis_helpers.metrics import MetricsRegistry, StageTimer
+
+
+class _ProfiledStageTimer(StageTimer):
+    __slots__ = ()
+
+    def __enter__(self):
+        # the peak is reset for every stage, so the peak so far is kept in
+        # order to report the peak of the whole session
+        self._registry._record_session_peak(tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self._registry._memory_before[threading.get_ident()] = (
+            tracemalloc.get_traced_memory()[0]
+        )
+
+        return super(_ProfiledStageTimer, self).__enter__()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        result = super(_ProfiledStageTimer, self).__exit__(
+            exc_type, exc_val, exc_tb
+        )
+
+        memory_before = self._registry._memory_before.pop(
+            threading.get_ident(), 0
+        )
+        _, peak = tracemalloc.get_traced_memory()
+        self._registry._record_peak_memory(self._labels, peak - memory_before)
+
+        return result
+
+
+class StageProfiler(MetricsRegistry):
+    """Metrics registry that also records the peak memory of every stage
+
+    The analysers report the stage durations to the profiler like they do to
+    any metrics registry. When memory tracing is enabled, the peak memory
+    that was allocated while every stage was running is recorded as well.
+    The peak is measured with `tracemalloc`, which slows the analysis down
+    considerably, and it is only accurate when a single document is analysed
+    at a time.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        """Create a new StageProfiler object
+
+        :param trace_memory: record the peak memory of every stage
+        """
+        super(StageProfiler, self).__init__()
+
+        self.trace_memory = trace_memory
+        self._memory_before: Dict[int, int] = {}
+        self._peak_memory: Dict[Tuple[str, str], int] = {}
+        self._peak_memory_lock = threading.Lock()
+        self._session_peak = 0
+
+    def stage(self, component: str, stage: str) -> StageTimer:
+        if self.trace_memory and tracemalloc.is_tracing():
+            return _ProfiledStageTimer(self, (component, stage))
+
+        return super(StageProfiler, self).stage(component, stage)
+
+    def _record_peak_memory(self, labels: Tuple[str, str], peak: int):
+        with self._peak_memory_lock:
+            self._peak_memory[labels] = max(
+                peak, self._peak_memory.get(labels, 0)
+            )
+
+    def _record_session_peak(self, peak: int):
+        with self._peak_memory_lock:
+            self._session_peak = max(peak, self._session_peak)
+
+    def peak_memory(self, component: str, stage: str) -> Optional[int]:
+        """Get the peak memory of a stage
+
+        :param component: the component that runs the stage
+        :param stage: the stage name
+        :return: the peak memory in bytes or None if it wasn't recorded
+        """
+        with self._peak_memory_lock:
+            return self._peak_memory.get((component, stage))
+
+    def summary(self) -> str:
+        """Create a human readable summary of the stage durations
+
+        :return: the summary
+        """
+        header = f"{'stage':<36}{'calls':>8}{'total (s)':>12}{'mean (ms)':>12}"
+        if self.trace_memory:
+            header += f"{'peak (KiB)':>12}"
+
+        # the slowest stages are shown first
+        stage_totals = sorted(
+            self.stage_seconds.totals().items(),
+            key=lambda item: item[1][1],
+            reverse=True,
+        )
+
+        lines = [header]
+        for (component, stage), (count, total) in stage_totals:
+            line = (
+                f"{component + '.' + stage:<36}{count:>8}{total:>12.3f}"
+                f"{1000 * total / count:>12.3f}"
+            )
+            if self.trace_memory:
+                peak = self.peak_memory(component, stage)
+                line += f"{peak / 1024:>12.1f}" if peak is not None else ""
+            lines.append(line)
+
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def profile(
+    output_file: str,
+    trace_memory: bool = False,
+    summary_file: Optional[IO[str]] = None,
+    top_functions: int = 25,
+) -> Iterator[StageProfiler]:
+    """Profile the code that runs in the context
+
+    The cProfile statistics are saved in `output_file` and can be inspected
+    with `pstats` or tools like snakeviz. A summary with the duration of
+    every analysis stage that reported to the returned profiler and the
+    slowest functions is written to `summary_file`.
+
+    :param output_file: the file in which to save the cProfile statistics
+    :param trace_memory: record the peak memory of every stage
+    :param summary_file: the file to write the summary to. Defaults to
+        stderr.
+    :param top_functions: the number of functions to include in the summary
+    :return: the profiler that the analysers should report to
+    """
+    summary_file = summary_file or sys.stderr
+    stage_profiler = StageProfiler(trace_memory=trace_memory)
+    profiler = cProfile.Profile()
+
+    if trace_memory:
+        tracemalloc.start()
+
+    started_at = time.perf_counter()
+    profiler.enable()
+    try:
+        yield stage_profiler
+    finally:
+        profiler.disable()
+        elapsed_time = time.perf_counter() - started_at
+        if trace_memory:
+            stage_profiler._record_session_peak(
+                tracemalloc.get_traced_memory()[1]
+            )
+            tracemalloc.stop()
+
+        profiler.dump_stats(output_file)
+
+        functions = io.StringIO()
+        stats = pstats.Stats(profiler, stream=functions)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top_functions)
+
+        summary_file.write(f"total time: {elapsed_time:.3f}s\n")
+        if trace_memory:
+            peak = stage_profiler._session_peak
+            summary_file.write(f"peak memory: {peak / 1024:.1f}KiB\n")
+        summary_file.write("\n")
+        summary_file.write(stage_profiler.summary())
+        summary_file.write(functions.getvalue())
+        summary_file.write(f"cProfile statistics saved in {output_file}\n")
@@ -0,0 +1,286 @@
+import bz2
+import gzip
+import json
+import lzma
+from abc import ABC, abstractmethod
+from typing import IO, Any, Iterator, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+_json_encoder = json.JSONEncoder(ensure_ascii=False)
+
+COMPRESSION_OPENERS = {
+    None: open,
+    "gzip": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+COMPRESSIBLE_FIELDS = ("html", "text")
+COMPRESSED_FIELDS_KEY = "compressed_fields"
+
+
+def _require(module, name: str):
+    if module is None:
+        raise ImportError(
+            f"{name} is required for the binary result format. Install "
+            f"text-analysis-helpers with the binary extra."
+        )
+
+    return module
+
+
+def dumps(data: Any) -> bytes:
+    """Encode the data to utf-8 encoded json
+
+    orjson is used when it is installed, otherwise the standard library json
+    encoder is used.
+
+    :param data: the data to encode
+    :return: the encoded data
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+
+    return _json_encoder.encode(data).encode("utf-8")
+
+
+def dump(data: Any, fp: IO[bytes]):
+    """Encode the data to utf-8 encoded json and write it to a file
+
+    When orjson isn't installed the data are written in chunks as they are
+    encoded, so the complete json document is never held in memory.
+
+    :param data: the data to encode
+    :param fp: the binary file object to write to
+    """
+    if orjson is not None:
+        fp.write(orjson.dumps(data))
+        return
+
+    for chunk in _json_encoder.iterencode(data):
+        fp.write(chunk.encode("utf-8"))
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode json data
+
+    :param data: the json data
+    :return: the decoded data
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+def packb(data: dict, compress: bool = False, level: int = 3) -> bytes:
+    """Encode the data of an analysis result in the binary format
+
+    The data are encoded with msgpack. The `html` and `text` fields can
+    optionally be compressed with zstd, which shrinks the result
+    considerably since these fields are usually the largest part of it.
+
+    :param data: the analysis result data
+    :param compress: compress the html and text fields
+    :param level: the zstd compression level
+    :return: the encoded data
+    """
+    _require(msgpack, "msgpack")
+
+    if compress:
+        compressor = _require(zstandard, "zstandard").ZstdCompressor(
+            level=level
+        )
+        data = dict(data)
+        compressed_fields = []
+        for field in COMPRESSIBLE_FIELDS:
+            value = data.get(field)
+            if isinstance(value, str):
+                data[field] = compressor.compress(value.encode("utf-8"))
+                compressed_fields.append(field)
+        data[COMPRESSED_FIELDS_KEY] = compressed_fields
+
+    return msgpack.packb(data, use_bin_type=True)
+
+
+def _decompress_fields(data: dict) -> dict:
+    compressed_fields = data.pop(COMPRESSED_FIELDS_KEY, None)
+    if compressed_fields:
+        decompressor = _require(zstandard, "zstandard").ZstdDecompressor()
+        for field in compressed_fields:
+            data[field] = decompressor.decompress(data[field]).decode("utf-8")
+
+    return data
+
+
+def unpackb(packed: bytes) -> dict:
+    """Decode the data of an analysis result from the binary format
+
+    :param packed: the encoded data
+    :return: the analysis result data
+    """
+    data = _require(msgpack, "msgpack").unpackb(packed, raw=False)
+
+    return _decompress_fields(data)
+
+
+def compression_from_filename(filename: str) -> Optional[str]:
+    """Find the compression of a file from its extension
+
+    :param filename: the file name
+    :return: the compression name or None if the file isn't compressed
+    """
+    for extension, compression in COMPRESSION_EXTENSIONS.items():
+        if filename.endswith(extension):
+            return compression
+
+    return None
+
+
+def open_file(filename: str, mode: str, compression: Optional[str] = None):
+    """Open a file that might be compressed
+
+    :param filename: the file name
+    :param mode: the binary mode in which to open the file
+    :param compression: the compression to use. It is detected from the file
+        extension when it is not given.
+    :return: the file object
+    """
+    compression = compression or compression_from_filename(filename)
+    if compression not in COMPRESSION_OPENERS:
+        raise ValueError(f"unsupported compression: {compression}")
+
+    return COMPRESSION_OPENERS[compression](filename, mode)
+
+
+class ResultWriter(ABC):
+    """Base class for the writers that save analysis results to a file"""
+
+    def __init__(
+        self,
+        filename: str,
+        append: bool = False,
+        compression: Optional[str] = None,
+    ):
+        """Create a new ResultWriter object
+
+        :param filename: the output file
+        :param append: append the results to the file instead of
+            overwriting it
+        :param compression: the compression to use. It is detected from the
+            file extension when it is not given.
+        """
+        self._file = open_file(filename, "ab" if append else "wb", compression)
+
+    @abstractmethod
+    def write(self, analysis_result):
+        """Write an analysis result to the file
+
+        :param analysis_result: the analysis result
+        """
+        pass
+
+    def close(self):
+        """Close the file"""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class JsonLinesWriter(ResultWriter):
+    """Write analysis results to a json lines file
+
+    Every result is encoded and written directly to the file, one result per
+    line. Files with a `.gz`, `.bz2` or `.xz` extension are compressed.
+    """
+
+    def write(self, analysis_result):
+        analysis_result.write(self._file)
+        self._file.write(b"\n")
+
+
+class BinaryWriter(ResultWriter):
+    """Write analysis results to a file using the binary format
+
+    The encoded results are written back to back and can be read with
+    `read_binary`.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        append: bool = False,
+        compression: Optional[str] = None,
+        compress_fields: bool = False,
+    ):
+        """Create a new BinaryWriter object
+
+        :param filename: the output file
+        :param append: append the results to the file instead of
+            overwriting it
+        :param compression: the compression to use for the whole file. It is
+            detected from the file extension when it is not given.
+        :param compress_fields: compress the html and text fields of every
+            result with zstd
+        """
+        super(BinaryWriter, self).__init__(filename, append, compression)
+
+        self._compress_fields = compress_fields
+
+    def write(self, analysis_result):
+        self._file.write(
+            analysis_result.as_bytes(compress=self._compress_fields)
+        )
+
+
+def read_json_lines(
+    filename: str, compression: Optional[str] = None
+) -> Iterator[dict]:
+    """Read the analysis result data that are stored in a json lines file
+
+    :param filename: the json lines file
+    :param compression: the file compression. It is detected from the file
+        extension when it is not given.
+    :return: an iterator over the analysis result data
+    """
+    with open_file(filename, "rb", compression) as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+
+def read_binary(
+    filename: str, compression: Optional[str] = None
+) -> Iterator[dict]:
+    """Read the analysis result data that are stored in a binary file
+
+    :param filename: the binary file
+    :param compression: the file compression. It is detected from the file
+        extension when it is not given.
+    :return: an iterator over the analysis result data
+    """
+    _require(msgpack, "msgpack")
+
+    with open_file(filename, "rb", compression) as f:
+        for data in msgpack.Unpacker(f, raw=False):
+            yield _decompress_fields(data)
@@ -0,0 +1,550 @@
+import logging
+import os
+import queue
+import signal
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+from text_analysis_helpers import serializers
+from text_analysis_helpers.exceptions import (
+    NoContentError,
+    WebPageDownloadError,
+)
+from text_analysis_helpers.html import HtmlAnalyser
+from text_analysis_helpers.metrics import MetricsRegistry
+from text_analysis_helpers.models import WebPage
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_HTML = """<html>
+<head><title>Warm up</title></head>
+<body>
+<article>
+<p>The analysis server loads the language models before it accepts any
+requests. This page is analysed once by every analyser so the tokenizers,
+the part of speech tagger, the named entity chunker and the stop words are
+ready when the first request arrives. John Smith wrote it in London.</p>
+</article>
+</body>
+</html>"""
+
+ENDPOINTS = ("/health", "/metrics", "/analyse/text", "/analyse/html")
+
+
+class ServiceUnavailableError(Exception):
+    """Exception raised when all the analysers are busy and the request
+    queue is full"""
+
+    pass
+
+
+class AnalysisTimeoutError(Exception):
+    """Exception raised when an analysis didn't finish in time"""
+
+    pass
+
+
+class AnalysisService(object):
+    """A pool of warmed analysers with bounded concurrency
+
+    Every analyser is created and warmed up once, when the service starts,
+    so the language models aren't loaded again for every request. At most
+    `workers` documents are analysed concurrently and at most `max_queued`
+    more can wait for an analyser. Requests beyond that are rejected
+    immediately instead of piling up.
+    """
+
+    def __init__(
+        self,
+        analyser_factory: Callable[[], HtmlAnalyser] = HtmlAnalyser,
+        workers: int = 2,
+        max_queued: int = 8,
+        timeout: float = 30,
+        warm_up: bool = True,
+    ):
+        """Create a new AnalysisService object
+
+        :param analyser_factory: a callable that creates an analyser
+        :param workers: the number of analysers
+        :param max_queued: the number of requests that can wait for an
+            analyser to become available
+        :param timeout: the number of seconds to wait for an analysis result
+        :param warm_up: analyse a sample web page with every analyser before
+            the service starts
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self._analysers = queue.Queue()
+        self._slots = threading.BoundedSemaphore(workers + max_queued)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="analyser"
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._started_at = time.monotonic()
+
+        for _ in range(workers):
+            analyser = analyser_factory()
+            if warm_up:
+                self._warm_up(analyser)
+            self._analysers.put(analyser)
+
+    def _warm_up(self, analyser: HtmlAnalyser):
+        try:
+            analyser.analyse(
+                WebPage(url="http://localhost/", html=WARM_UP_HTML)
+            )
+        except Exception:
+            logger.warning("failed to warm up the analyser", exc_info=True)
+
+    @property
+    def in_flight(self) -> int:
+        """The number of requests that are being analysed or wait for an
+        analyser"""
+        with self._lock:
+            return self._in_flight
+
+    @property
+    def uptime(self) -> float:
+        """The number of seconds since the service was created"""
+        return time.monotonic() - self._started_at
+
+    def _run(self, func: Callable, *args):
+        analyser = self._analysers.get()
+        try:
+            return func(analyser, *args)
+        finally:
+            self._analysers.put(analyser)
+
+    def _release(self, future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def submit(self, func: Callable, *args):
+        """Run a function with an analyser and wait for the result
+
+        :param func: a callable that accepts the analyser and the given
+            arguments
+        :param args: the arguments of the function
+        :return: the function result
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ServiceUnavailableError()
+
+        with self._lock:
+            self._in_flight += 1
+
+        try:
+            future = self._executor.submit(self._run, func, *args)
+        except BaseException:
+            self._release(None)
+            raise
+
+        # the slot is released only when the analysis actually finishes, so
+        # analyses that timed out still count towards the concurrency limit
+        future.add_done_callback(self._release)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise AnalysisTimeoutError()
+
+    def analyse_text(self, text: str):
+        """Analyse a text
+
+        :param text: the text to analyse
+        :return: the text analysis result
+        """
+        return self.submit(
+            lambda analyser: analyser.text_analyser.analyse(text)
+        )
+
+    def analyse_html(self, web_page: WebPage):
+        """Analyse a web page
+
+        :param web_page: the web page to analyse
+        :return: the html analysis result
+        """
+        return self.submit(lambda analyser: analyser.analyse(web_page))
+
+    def analyse_url(self, url: str, download_timeout: float = 5):
+        """Download and analyse a web page
+
+        The download runs with an analyser, so it counts towards the
+        concurrency limit and the timeout like the analysis.
+
+        :param url: the url of the web page
+        :param download_timeout: the timeout for downloading the web page
+        :return: the html analysis result
+        """
+        return self.submit(
+            lambda analyser: analyser.analyse_url(
+                url, timeout=download_timeout
+            )
+        )
+
+    def close(self):
+        """Wait for the running analyses to finish and stop the workers"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """Handler for the analysis server requests"""
+
+    server_version = "text-analysis-helpers"
+
+    def address_string(self) -> str:
+        # the client address of unix socket connections is an empty string
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+
+        return "unix"
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.metrics.record_response(self._metrics_path, status)
+
+    @property
+    def _metrics_path(self) -> str:
+        # unknown paths are grouped together to keep the number of metrics
+        # bounded
+        return self.path if self.path in ENDPOINTS else "other"
+
+    def _send_json(self, status: HTTPStatus, data):
+        self._send(status, serializers.dumps(data), "application/json")
+
+    def _send_error(self, status: HTTPStatus, message: str):
+        self._send_json(status, {"error": message})
+
+    def _read_json(self) -> Optional[dict]:
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            content_length = -1
+
+        # a negative length would read until the client closes the connection
+        if content_length < 0:
+            self.close_connection = True
+            self._send_error(HTTPStatus.BAD_REQUEST, "invalid content length")
+            return None
+
+        if content_length > self.server.max_request_size:
+            self.close_connection = True
+            self._send_error(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request too large"
+            )
+            return None
+
+        try:
+            data = serializers.loads(self.rfile.read(content_length))
+        except ValueError:
+            self._send_error(HTTPStatus.BAD_REQUEST, "invalid json")
+            return None
+
+        if not isinstance(data, dict):
+            self._send_error(HTTPStatus.BAD_REQUEST, "expected a json object")
+            return None
+
+        return data
+
+    def do_GET(self):
+        if self.path == "/health":
+            service = self.server.service
+            self._send_json(
+                HTTPStatus.OK,
+                {
+                    "status": "ok",
+                    "workers": service.workers,
+                    "in_flight": service.in_flight,
+                    "uptime": service.uptime,
+                },
+            )
+        elif self.path == "/metrics":
+            self._send(
+                HTTPStatus.OK,
+                self.server.metrics.render(self.server.service).encode(
+                    "utf-8"
+                ),
+                "text/plain; version=0.0.4",
+            )
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, "not found")
+
+    def _analyse_text(self, data: dict):
+        text = data.get("text")
+        if not isinstance(text, str):
+            self._send_error(HTTPStatus.BAD_REQUEST, "text is required")
+            return None
+
+        return self.server.service.analyse_text(text)
+
+    def _analyse_html(self, data: dict):
+        url = data.get("url")
+        html = data.get("html")
+        if not isinstance(url, str) or not isinstance(html, (str, type(None))):
+            self._send_error(HTTPStatus.BAD_REQUEST, "url is required")
+            return None
+
+        if html is None:
+            return self.server.service.analyse_url(
+                url, download_timeout=self.server.download_timeout
+            )
+
+        return self.server.service.analyse_html(WebPage(url=url, html=html))
+
+    def do_POST(self):
+        handlers = {
+            "/analyse/text": self._analyse_text,
+            "/analyse/html": self._analyse_html,
+        }
+        handler = handlers.get(self.path)
+        if handler is None:
+            self._send_error(HTTPStatus.NOT_FOUND, "not found")
+            return
+
+        data = self._read_json()
+        if data is None:
+            return
+
+        started_at = time.perf_counter()
+        try:
+            analysis_result = handler(data)
+        except ServiceUnavailableError:
+            self._send_error(
+                HTTPStatus.SERVICE_UNAVAILABLE, "all analysers are busy"
+            )
+        except AnalysisTimeoutError:
+            self._send_error(HTTPStatus.GATEWAY_TIMEOUT, "analysis timed out")
+        except NoContentError:
+            self._send_error(
+                HTTPStatus.UNPROCESSABLE_ENTITY, "there is no content"
+            )
+        except WebPageDownloadError as e:
+            self._send_error(HTTPStatus.BAD_GATEWAY, str(e.message))
+        except Exception:
+            logger.exception("failed to analyse the document")
+            self._send_error(
+                HTTPStatus.INTERNAL_SERVER_ERROR, "analysis failed"
+            )
+        else:
+            if analysis_result is not None:
+                self._send_json(HTTPStatus.OK, analysis_result.as_dict())
+        finally:
+            self.server.metrics.record_duration(
+                self._metrics_path, time.perf_counter() - started_at
+            )
+
+
+class ServerMetrics(object):
+    """The request metrics of the analysis server"""
+
+    def __init__(self, registry: MetricsRegistry):
+        """Create a new ServerMetrics object
+
+        :param registry: the registry in which the metrics are created
+        """
+        self.registry = registry
+        self._responses = registry.counter(
+            "text_analysis_responses_total",
+            "The number of responses by path and status",
+            ("path", "status"),
+        )
+        self._request_seconds = registry.histogram(
+            "text_analysis_request_seconds",
+            "The duration of the analysis requests",
+            ("path",),
+        )
+        self._in_flight = registry.gauge(
+            "text_analysis_in_flight",
+            "The number of requests that are being analysed or wait for an "
+            "analyser",
+        )
+        self._workers = registry.gauge(
+            "text_analysis_workers", "The number of analysers"
+        )
+
+    def record_response(self, path: str, status: HTTPStatus):
+        self._responses.inc((path, str(int(status))))
+
+    def record_duration(self, path: str, duration: float):
+        self._request_seconds.observe(duration, (path,))
+
+    def render(self, service: AnalysisService) -> str:
+        """Render the metrics in the Prometheus text format
+
+        :param service: the analysis service
+        :return: the metrics
+        """
+        self._in_flight.set(service.in_flight)
+        self._workers.set(service.workers)
+
+        return self.registry.render()
+
+
+class _AnalysisServerMixin(object):
+    # wait for the requests that are being handled when the server closes
+    daemon_threads = False
+    block_on_close = True
+
+    def setup_analysis(
+        self,
+        service: AnalysisService,
+        max_request_size: int,
+        download_timeout: float,
+        metrics_registry: MetricsRegistry,
+    ):
+        self.service = service
+        self.max_request_size = max_request_size
+        self.download_timeout = download_timeout
+        self.metrics = ServerMetrics(metrics_registry)
+
+
+class AnalysisHTTPServer(_AnalysisServerMixin, ThreadingHTTPServer):
+    """Analysis server that listens on a tcp address"""
+
+    pass
+
+
+class AnalysisUnixServer(
+    _AnalysisServerMixin,
+    socketserver.ThreadingMixIn,
+    socketserver.UnixStreamServer,
+):
+    """Analysis server that listens on a unix socket"""
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+    def server_close(self):
+        super(AnalysisUnixServer, self).server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def create_server(
+    service: AnalysisService,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    unix_socket: Optional[str] = None,
+    max_request_size: int = 10 * 1024 * 1024,
+    download_timeout: float = 5,
+    metrics_registry: Optional[MetricsRegistry] = None,
+) -> socketserver.BaseServer:
+    """Create an analysis server
+
+    :param service: the analysis service that will analyse the documents
+    :param host: the address to listen on
+    :param port: the port to listen on
+    :param unix_socket: listen on this unix socket instead of a tcp port
+    :param max_request_size: the maximum request body size in bytes
+    :param download_timeout: the timeout for downloading web pages
+    :param metrics_registry: the registry that the /metrics endpoint
+        renders. The request metrics are added to it.
+    :return: the server
+    """
+    if unix_socket is not None:
+        server = AnalysisUnixServer(unix_socket, AnalysisRequestHandler)
+    else:
+        server = AnalysisHTTPServer((host, port), AnalysisRequestHandler)
+
+    server.setup_analysis(
+        service,
+        max_request_size,
+        download_timeout,
+        metrics_registry or MetricsRegistry(),
+    )
+
+    return server
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    unix_socket: Optional[str] = None,
+    workers: int = 2,
+    max_queued: int = 8,
+    timeout: float = 30,
+    max_request_size: int = 10 * 1024 * 1024,
+    analyser_factory: Optional[Callable[[], HtmlAnalyser]] = None,
+    preset: Optional[str] = None,
+):
+    """Run the analysis server until it receives SIGINT or SIGTERM
+
+    The server stops accepting connections when it receives a signal and
+    waits for the requests that are being handled to finish before it
+    exits.
+
+    :param host: the address to listen on
+    :param port: the port to listen on
+    :param unix_socket: listen on this unix socket instead of a tcp port
+    :param workers: the number of analysers
+    :param max_queued: the number of requests that can wait for an analyser
+    :param timeout: the number of seconds to wait for an analysis result
+    :param max_request_size: the maximum request body size in bytes
+    :param analyser_factory: a callable that creates an analyser. By default
+        the analysers report their metrics to the server metrics registry.
+    :param preset: create the default analysers with the components of this
+        speed/quality preset
+    """
+    metrics_registry = MetricsRegistry()
+    if analyser_factory is None and preset is not None:
+        from text_analysis_helpers.presets import create_html_analyser
+
+        def analyser_factory():
+            return create_html_analyser(
+                preset, metrics_registry=metrics_registry
+            )
+
+    elif analyser_factory is None:
+
+        def analyser_factory():
+            return HtmlAnalyser(metrics_registry=metrics_registry)
+
+    logger.info("loading %d analysers", workers)
+    service = AnalysisService(
+        analyser_factory=analyser_factory,
+        workers=workers,
+        max_queued=max_queued,
+        timeout=timeout,
+    )
+    server = create_server(
+        service,
+        host=host,
+        port=port,
+        unix_socket=unix_socket,
+        max_request_size=max_request_size,
+        metrics_registry=metrics_registry,
+    )
+
+    def shutdown(signum, frame):
+        logger.info("received signal %d, shutting down", signum)
+        # shutdown blocks until serve_forever returns, so it can't be called
+        # from the thread that runs the server
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    logger.info("listening on %s", unix_socket or f"{host}:{port}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.close()
@@ -0,0 +1,304 @@
+from typing import Callable, Dict, List, Optional
+
+from text_analysis_helpers.keywords.rake import load_stop_words
+from text_analysis_helpers.summaries.summarizers import TokenizedSummarizer
+
+ALGORITHMS = ("centroid", "text_rank")
+
+
+class NumpySummarizer(TokenizedSummarizer):
+    """Extractive summarizer that ranks the sentences with NumPy
+
+    The sentences are represented by the TF-IDF weights of their lowercase
+    words in a sparse sentence-term matrix. The `centroid` algorithm ranks
+    the sentences by their cosine similarity to the centroid of the
+    document and the `text_rank` algorithm by their PageRank in the graph of
+    the cosine similarities between every sentence and its most similar
+    sentences.
+    """
+
+    def __init__(
+        self,
+        sentence_count: int = 5,
+        algorithm: str = "text_rank",
+        word_tokenizer: Optional[Callable] = None,
+        sentence_tokenizer: Optional[Callable] = None,
+        stop_words: Optional[List[str]] = None,
+        language: str = "english",
+        damping: float = 0.85,
+        max_iterations: int = 50,
+        tolerance: float = 1e-6,
+        max_neighbours: int = 50,
+        max_block_size: int = 2**20,
+    ):
+        """Create a new NumpySummarizer object
+
+        :param sentence_count: the number of sentences to return
+        :param algorithm: the ranking algorithm. One of `centroid` and
+            `text_rank`.
+        :param word_tokenizer: a callable that splits a sentence into a
+            list of words. It is used only by `summarize`.
+        :param sentence_tokenizer: a callable that splits the text into
+            sentences. It is used only by `summarize`.
+        :param stop_words: the words that are ignored. The nltk stop words of
+            the language are used by default.
+        :param language: the language of the nltk stop words
+        :param damping: the TextRank damping factor
+        :param max_iterations: the maximum number of TextRank iterations
+        :param tolerance: TextRank stops when the ranks change by less than
+            this
+        :param max_neighbours: the number of most similar sentences of every
+            sentence that are linked in the TextRank graph
+        :param max_block_size: the maximum number of similarities that are
+            calculated at once by TextRank
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown summarization algorithm {algorithm}")
+
+        if not stop_words:
+            stop_words = load_stop_words(language)
+
+        self.sentence_count = sentence_count
+        self.algorithm = algorithm
+        self.damping = damping
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+        self.max_neighbours = max_neighbours
+        self.max_block_size = max_block_size
+        self._word_tokenizer = word_tokenizer
+        self._sentence_tokenizer = sentence_tokenizer
+        self._stop_words = frozenset(
+            stop_word.lower() for stop_word in stop_words
+        )
+
+    def _sentence_terms(self, sentence_words: List[List[str]]):
+        """Create the sparse sentence-term matrix
+
+        :param sentence_words: the words of every sentence
+        :return: the sentence index, the term index and the TF-IDF weight of
+            every non zero matrix element and the number of terms
+        """
+        import numpy as np
+
+        stop_words = self._stop_words
+        term_ids: Dict[str, int] = {}
+        sentence_indices = []
+        term_indices = []
+        for sentence_index, words in enumerate(sentence_words):
+            for word in words:
+                term = word.lower()
+                if term in stop_words or not any(c.isalnum() for c in term):
+                    continue
+
+                sentence_indices.append(sentence_index)
+                term_indices.append(term_ids.setdefault(term, len(term_ids)))
+
+        term_count = len(term_ids)
+        elements, term_frequencies = np.unique(
+            np.array(sentence_indices, dtype=np.int64) * term_count
+            + np.array(term_indices, dtype=np.int64),
+            return_counts=True,
+        )
+        rows = elements // max(term_count, 1)
+        columns = elements % max(term_count, 1)
+
+        document_frequencies = np.bincount(columns, minlength=term_count)
+        idfs = np.log(len(sentence_words) / document_frequencies) + 1
+        weights = term_frequencies * idfs[columns]
+
+        return rows, columns, weights, term_count
+
+    def _centroid_scores(self, rows, columns, weights, term_count, norms):
+        import numpy as np
+
+        centroid = np.bincount(columns, weights=weights, minlength=term_count)
+        similarities = np.bincount(
+            rows, weights=weights * centroid[columns], minlength=len(norms)
+        )
+
+        return similarities / (norms * np.linalg.norm(centroid))
+
+    def _similarity_pairs(self, rows, columns, weights, term_count, norms):
+        """Find the most similar sentences of every sentence
+
+        The similarities are calculated from an inverted index of the
+        sentences of every term. The sentences are processed in blocks whose
+        similarities to all the other sentences fit in a bounded array and
+        only the `max_neighbours` most similar sentences of every sentence
+        are kept, so the memory doesn't grow with the square of the number of
+        sentences.
+
+        :return: the sentence, the similar sentence and the cosine
+            similarity of every pair
+        """
+        import numpy as np
+
+        sentence_count = len(norms)
+        neighbour_count = min(self.max_neighbours, max(sentence_count - 1, 1))
+
+        # only the terms of more than one sentence contribute to the
+        # similarities between different sentences
+        shared = np.bincount(columns, minlength=term_count)[columns] > 1
+        rows, columns, weights = rows[shared], columns[shared], weights[shared]
+        document_frequencies = np.bincount(columns, minlength=term_count)
+
+        # the inverted index has the sentences of every term in order
+        order = np.argsort(columns, kind="stable")
+        posting_rows = rows[order]
+        posting_weights = weights[order]
+        posting_starts = np.concatenate(
+            ([0], np.cumsum(document_frequencies)[:-1])
+        )
+
+        # the elements are sorted by sentence, so the blocks are contiguous
+        pair_counts = document_frequencies[columns]
+        row_ends = np.searchsorted(rows, np.arange(sentence_count), "right")
+        row_pair_ends = np.concatenate(([0], np.cumsum(pair_counts)))[row_ends]
+        max_block_rows = max(1, self.max_block_size // sentence_count)
+
+        pair_rows, pair_columns, pair_similarities = [], [], []
+        block_start = 0
+        while block_start < sentence_count:
+            element_start = row_ends[block_start - 1] if block_start else 0
+            pair_start = row_pair_ends[block_start - 1] if block_start else 0
+            block_end = int(
+                np.searchsorted(
+                    row_pair_ends, pair_start + self.max_block_size, "right"
+                )
+            )
+            block_end = min(
+                max(block_end, block_start + 1),
+                block_start + max_block_rows,
+                sentence_count,
+            )
+            element_end = row_ends[block_end - 1]
+
+            # every element is paired with the postings of its term
+            block_columns = columns[element_start:element_end]
+            repeats = document_frequencies[block_columns]
+            offsets = np.arange(int(repeats.sum())) - np.repeat(
+                np.cumsum(repeats) - repeats, repeats
+            )
+            postings = np.repeat(posting_starts[block_columns], repeats)
+            postings += offsets
+            block_size = block_end - block_start
+            similarities = np.bincount(
+                np.repeat(
+                    rows[element_start:element_end] - block_start, repeats
+                )
+                * sentence_count
+                + posting_rows[postings],
+                weights=np.repeat(weights[element_start:element_end], repeats)
+                * posting_weights[postings],
+                minlength=block_size * sentence_count,
+            ).reshape(block_size, sentence_count)
+            # the counts are integers when there aren't any weights
+            similarities = similarities.astype(np.float64, copy=False)
+
+            block_rows = np.arange(block_start, block_end)
+            similarities /= norms[block_rows, np.newaxis] * norms
+            similarities[np.arange(block_size), block_rows] = 0.0
+
+            neighbours = np.argpartition(
+                -similarities, neighbour_count - 1, axis=1
+            )[:, :neighbour_count]
+            neighbour_similarities = np.take_along_axis(
+                similarities, neighbours, axis=1
+            )
+            similar = neighbour_similarities > 0
+            pair_rows.append(
+                np.repeat(block_rows, neighbour_count)[similar.ravel()]
+            )
+            pair_columns.append(neighbours[similar])
+            pair_similarities.append(neighbour_similarities[similar])
+
+            block_start = block_end
+
+        return (
+            np.concatenate(pair_rows),
+            np.concatenate(pair_columns),
+            np.concatenate(pair_similarities),
+        )
+
+    def _text_rank_scores(self, rows, columns, weights, term_count, norms):
+        import numpy as np
+
+        sentence_count = len(norms)
+        pair_rows, pair_columns, similarities = self._similarity_pairs(
+            rows, columns, weights, term_count, norms
+        )
+
+        out_weights = np.bincount(
+            pair_rows, weights=similarities, minlength=sentence_count
+        )
+        dangling = out_weights == 0
+        transitions = similarities / out_weights[pair_rows]
+
+        ranks = np.full(sentence_count, 1.0 / sentence_count)
+        for _ in range(self.max_iterations):
+            # the rank of the sentences that aren't similar to any other
+            # sentence is spread evenly
+            new_ranks = (1 - self.damping) / sentence_count + self.damping * (
+                np.bincount(
+                    pair_columns,
+                    weights=transitions * ranks[pair_rows],
+                    minlength=sentence_count,
+                )
+                + ranks[dangling].sum() / sentence_count
+            )
+            converged = np.abs(new_ranks - ranks).sum() < self.tolerance
+            ranks = new_ranks
+            if converged:
+                break
+
+        return ranks
+
+    def summarize_sentences(
+        self, sentences: List[str], sentence_words: List[List[str]]
+    ) -> str:
+        import numpy as np
+
+        if len(sentences) <= self.sentence_count:
+            return " ".join(sentences)
+
+        rows, columns, weights, term_count = self._sentence_terms(
+            sentence_words
+        )
+        if term_count == 0:
+            return " ".join(sentences[: self.sentence_count])
+
+        norms = np.sqrt(
+            np.bincount(rows, weights=weights**2, minlength=len(sentences))
+        )
+        # the sentences without terms are not similar to anything
+        norms[norms == 0] = np.inf
+
+        if self.algorithm == "centroid":
+            scores = self._centroid_scores(
+                rows, columns, weights, term_count, norms
+            )
+        else:
+            scores = self._text_rank_scores(
+                rows, columns, weights, term_count, norms
+            )
+
+        selected = np.sort(
+            np.argsort(-scores, kind="stable")[: self.sentence_count]
+        )
+
+        return " ".join(sentences[index] for index in selected)
+
+    def summarize(self, document: str) -> str:
+        word_tokenizer = self._word_tokenizer
+        sentence_tokenizer = self._sentence_tokenizer
+        if word_tokenizer is None or sentence_tokenizer is None:
+            import nltk
+
+            word_tokenizer = word_tokenizer or nltk.word_tokenize
+            sentence_tokenizer = sentence_tokenizer or nltk.sent_tokenize
+
+        sentences = sentence_tokenizer(document)
+
+        return self.summarize_sentences(
+            sentences, [word_tokenizer(sentence) for sentence in sentences]
+        )
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 
 class Summarizer(ABC):
@@ -12,3 +13,20 @@ class Summarizer(ABC):
         :return: returns the summarized document
         """
         pass
+
+
+class TokenizedSummarizer(Summarizer):
+    """Base class for the summarizers that can use the sentences and the
+    words that the text analyser has already tokenized"""
+
+    @abstractmethod
+    def summarize_sentences(
+        self, sentences: List[str], sentence_words: List[List[str]]
+    ) -> str:
+        """Create a summary from the tokenized document
+
+        :param sentences: the document sentences
+        :param sentence_words: the words of every sentence
+        :return: returns the summarized document
+        """
+        pass
@@ -1,30 +1,82 @@
-from sumy.nlp.stemmers import Stemmer
-from sumy.nlp.tokenizers import Tokenizer
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.summarizers.lsa import LsaSummarizer as Summarizer
-from sumy.utils import get_stop_words
+from importlib import import_module
 
 from text_analysis_helpers.summaries.summarizers import (
     Summarizer as SummarizerBase,
 )
 
+# the modules and the classes of the sumy summarization algorithms
+ALGORITHMS = {
+    "lsa": ("sumy.summarizers.lsa", "LsaSummarizer"),
+    "luhn": ("sumy.summarizers.luhn", "LuhnSummarizer"),
+    "lex_rank": ("sumy.summarizers.lex_rank", "LexRankSummarizer"),
+    "text_rank": ("sumy.summarizers.text_rank", "TextRankSummarizer"),
+    "sum_basic": ("sumy.summarizers.sum_basic", "SumBasicSummarizer"),
+    "kl": ("sumy.summarizers.kl", "KLSummarizer"),
+}
+
+
+class _Tokenizer(object):
+    """Adapts the tokenizer callables to the sumy tokenizer interface"""
+
+    def __init__(self, word_tokenizer, sentence_tokenizer):
+        self._word_tokenizer = word_tokenizer
+        self._sentence_tokenizer = sentence_tokenizer
+
+    def to_sentences(self, paragraph):
+        return self._sentence_tokenizer(paragraph)
+
+    def to_words(self, sentence):
+        return self._word_tokenizer(sentence)
+
 
 class SumySummarizer(SummarizerBase):
     """Summarizer implementation using sumy"""
 
-    def __init__(self, language="english", sentence_count=5):
+    def __init__(
+        self,
+        language="english",
+        sentence_count=5,
+        algorithm="lsa",
+        word_tokenizer=None,
+        sentence_tokenizer=None,
+    ):
         """Create a new SumySummarizer object
 
         :param language: the document language
         :param sentence_count: the number of sentences to return
+        :param algorithm: the summarization algorithm. One of `lsa`, `luhn`,
+            `lex_rank`, `text_rank`, `sum_basic` and `kl`.
+        :param word_tokenizer: a callable that splits a sentence into a list
+            of words. The sumy tokenizer is used by default.
+        :param sentence_tokenizer: a callable that splits the text into
+            sentences. The sumy tokenizer is used by default.
         """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown summarization algorithm {algorithm}")
+
         self.language = language
         self.sentence_count = sentence_count
+        self.algorithm = algorithm
+        self.word_tokenizer = word_tokenizer
+        self.sentence_tokenizer = sentence_tokenizer
 
     def summarize(self, document: str) -> str:
-        parser = PlaintextParser.from_string(
-            document, Tokenizer(self.language)
-        )
+        from sumy.nlp.stemmers import Stemmer
+        from sumy.nlp.tokenizers import Tokenizer
+        from sumy.parsers.plaintext import PlaintextParser
+        from sumy.utils import get_stop_words
+
+        module_name, class_name = ALGORITHMS[self.algorithm]
+        Summarizer = getattr(import_module(module_name), class_name)
+
+        if self.word_tokenizer is None or self.sentence_tokenizer is None:
+            tokenizer = Tokenizer(self.language)
+        else:
+            tokenizer = _Tokenizer(
+                self.word_tokenizer, self.sentence_tokenizer
+            )
+
+        parser = PlaintextParser.from_string(document, tokenizer)
         stemmer = Stemmer(self.language)
         summarizer = Summarizer(stemmer)
         summarizer.stop_words = get_stop_words(self.language)
@@ -1,23 +1,222 @@
-import itertools
-from typing import Dict, List, Optional
-
-import langdetect
-import numpy as np
-from langdetect.lang_detect_exception import LangDetectException
-from nltk import sent_tokenize, word_tokenize
-from textstat.textstat import textstat
+import math
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
 
+from text_analysis_helpers.budgets import (
+    StageCostEstimator,
+    create_deadline,
+    remaining_time,
+)
 from text_analysis_helpers.exceptions import NoContentError
 from text_analysis_helpers.keywords.extractors import KeywordExtractor
 from text_analysis_helpers.keywords.rake import Rake
+from text_analysis_helpers.metrics import MetricsRegistry, time_stage
 from text_analysis_helpers.models import TextAnalysisResult, TextStatistics
 from text_analysis_helpers.named_entities.extractors import (
     NamedEntityExtractor,
 )
 from text_analysis_helpers.named_entities.nltk import NltkNamedEntityExtractor
-from text_analysis_helpers.summaries.summarizers import Summarizer
+from text_analysis_helpers.summaries.summarizers import (
+    Summarizer,
+    TokenizedSummarizer,
+)
 from text_analysis_helpers.summaries.sumy import SumySummarizer
 
+READABILITY_SCORES = (
+    "flesch_reading_ease",
+    "smog_index",
+    "flesch_kincaid_grade",
+    "coleman_liau_index",
+    "automated_readability_index",
+    "dale_chall_readability_score",
+    "difficult_words",
+    "linsear_write_formula",
+    "gunning_fog",
+    "text_standard",
+)
+
+# the stages that can be skipped or truncated when the analysis deadline is
+# close
+OPTIONAL_STAGES = (
+    "readability",
+    "keywords",
+    "summary",
+    "named_entities",
+    "language_detection",
+)
+
+# the results of the stages that were skipped or disabled
+SKIPPED_STAGE_RESULTS = {
+    "readability": dict,
+    "keywords": dict,
+    "summary": str,
+    "named_entities": dict,
+    "language_detection": lambda: None,
+}
+
+# a stage is skipped instead of truncated when the text that could be
+# analysed before the deadline is shorter than this
+MIN_TRUNCATED_TEXT_SIZE = 500
+
+
+def calculate_readability_scores(
+    text: str, scores: Sequence[str] = READABILITY_SCORES
+) -> Dict:
+    """Calculate the readability scores of a text
+
+    :param text: the text
+    :param scores: the names of the scores to calculate
+    :return: the readability scores
+    """
+    from textstat.textstat import textstat
+
+    return {
+        score_function: getattr(textstat, score_function)(text)
+        for score_function in scores
+    }
+
+
+class TextStatisticsAccumulator(object):
+    """Calculates the text statistics from a stream of sentence word counts
+
+    The statistics are updated in a single pass without keeping the word
+    counts. Only the integer sums of the word counts and of their squares
+    and the frequency of every word count are kept, so the statistics are
+    exact and they don't depend on the order in which the sentences were
+    added. Accumulators of different texts can be merged, for example to
+    calculate the statistics of the chunks of a text or of a corpus.
+    """
+
+    __slots__ = (
+        "sentence_count",
+        "word_count",
+        "_squared_word_count",
+        "_word_count_frequencies",
+    )
+
+    def __init__(self):
+        self.sentence_count = 0
+        self.word_count = 0
+        self._squared_word_count = 0
+        self._word_count_frequencies: Dict[int, int] = defaultdict(int)
+
+    def add(self, sentence_word_count: int):
+        """Add the word count of a sentence
+
+        :param sentence_word_count: the number of words of the sentence
+        """
+        self.sentence_count += 1
+        self.word_count += sentence_word_count
+        self._squared_word_count += sentence_word_count**2
+        self._word_count_frequencies[sentence_word_count] += 1
+
+    def update(
+        self, sentence_word_counts: Iterable[int]
+    ) -> "TextStatisticsAccumulator":
+        """Add the word counts of some sentences
+
+        :param sentence_word_counts: the number of words of every sentence
+        :return: this object
+        """
+        for sentence_word_count in sentence_word_counts:
+            self.add(sentence_word_count)
+
+        return self
+
+    def merge(
+        self, other: "TextStatisticsAccumulator"
+    ) -> "TextStatisticsAccumulator":
+        """Add the sentences of another accumulator to this one
+
+        :param other: the accumulator to add
+        :return: this object
+        """
+        self.sentence_count += other.sentence_count
+        self.word_count += other.word_count
+        self._squared_word_count += other._squared_word_count
+        for word_count, frequency in other._word_count_frequencies.items():
+            self._word_count_frequencies[word_count] += frequency
+
+        return self
+
+    def _median(self) -> float:
+        # the middle word counts of the sorted sentences
+        lower_position = (self.sentence_count - 1) // 2
+        upper_position = self.sentence_count // 2
+
+        lower = upper = None
+        position = 0
+        for word_count in sorted(self._word_count_frequencies):
+            position += self._word_count_frequencies[word_count]
+            if lower is None and position > lower_position:
+                lower = word_count
+            if position > upper_position:
+                upper = word_count
+                break
+
+        return (lower + upper) / 2
+
+    def result(self) -> TextStatistics:
+        """Calculate the text statistics
+
+        :return: the text statistics
+        """
+        if self.sentence_count == 0:
+            return TextStatistics(
+                sentence_count=0,
+                word_count=0,
+                mean_sentence_word_count=0.0,
+                median_sentence_word_count=0.0,
+                min_sentence_word_count=0,
+                max_sentence_word_count=0,
+                average_sentence_word_count=0.0,
+                sentence_word_count_std=0.0,
+                sentence_word_count_variance=0.0,
+            )
+
+        mean = self.word_count / self.sentence_count
+        # the numerator is an exact integer, so the variance is rounded only
+        # once
+        variance = (
+            self.sentence_count * self._squared_word_count - self.word_count**2
+        ) / self.sentence_count**2
+
+        return TextStatistics(
+            sentence_count=self.sentence_count,
+            word_count=self.word_count,
+            mean_sentence_word_count=mean,
+            median_sentence_word_count=self._median(),
+            min_sentence_word_count=min(self._word_count_frequencies),
+            max_sentence_word_count=max(self._word_count_frequencies),
+            average_sentence_word_count=mean,
+            sentence_word_count_std=math.sqrt(variance),
+            sentence_word_count_variance=variance,
+        )
+
+
+def calculate_text_statistics(
+    sentence_word_counts: Iterable[int],
+) -> TextStatistics:
+    """Calculate the text statistics from the word count of every sentence
+
+    :param sentence_word_counts: the number of words of every sentence
+    :return: the text statistics
+    """
+    return TextStatisticsAccumulator().update(sentence_word_counts).result()
+
+
+def _sentence_prefix(sentences: List[str], max_size: int) -> str:
+    prefix_sentences = []
+    size = 0
+    for sentence in sentences:
+        size += len(sentence) + 1
+        if size > max_size:
+            break
+        prefix_sentences.append(sentence)
+
+    return " ".join(prefix_sentences)
+
 
 class TextAnalyser(object):
     """Text analyser"""
@@ -27,6 +226,17 @@ class TextAnalyser(object):
         keyword_extractor: Optional[KeywordExtractor] = None,
         summarizer: Optional[Summarizer] = None,
         named_entity_extractor: Optional[NamedEntityExtractor] = None,
+        keep_text: bool = True,
+        metrics_registry: Optional[MetricsRegistry] = None,
+        budget: Optional[float] = None,
+        cost_estimator: Optional[StageCostEstimator] = None,
+        word_tokenizer: Optional[Callable] = None,
+        sentence_tokenizer: Optional[Callable] = None,
+        readability_scores: Optional[Sequence[str]] = None,
+        disabled_stages: Iterable[str] = (),
+        language_detection_max_size: Optional[int] = None,
+        max_keywords: Optional[int] = None,
+        stop_words: Optional[List[str]] = None,
     ):
         """Create a new TextAnalyser object
 
@@ -34,31 +244,178 @@ class TextAnalyser(object):
         :param summarizer: The summarizer that will create the document summary
         :param named_entity_extractor: The object that will extract the named
             entities
+        :param keep_text: keep the analysed text in the result. When this is
+            False only the digest of the text is kept.
+        :param metrics_registry: the registry to report the stage durations,
+            the analysed documents and the errors to
+        :param budget: the default number of seconds an analysis may take.
+            The stages that are not expected to finish in time are truncated
+            or skipped.
+        :param cost_estimator: the object that estimates the duration of the
+            stages
+        :param word_tokenizer: a callable that splits a sentence into a list
+            of words. The nltk tokenizer is used by default.
+        :param sentence_tokenizer: a callable that splits the text into
+            sentences. The nltk tokenizer is used by default.
+        :param readability_scores: the names of the readability scores to
+            calculate. All of them are calculated by default.
+        :param disabled_stages: the stages that should not run. Their results
+            are empty.
+        :param language_detection_max_size: detect the language using only
+            this many characters from the beginning of the text
+        :param max_keywords: the number of keywords with the highest scores
+            that the default keyword extractor returns. All the keywords are
+            returned by default.
+        :param stop_words: the stop words of the default keyword extractor.
+            The nltk stop words are used by default.
         """
-        self.keyword_extractor = keyword_extractor or Rake()
-        self.summarizer = summarizer or SumySummarizer()
-        self.named_entity_extractor = (
-            named_entity_extractor or NltkNamedEntityExtractor()
+        disabled_stages = frozenset(disabled_stages)
+        unknown_stages = disabled_stages - set(OPTIONAL_STAGES)
+        if unknown_stages:
+            raise ValueError(
+                f"unknown stages {', '.join(sorted(unknown_stages))}"
+            )
+
+        unknown_scores = set(readability_scores or ()) - set(
+            READABILITY_SCORES
+        )
+        if unknown_scores:
+            raise ValueError(
+                f"unknown readability scores "
+                f"{', '.join(sorted(unknown_scores))}"
+            )
+
+        # the default components load their models when they are created, so
+        # they are not created for the disabled stages
+        if keyword_extractor is None and "keywords" not in disabled_stages:
+            keyword_extractor = Rake(
+                word_tokenizer=word_tokenizer,
+                sentence_tokenizer=sentence_tokenizer,
+                stop_words=stop_words,
+                top_k=max_keywords,
+            )
+        if summarizer is None and "summary" not in disabled_stages:
+            summarizer = SumySummarizer()
+        if (
+            named_entity_extractor is None
+            and "named_entities" not in disabled_stages
+        ):
+            named_entity_extractor = NltkNamedEntityExtractor()
+
+        self.keyword_extractor = keyword_extractor
+        self.summarizer = summarizer
+        self.named_entity_extractor = named_entity_extractor
+        self.keep_text = keep_text
+        self.metrics_registry = metrics_registry
+        self.budget = budget
+        self.cost_estimator = cost_estimator or StageCostEstimator()
+        self.word_tokenizer = word_tokenizer
+        self.sentence_tokenizer = sentence_tokenizer
+        self.readability_scores = tuple(
+            readability_scores or READABILITY_SCORES
         )
+        self.disabled_stages = disabled_stages
+        self.language_detection_max_size = language_detection_max_size
 
     def _calculate_readability_scores(self, text: str) -> Dict:
-        score_functions = [
-            "flesch_reading_ease",
-            "smog_index",
-            "flesch_kincaid_grade",
-            "coleman_liau_index",
-            "automated_readability_index",
-            "dale_chall_readability_score",
-            "difficult_words",
-            "linsear_write_formula",
-            "gunning_fog",
-            "text_standard",
-        ]
-
-        return {
-            score_function: getattr(textstat, score_function)(text)
-            for score_function in score_functions
-        }
+        return calculate_readability_scores(text, self.readability_scores)
+
+    def _tokenize(self, text: str) -> tuple:
+        word_tokenizer = self.word_tokenizer
+        sentence_tokenizer = self.sentence_tokenizer
+        if word_tokenizer is None or sentence_tokenizer is None:
+            import nltk
+
+            word_tokenizer = word_tokenizer or nltk.word_tokenize
+            sentence_tokenizer = sentence_tokenizer or nltk.sent_tokenize
+
+        sentences = sentence_tokenizer(text)
+        sentence_words = [word_tokenizer(sentence) for sentence in sentences]
+
+        return sentences, sentence_words
+
+    def _stage_input(self, stage: str, text: str) -> str:
+        if (
+            stage == "language_detection"
+            and self.language_detection_max_size is not None
+        ):
+            return text[: self.language_detection_max_size]
+
+        return text
+
+    def _detect_language(self, text: str) -> Optional[str]:
+        import langdetect
+        from langdetect.lang_detect_exception import LangDetectException
+
+        try:
+            return langdetect.detect(text)
+        except LangDetectException:
+            return None
+
+    def _run_stage(
+        self,
+        stage: str,
+        text: str,
+        sentences: Optional[List[str]] = None,
+        sentence_words: Optional[List[List[str]]] = None,
+    ):
+        if stage == "readability":
+            return self._calculate_readability_scores(text)
+        elif stage == "keywords":
+            return self.keyword_extractor.extract_keywords(text)
+        elif stage == "summary":
+            # the summarizers that can use the tokens of the analyser don't
+            # tokenize the text again
+            if sentences is not None and isinstance(
+                self.summarizer, TokenizedSummarizer
+            ):
+                return self.summarizer.summarize_sentences(
+                    sentences, sentence_words
+                )
+
+            return self.summarizer.summarize(text)
+        elif stage == "named_entities":
+            return self.named_entity_extractor.extract_named_entities(text)
+        elif stage == "language_detection":
+            return self._detect_language(text)
+
+        raise ValueError(f"unknown stage {stage}")
+
+    def _fit_to_deadline(
+        self,
+        stage: str,
+        text: str,
+        sentences: List[str],
+        deadline: Optional[float],
+    ) -> Optional[str]:
+        """Get the text that a stage can analyse before the deadline
+
+        :param stage: the stage name
+        :param text: the text to analyse
+        :param sentences: the text sentences
+        :param deadline: the analysis deadline
+        :return: the text, the longest sentence prefix of the text that the
+            stage is expected to analyse in time or None if the stage should
+            be skipped
+        """
+        remaining = remaining_time(deadline)
+        if remaining is None:
+            return text
+        if remaining <= 0:
+            return None
+        if self.cost_estimator.estimate(stage, len(text)) <= remaining:
+            return text
+
+        max_size = int(remaining / self.cost_estimator.cost(stage))
+        prefix = _sentence_prefix(sentences, max_size)
+        if len(prefix) < MIN_TRUNCATED_TEXT_SIZE:
+            return None
+
+        return prefix
+
+    def _record_budget_action(self, stage: str, action: str):
+        if self.metrics_registry is not None:
+            self.metrics_registry.budget_stages.inc(("text", stage, action))
 
     def _calculate_text_statistics(
         self, sentences: List[str], sentence_words: List[List[str]]
@@ -70,65 +427,118 @@ class TextAnalyser(object):
             tokenized into separate words
         :return: the calculated text statistics
         """
-        words = list(itertools.chain(*sentence_words))
-
-        sentence_word_counts = np.array(
-            [len(sentence) for sentence in sentence_words]
+        return calculate_text_statistics(
+            len(sentence) for sentence in sentence_words
         )
 
-        return TextStatistics(
-            sentence_count=len(sentences),
-            word_count=len(words),
-            mean_sentence_word_count=float(sentence_word_counts.mean()),
-            median_sentence_word_count=float(np.median(sentence_word_counts)),
-            min_sentence_word_count=int(sentence_word_counts.min()),
-            max_sentence_word_count=int(sentence_word_counts.max()),
-            average_sentence_word_count=float(
-                np.average(sentence_word_counts)
-            ),
-            sentence_word_count_std=float(sentence_word_counts.std()),
-            sentence_word_count_variance=float(sentence_word_counts.var()),
-        )
+    def _stage(self, stage: str):
+        return time_stage(self.metrics_registry, "text", stage)
 
-    def analyse(self, text: str) -> TextAnalysisResult:
+    def analyse(
+        self, text: str, deadline: Optional[float] = None
+    ) -> TextAnalysisResult:
         """Analyse the given text
 
+        The text is tokenized and its statistics are calculated first. The
+        rest of the stages run from the cheapest to the most expensive. When
+        there is a deadline, the stages that are not expected to finish
+        before it run on a prefix of the text, or they are skipped if the
+        prefix would be too short. The result contains the names of the
+        truncated and the skipped stages.
+
         :param text: the text to analyse
+        :param deadline: the analysis deadline as a `time.monotonic()`
+            timestamp. The earliest of this and the end of the analyser
+            budget is used.
         :return: the analysis result
         """
         if len(text) == 0:
+            if self.metrics_registry is not None:
+                self.metrics_registry.record_error("text", NoContentError)
             raise NoContentError()
 
-        readability_scores = self._calculate_readability_scores(text)
-        sentences = sent_tokenize(text)
-        sentence_words = [word_tokenize(sentence) for sentence in sentences]
-        statistics = self._calculate_text_statistics(sentences, sentence_words)
-        keywords = self.keyword_extractor.extract_keywords(text)
-        summary = self.summarizer.summarize(text)
-        named_entities = self.named_entity_extractor.extract_named_entities(
-            text
-        )
+        deadline = create_deadline(deadline, self.budget)
 
-        try:
-            language = langdetect.detect(text)
-        except LangDetectException:
-            language = None
+        with self._stage("tokenization"):
+            sentences, sentence_words = self._tokenize(text)
+        with self._stage("statistics"):
+            statistics = self._calculate_text_statistics(
+                sentences, sentence_words
+            )
+
+        stage_results = {}
+        skipped_stages = []
+        truncated_stages = []
+        for stage in self.cost_estimator.order(OPTIONAL_STAGES):
+            if stage in self.disabled_stages:
+                stage_results[stage] = SKIPPED_STAGE_RESULTS[stage]()
+                continue
+
+            stage_input = self._stage_input(stage, text)
+            stage_text = self._fit_to_deadline(
+                stage, stage_input, sentences, deadline
+            )
+            if stage_text is None:
+                stage_results[stage] = SKIPPED_STAGE_RESULTS[stage]()
+                skipped_stages.append(stage)
+                self._record_budget_action(stage, "skipped")
+                continue
+            if stage_text is not stage_input:
+                truncated_stages.append(stage)
+                self._record_budget_action(stage, "truncated")
+
+            started_at = time.perf_counter()
+            with self._stage(stage):
+                if stage_text is text:
+                    stage_results[stage] = self._run_stage(
+                        stage, stage_text, sentences, sentence_words
+                    )
+                else:
+                    stage_results[stage] = self._run_stage(stage, stage_text)
+            self.cost_estimator.update(
+                stage, len(stage_text), time.perf_counter() - started_at
+            )
 
-        return TextAnalysisResult(
+        analysis_result = TextAnalysisResult(
             text=text,
-            keywords=keywords,
-            readability_scores=readability_scores,
+            keywords=stage_results["keywords"],
+            readability_scores=stage_results["readability"],
             statistics=statistics,
-            summary=summary,
-            named_entities=named_entities,
-            language=language,
+            summary=stage_results["summary"],
+            named_entities=stage_results["named_entities"],
+            language=stage_results["language_detection"],
+            skipped_stages=skipped_stages or None,
+            truncated_stages=truncated_stages or None,
         )
 
-    def analyse_file(self, filename: str) -> TextAnalysisResult:
+        if not self.keep_text:
+            analysis_result.discard_text()
+
+        if self.metrics_registry is not None:
+            self.metrics_registry.documents.inc(("text",))
+
+        return analysis_result
+
+    def analyse_file(
+        self, filename: str, max_chunk_size: Optional[int] = None
+    ) -> TextAnalysisResult:
         """Analyse the contents of a file
 
         :param filename: the path to a file
+        :param max_chunk_size: read and analyse the file in chunks of at most
+            this many characters instead of loading the whole file. The text
+            isn't kept in the result, only its digest.
         :return: the analysis result
         """
+        if max_chunk_size is not None:
+            from text_analysis_helpers.chunked import analyse_file_chunked
+
+            return analyse_file_chunked(
+                filename,
+                analyser_factory=lambda: self,
+                max_chunk_size=max_chunk_size,
+                max_workers=0,
+            )
+
         with open(filename, "r") as f:
             return self.analyse(f.read())
@@ -0,0 +1,49 @@
+import re
+from typing import Iterator, List
+
+# a sentence ends with a punctuation mark, optionally followed by closing
+# quotes or brackets, when the next sentence starts with an upper case letter,
+# a digit or an opening quote or bracket
+SENTENCE_END = re.compile(r"[.!?][\"'”’)\]]*(?=\s+[\"'“‘(\[]?[A-Z0-9])")
+PARAGRAPH_BOUNDARY = re.compile(r"\n\s*\n")
+WORD = re.compile(r"\w+(?:[-'’.]\w+)*|[^\w\s]")
+
+
+def _split_sentences(paragraph: str) -> Iterator[str]:
+    start = 0
+    for match in SENTENCE_END.finditer(paragraph):
+        end = match.end()
+        yield paragraph[start:end]
+        start = end
+
+    yield paragraph[start:]
+
+
+def simple_sentence_tokenize(text: str) -> List[str]:
+    """Split a text into sentences with regular expressions
+
+    This is a lot faster than the nltk punkt tokenizer and it doesn't need
+    any nltk data, but it splits the text after abbreviations like "Mr."
+    as well.
+
+    :param text: the text
+    :return: the sentences
+    """
+    sentences = []
+    for paragraph in PARAGRAPH_BOUNDARY.split(text):
+        sentences.extend(
+            sentence.strip()
+            for sentence in _split_sentences(paragraph)
+            if sentence.strip()
+        )
+
+    return sentences
+
+
+def simple_word_tokenize(sentence: str) -> List[str]:
+    """Split a sentence into words and punctuation marks
+
+    :param sentence: the sentence
+    :return: the words and the punctuation marks
+    """
+    return WORD.findall(sentence)